@@ -0,0 +1,136 @@
+"""
+Benchmarks for ex1_bank_account.py
+==================================
+
+Plain wall-clock benchmarks, no third-party harness needed.
+
+Usage:
+    Run all benchmarks:    python benchmarks/bench_ex1_bank_account.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ex1_bank_account import AccountJournal, AccountLedger
+
+
+def bench_concurrent_transfers(accounts: int = 1_024, transfers: int = 200_000, stripes: int = 64) -> None:
+    """Fixed total work split across 1..32 threads moving money in both directions."""
+    print(f"concurrent transfers: {transfers:,} transfers, {accounts:,} accounts, {stripes} stripes")
+    for threads in (1, 2, 4, 8, 16, 32):
+        ledger = AccountLedger(lock_stripes=stripes)
+        rows = ledger.open_accounts(accounts)
+        for i in rows:
+            ledger.deposit(i, 1_000_000)
+        per_thread = transfers // threads
+
+        def worker(seed: int) -> None:
+            for k in range(per_thread):
+                a = (seed + k) % accounts
+                b = (seed * 7 + k * 13) % accounts
+                # half the workers go a -> b, the other half b -> a
+                if seed % 2:
+                    a, b = b, a
+                ledger.transfer(a, b, 1.0)
+
+        pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+        start = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        elapsed = time.perf_counter() - start
+        assert ledger.total_balance() == accounts * 1_000_000
+        print(f"  threads={threads:>2}  {per_thread * threads / elapsed:>12,.0f} transfers/s")
+
+
+def bench_journal_recovery(accounts: int = 100_000, events: int = 10_000_000, group_size: int = 4_096) -> None:
+    """Write amplification and recovery time of the journal, full replay vs snapshot + tail."""
+    print(f"journal: {events:,} events, {accounts:,} accounts, group commit every {group_size:,} events")
+    with tempfile.TemporaryDirectory() as tmp:
+        journal_path = os.path.join(tmp, "ledger.wal")
+        snapshot_path = os.path.join(tmp, "ledger.snap")
+        journal = AccountJournal(journal_path, group_size=group_size)
+        ledger = AccountLedger(journal=journal)
+        ledger.open_accounts(accounts)
+
+        start = time.perf_counter()
+        for i in range(accounts):
+            ledger.deposit(i, 1_000_000)
+        for k in range(events - accounts - 2):
+            if k == (events * 9) // 10:
+                # snapshot at 90% of the log, recovery then replays only the last 10%
+                ledger.snapshot(snapshot_path)
+            ledger.transfer(k % accounts, (k * 7 + 1) % accounts, 1.0)
+        ledger.deposit(0, 1)
+        journal.close()
+        write_elapsed = time.perf_counter() - start
+
+        journal_bytes = os.path.getsize(journal_path)
+        snapshot_bytes = os.path.getsize(snapshot_path)
+        # the logical change per event is one 8 byte balance
+        print(f"  write:      {events / write_elapsed:>12,.0f} events/s")
+        print(f"  journal:    {journal_bytes / 2**20:>12,.1f} MiB  ({journal_bytes / events:.1f} B/event)")
+        print(f"  snapshot:   {snapshot_bytes / 2**20:>12,.1f} MiB")
+        print(f"  write amplification vs 8 B/event: {(journal_bytes + snapshot_bytes) / (events * 8):.2f}x")
+
+        start = time.perf_counter()
+        full = AccountLedger.recover(journal_path)
+        full_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        tail = AccountLedger.recover(journal_path, snapshot_path)
+        tail_elapsed = time.perf_counter() - start
+        assert full.total_balance() == tail.total_balance() == ledger.total_balance()
+        print(f"  recovery, full replay:      {full_elapsed:>8.2f}s")
+        print(f"  recovery, snapshot + tail:  {tail_elapsed:>8.2f}s")
+
+
+def bench_fixed_point(accounts: int = 10_000, ops: int = 10_000_000) -> None:
+    """Mixed deposit/withdraw workload: float vs fixed-point cents vs Decimal."""
+    print(f"arithmetic modes: {ops:,} mixed operations over {accounts:,} accounts")
+    amounts = [1.25, 0.1, 19.99, 3.5, 0.01]
+
+    # 1. the raw balance representations, identical loop shape for all three
+    columns = (
+        ("float", array('d', bytes(8 * accounts)), amounts),
+        ("fixed-point", array('q', bytes(8 * accounts)), [round(a * 100) for a in amounts]),
+        ("Decimal", [Decimal(0)] * accounts, [Decimal(str(a)) for a in amounts]),
+    )
+    for label, balances, values in columns:
+        start = time.perf_counter()
+        for k in range(ops):
+            i = k % accounts
+            amount = values[k % 5]
+            if k & 1 and balances[i] >= amount:
+                balances[i] -= amount
+            else:
+                balances[i] += amount
+        elapsed = time.perf_counter() - start
+        print(f"  column  {label:<12} {ops / elapsed:>12,.0f} ops/s")
+
+    # 2. end to end through AccountLedger, including validation and the cents conversion
+    for label, fixed_point in (("float", False), ("fixed-point", True)):
+        ledger = AccountLedger(fixed_point=fixed_point)
+        ledger.open_accounts(accounts)
+        start = time.perf_counter()
+        for k in range(ops):
+            i = k % accounts
+            amount = amounts[k % 5]
+            if k & 1 and ledger.get_balance(i) >= amount:
+                ledger.withdraw(i, amount)
+            else:
+                ledger.deposit(i, amount)
+        elapsed = time.perf_counter() - start
+        print(f"  ledger  {label:<12} {ops / elapsed:>12,.0f} ops/s   total={ledger.total_balance():,.2f}")
+
+if __name__ == "__main__":
+    bench_concurrent_transfers()
+    bench_journal_recovery()
+    bench_fixed_point()
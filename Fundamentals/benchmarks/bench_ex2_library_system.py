@@ -0,0 +1,237 @@
+"""
+Benchmarks for ex2_library_system.py
+====================================
+
+Plain wall-clock benchmarks, no third-party harness needed.
+
+Usage:
+    Run all benchmarks:    python benchmarks/bench_ex2_library_system.py
+"""
+
+import csv
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from itertools import accumulate
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ex2_library_system import Book, CatalogSnapshot, InvertedIndex, Library
+
+
+def _vocabulary(size: int, rng: random.Random) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choices(letters, k=rng.randint(3, 9))) for _ in range(size)]
+
+
+def _catalog(books: int, seed: int = 7) -> list[tuple[str, str, str]]:
+    """Synthetic (title, author, isbn) rows with a skewed, Zipf-like word distribution."""
+    rng = random.Random(seed)
+    words = _vocabulary(20_000, rng)
+    cum_weights = list(accumulate(1 / (rank + 1) for rank in range(len(words))))
+    authors = [" ".join(rng.choices(words, k=2)).title() for _ in range(50_000)]
+    rows = []
+    for i in range(books):
+        title = " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(2, 6))).capitalize()
+        rows.append((title, authors[i % len(authors)], f"978-{i:09d}"))
+    return rows
+
+
+def bench_full_text_search(books: int = 1_000_000, queries: int = 2_000) -> None:
+    """Inverted index build time and AND / OR query latency."""
+    rows = _catalog(books)
+    print(f"full-text search: {books:,} books")
+
+    index = InvertedIndex()
+    start = time.perf_counter()
+    for doc_id, (title, author, _) in enumerate(rows):
+        index.add(doc_id, f"{title} {author}")
+    print(f"  index build:        {time.perf_counter() - start:>8.2f}s")
+
+    rng = random.Random(11)
+    sample = [InvertedIndex.tokenize(rng.choice(rows)[0]) for _ in range(queries)]
+    for mode in ("and", "or"):
+        latencies = []
+        for tokens in sample:
+            query = " ".join(tokens[:2])
+            start = time.perf_counter()
+            index.search(query, mode=mode, limit=10)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1e3
+        p99 = latencies[int(len(latencies) * 0.99)] * 1e3
+        print(f"  {mode.upper():<3} 2-term query:    p50 {p50:>7.2f} ms   p99 {p99:>7.2f} ms")
+
+
+def bench_title_prefix(books: int = 1_000_000, queries: int = 2_000) -> None:
+    """Library.add_book with every index on, then autocomplete latency."""
+    rows = _catalog(books)
+    print(f"title prefix: {books:,} books")
+    library = Library()
+    start = time.perf_counter()
+    for title, author, isbn in rows:
+        library.add_book(Book(title, author, isbn))
+    print(f"  add_book x {books:,}:  {time.perf_counter() - start:>8.2f}s")
+
+    rng = random.Random(3)
+    prefixes = [rng.choice(rows)[0][:rng.randint(1, 5)] for _ in range(queries)]
+    library.find_by_title_prefix("a", limit=10)  # first query folds the unsorted tail in
+    start = time.perf_counter()
+    for prefix in prefixes:
+        library.find_by_title_prefix(prefix, limit=10)
+    print(f"  prefix query, limit 10: {(time.perf_counter() - start) / queries * 1e3:>8.3f} ms")
+
+
+def bench_cold_start(books: int = 1_000_000) -> None:
+    """From a file to a Library that answers search and prefix queries: CSV vs snapshot."""
+    rows = _catalog(books)
+    query = rows[0][0]
+    print(f"cold start: {books:,} books, each load followed by one search and one prefix query")
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "catalog.csv")
+        snapshot_path = os.path.join(tmp, "catalog.snap")
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows(rows)
+
+        def ready(load) -> tuple[float, float, Library]:
+            # seconds to load, seconds until the first queries have answered
+            start = time.perf_counter()
+            library = load()
+            loaded = time.perf_counter() - start
+            library.search(query)
+            library.find_by_title_prefix(query[:3], limit=10)
+            return loaded, time.perf_counter() - start, library
+
+        def add_book_loop() -> Library:
+            library = Library()
+            with open(csv_path, newline="", encoding="utf-8") as f:
+                for title, author, isbn in csv.reader(f):
+                    library.add_book(Book(title, author, isbn))
+            return library
+
+        def csv_bulk() -> Library:
+            library = Library()
+            library.bulk_load_csv(csv_path)
+            return library
+
+        def snapshot_bulk() -> Library:
+            # what restoring a snapshot took before from_snapshot - every Book through bulk_load
+            library = Library()
+            with CatalogSnapshot(snapshot_path) as snapshot:
+                library.bulk_load(snapshot)
+            return library
+
+        loaded, total, library = ready(add_book_loop)
+        print(f"  csv + add_book loop:        load {loaded:>6.2f}s   ready {total:>6.2f}s")
+        loaded, total, library = ready(csv_bulk)
+        print(f"  bulk_load_csv:              load {loaded:>6.2f}s   ready {total:>6.2f}s")
+
+        start = time.perf_counter()
+        library.save_snapshot(snapshot_path)
+        print(f"  save_snapshot:              {time.perf_counter() - start:>11.2f}s   "
+              f"{os.path.getsize(snapshot_path) / 2**20:.1f} MiB with indexes")
+        del library
+        loaded, total, _ = ready(snapshot_bulk)
+        print(f"  snapshot + bulk_load:       load {loaded:>6.2f}s   ready {total:>6.2f}s")
+        loaded, total, _ = ready(lambda: Library.from_snapshot(snapshot_path))
+        print(f"  Library.from_snapshot:      load {loaded:>6.2f}s   ready {total:>6.2f}s")
+
+        with CatalogSnapshot(snapshot_path) as snapshot:
+            rng = random.Random(5)
+            start = time.perf_counter()
+            for _ in range(10_000):
+                snapshot[rng.randrange(len(snapshot))]
+            print(f"  snapshot random access:     {(time.perf_counter() - start) / 10_000 * 1e6:>8.2f} us/book")
+
+
+class _DictBook:
+    """The original Book, attribute for attribute, kept here only as the memory baseline."""
+
+    def __init__(self, title: str, author: str, isbn: str) -> None:
+        self.title = title
+        self.author = author
+        self.isbn = isbn
+        self._is_checked_out = False
+
+
+def _traced_bytes(build) -> tuple[int, object]:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename")), result
+
+
+def bench_book_memory(books: int = 200_000) -> None:
+    """tracemalloc bytes per book: the original dict-backed Book vs the __slots__ Book, with and without interned authors."""
+    print(f"book memory: {books:,} books, {len({a for _, a, _ in _catalog(books)}):,} distinct authors")
+    rows = _catalog(books)
+    holder = Library()
+
+    def dict_books() -> list:
+        # every row brings its own author str, the way a CSV reader hands them out
+        return [_DictBook(t, a.encode().decode(), i) for t, a, i in rows]
+
+    def slot_books(intern: bool) -> list:
+        authors: dict[str, str] = {}  # what Library does in add_book
+        result = []
+        for t, a, i in rows:
+            author = a.encode().decode()
+            result.append(Book(t, authors.setdefault(author, author) if intern else author, i))
+        for book in result:
+            book._library = holder  # what Library does in add_book for a book held by one library
+        return result
+
+    # every figure includes the list holding the books; titles and isbns are shared with `rows`
+    for label, build in (
+        ("original Book, own author str:", dict_books),
+        ("slots Book, own author str:", lambda: slot_books(False)),
+        ("slots Book, interned author:", lambda: slot_books(True)),
+        ):
+        size, kept = _traced_bytes(build)
+        del kept
+        print(f"  {label:<36}{size / books:>8.1f} B/book")
+
+    def library() -> Library:
+        result = Library()
+        result.bulk_load((t, a.encode().decode(), i) for t, a, i in rows)
+        return result
+
+    # for reference, the whole Library with every index built
+    library_bytes, kept = _traced_bytes(library)
+    print(f"  Library total (all indexes):        {library_bytes / books:>8.1f} B/book")
+
+def bench_checkout_contention(threads: int = 64, hot_titles: int = 4, rounds: int = 500) -> None:
+    """64 patrons hammering a handful of hot ISBNs through request_book / return_by_isbn."""
+    library = Library()
+    library.bulk_load((f"Hot title {i}", "Popular Author", f"HOT-{i}") for i in range(hot_titles))
+    print(f"checkout contention: {threads} threads, {hot_titles} hot titles, {rounds} loans each")
+
+    def patron(n: int) -> None:
+        for k in range(rounds):
+            isbn = f"HOT-{(n + k) % hot_titles}"
+            library.request_book(isbn, f"patron-{n}").result()
+            library.return_by_isbn(isbn)
+
+    pool = [threading.Thread(target=patron, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    assert len(library.get_available_books()) == hot_titles
+    print(f"  {threads * rounds / elapsed:>10,.0f} loans/s ({threads * rounds:,} loans in {elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    bench_full_text_search()
+    bench_title_prefix()
+    bench_cold_start()
+    bench_book_memory()
+    bench_checkout_contention()
@@ -0,0 +1,268 @@
+"""
+Benchmarks for ex3_employee_payroll.py
+======================================
+
+Plain wall-clock benchmarks, no third-party harness needed.
+
+Usage:
+    Run all benchmarks:    python benchmarks/bench_ex3_employee_payroll.py
+"""
+
+import contextlib
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Iterator
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ex3_employee_payroll import (
+    CommissionEmployee,
+    ContractEmployee,
+    Employee,
+    FullTimeEmployee,
+    PayslipWriter,
+    SalesLedger,
+    payroll_stats,
+    run_payroll,
+    run_payroll_batch,
+)
+
+
+def _workforce(count: int, seed: int = 1) -> list[Employee]:
+    """A third of each employee type, interleaved, with a few sales per commission employee."""
+    rng = random.Random(seed)
+    employees: list[Employee] = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            employees.append(FullTimeEmployee(f"emp{i}", f"E{i}", base_salary=rng.randint(40_000, 200_000)))
+        elif kind == 1:
+            employees.append(ContractEmployee(f"emp{i}", f"E{i}", hourly_rate=rng.uniform(20, 150),
+                                              hours_worked_this_month=rng.randint(0, 200)))
+        else:
+            e = CommissionEmployee(f"emp{i}", f"E{i}", base_monthly_salary=rng.randint(2_000, 5_000),
+                                   commission_rate=rng.uniform(0.01, 0.1))
+            for _ in range(3):
+                e.add_sale(rng.uniform(100, 10_000))
+            employees.append(e)
+    return employees
+
+
+def bench_batch_payroll(count: int = 1_000_000) -> None:
+    """run_payroll's generate_payslip loop, a bare calculate_monthly_pay loop, and run_payroll_batch."""
+    employees = _workforce(count)
+    print(f"batch payroll: {count:,} employees")
+
+    start = time.perf_counter()
+    for e in employees:
+        e.generate_payslip()
+    payslip_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loop_pay = [e.calculate_monthly_pay() for e in employees]
+    loop_total = sum(loop_pay)
+    loop_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = run_payroll_batch(employees)
+    batch_elapsed = time.perf_counter() - start
+    assert abs(result.total - loop_total) < 1e-6 * loop_total
+
+    print(f"  generate_payslip loop (run_payroll minus print): {payslip_elapsed:>8.3f}s")
+    print(f"  calculate_monthly_pay loop:                      {loop_elapsed:>8.3f}s")
+    print(f"  run_payroll_batch:                               {batch_elapsed:>8.3f}s")
+
+
+def bench_payslip_writer(count: int = 1_000_000, chunk_size: int = 20_000) -> None:
+    """run_payroll printing to a file vs PayslipWriter in-process and on a process pool."""
+    employees = _workforce(count)
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    print(f"payslip output: {count:,} employees, chunk_size={chunk_size:,}, {cores} usable cores")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "payslips.txt")
+
+        start = time.perf_counter()
+        with open(path, "w", encoding="utf-8") as f, contextlib.redirect_stdout(f):
+            run_payroll(employees)
+        baseline = time.perf_counter() - start
+        print(f"  run_payroll (print):      {baseline:>8.2f}s  {count / baseline:>12,.0f} payslips/s")
+
+        # the work a pool cannot take off the parent: pay, the (name, role, pay) row and its pickling.
+        # in-process payslips/s divided by this bounds any pool speedup, however many cores
+        start = time.perf_counter()
+        for i in range(0, count, chunk_size):
+            pickle.dumps([(e.name, e.get_role(), e.monthly_pay()) for e in employees[i:i + chunk_size]])
+        floor = time.perf_counter() - start
+        print(f"  pool, parent side only:   {floor:>8.2f}s  {count / floor:>12,.0f} payslips/s  (upper bound with workers)")
+
+        for workers in sorted({0, 2, 4, cores}):
+            start = time.perf_counter()
+            with PayslipWriter(path, chunk_size=chunk_size, workers=workers) as writer:
+                writer.write(employees)
+            elapsed = time.perf_counter() - start
+            print(f"  PayslipWriter workers={workers:<2}: {elapsed:>8.2f}s  {count / elapsed:>12,.0f} payslips/s")
+
+
+def bench_sales_ledger(rows: int = 5_000_000, periods: int = 120, queries: int = 100_000) -> None:
+    """Bulk sale ingestion, then O(1) period-range pay queries."""
+    rng = random.Random(2)
+    sales = [(rng.randrange(periods), rng.uniform(1, 1_000)) for _ in range(rows)]
+    print(f"sales ledger: {rows:,} sales over {periods} periods")
+
+    ledger = SalesLedger()
+    start = time.perf_counter()
+    ledger.add_many(iter(sales))
+    elapsed = time.perf_counter() - start
+    print(f"  add_many:                 {rows / elapsed:>12,.0f} sales/s")
+
+    ranges = [tuple(sorted((rng.randrange(periods), rng.randrange(periods)))) for _ in range(queries)]
+    start = time.perf_counter()
+    for first, last in ranges:
+        ledger.total_between(first, last)
+    elapsed = time.perf_counter() - start
+    print(f"  total_between:            {elapsed / queries * 1e6:>12.2f} us/query")
+
+
+
+def bench_pay_cache(count: int = 200_000, rounds: int = 20, writes_per_round: int = 1_000) -> None:
+    """Read-heavy dashboard: every round reads everyone's pay, a few commission employees book a sale."""
+    employees = _workforce(count)
+    commission = [e for e in employees if isinstance(e, CommissionEmployee)]
+    print(f"pay cache: {count:,} employees, {rounds} rounds, {writes_per_round:,} sales per round")
+
+    for enabled in (False, True):
+        Employee.pay_cache_enabled = enabled
+        Employee.reset_pay_cache_stats()
+        rng = random.Random(7)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for e in rng.sample(commission, writes_per_round):
+                e.add_sale(100.0)
+            for e in employees:
+                e.monthly_pay()
+        elapsed = time.perf_counter() - start
+        label = "cache on" if enabled else "cache off"
+        print(f"  {label + ':':<25} {count * rounds / elapsed:>12,.0f} reads/s  {Employee.pay_cache_stats()}")
+
+    # pure reads per type - the saving grows with the cost of calculate_monthly_pay
+    for kind in (FullTimeEmployee, ContractEmployee, CommissionEmployee):
+        group = [e for e in employees if type(e) is kind]
+        rates = []
+        for enabled in (False, True):
+            Employee.pay_cache_enabled = enabled
+            for e in group:
+                e.monthly_pay()
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for e in group:
+                    e.monthly_pay()
+            rates.append(len(group) * rounds / (time.perf_counter() - start))
+        print(f"  {kind.__name__ + ':':<25} {rates[0]:>12,.0f} -> {rates[1]:,.0f} reads/s")
+    Employee.pay_cache_enabled = True
+
+
+
+def _hr_export(count: int, seed: int = 3) -> dict[type, list[tuple]]:
+    """Constructor-ready rows per employee type, a third of count each."""
+    rng = random.Random(seed)
+    third = count // 3
+    return {
+        FullTimeEmployee: [(f"emp{i}", f"E{i}", rng.randint(40_000, 200_000)) for i in range(third)],
+        ContractEmployee: [(f"emp{i}", f"C{i}", rng.uniform(20, 150), rng.randint(0, 200)) for i in range(third)],
+        CommissionEmployee: [(f"emp{i}", f"S{i}", rng.randint(2_000, 5_000), rng.uniform(0.01, 0.1))
+                             for i in range(third)],
+    }
+
+
+def _traced_bytes(build) -> tuple[int, object]:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return sum(stat.size_diff for stat in after.compare_to(before, "filename")), result
+
+
+def bench_bulk_load(count: int = 1_000_000) -> None:
+    """Loading an HR export: one constructor call per row vs from_records, plus bytes per employee."""
+    export = _hr_export(count)
+    print(f"bulk load: {count:,} employees")
+    for kind, rows in export.items():
+        start = time.perf_counter()
+        one_by_one = [kind(*row) for row in rows]
+        ctor_elapsed = time.perf_counter() - start
+        del one_by_one
+
+        start = time.perf_counter()
+        bulk = kind.from_records(rows)
+        bulk_elapsed = time.perf_counter() - start
+        del bulk
+
+        # names and ids are shared with the export rows, so this is the employee objects themselves
+        size, kept = _traced_bytes(lambda: kind.from_records(rows))
+        del kept
+        print(f"  {kind.__name__ + ':':<25} __init__ {len(rows) / ctor_elapsed:>10,.0f}/s   "
+              f"from_records {len(rows) / bulk_elapsed:>10,.0f}/s   {size / len(rows):>6.1f} B/employee")
+
+
+
+def _employee_stream(count: int, seed: int = 11) -> Iterator[Employee]:
+    """Employees generated one at a time, never held in a list."""
+    rng = random.Random(seed)
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            yield FullTimeEmployee(f"emp{i}", f"E{i}", base_salary=rng.lognormvariate(11, 0.4))
+        elif kind == 1:
+            yield ContractEmployee(f"emp{i}", f"E{i}", hourly_rate=rng.uniform(20, 150),
+                                   hours_worked_this_month=rng.randint(0, 200))
+        else:
+            e = CommissionEmployee(f"emp{i}", f"E{i}", base_monthly_salary=rng.randint(2_000, 5_000),
+                                   commission_rate=0.05)
+            e.add_sale(rng.expovariate(1 / 20_000))
+            yield e
+
+
+def bench_payroll_stats(count: int = 1_000_000) -> None:
+    """payroll_stats over a generator: throughput, peak traced memory, and error against exact percentiles."""
+    print(f"payroll stats: {count:,} streamed employees")
+    start = time.perf_counter()
+    for _ in _employee_stream(count):
+        pass
+    generate_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stats = payroll_stats(_employee_stream(count))
+    elapsed = time.perf_counter() - start - generate_elapsed
+    print(f"  payroll_stats:            {count / elapsed:>12,.0f} employees/s (generator cost subtracted)")
+
+    tracemalloc.start()
+    payroll_stats(_employee_stream(count // 10))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  peak traced memory:       {peak / 1024:>12,.0f} KiB for {count // 10:,} employees")
+
+    exact: dict[str, list[float]] = {}
+    for e in _employee_stream(count):
+        exact.setdefault(e.get_role(), []).append(e.calculate_monthly_pay())
+    for role, pays in exact.items():
+        pays.sort()
+        errors = []
+        for p in (50, 95, 99):
+            true = pays[int(p / 100 * (len(pays) - 1))]
+            errors.append(abs(stats[role].percentile(p) - true) / true if true else 0.0)
+        print(f"  {role + ':':<27} p50/p95/p99 rel. error {' / '.join(f'{x:.4f}' for x in errors)}")
+
+
+if __name__ == "__main__":
+    bench_batch_payroll()
+    bench_payslip_writer()
+    bench_sales_ledger()
+    bench_pay_cache()
+    bench_bulk_load()
+    bench_payroll_stats()
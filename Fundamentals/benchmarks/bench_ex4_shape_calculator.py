@@ -0,0 +1,315 @@
+"""
+Benchmarks for ex4_shape_calculator.py
+======================================
+
+Plain wall-clock benchmarks, no third-party harness needed.
+
+Usage:
+    Run all benchmarks:    python benchmarks/bench_ex4_shape_calculator.py
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from math import cos, fsum, hypot, pi, sin
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ex4_shape_calculator import (
+    SHAPE_ROW,
+    SHAPES_HEADER,
+    SHAPES_MAGIC,
+    AreaIndex,
+    Circle,
+    CompositeShape,
+    Polygon,
+    Rectangle,
+    ShapeBatch,
+    SpatialGrid,
+    Triangle,
+    largest_shape,
+    parallel_summarize,
+    read_shapes_binary,
+    read_shapes_ndjson,
+    shapes_larger_than,
+    summarize_shapes,
+    total_area,
+    write_shapes_binary,
+    write_shapes_ndjson,
+)
+
+
+def _dimensions(count: int, seed: int = 1) -> tuple[array, array, array]:
+    """Three columns of valid dimensions; (x, y, z) is always a valid triangle."""
+    rng = random.Random(seed)
+    x = array('d', [rng.uniform(1, 10) for _ in range(count)])
+    y = array('d', [v + rng.uniform(0.5, 2) for v in x])
+    z = array('d', [v + rng.uniform(0, 0.5) for v in y])
+    return x, y, z
+
+
+def _timed(fn) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def bench_shape_batch(count: int = 10_000_000, object_count: int = 2_000_000, threshold: float = 300.0) -> None:
+    """The three helpers on a list of Shape objects vs on a column-only ShapeBatch.
+
+    Ten million Shape objects need several GB, so the list side runs on object_count shapes and
+    both sides are reported per shape - the list helpers are a plain linear loop either way.
+    The batch answers total_area and largest_shape from values kept up to date while it is built,
+    so its build cost is reported with the query: that is what one query really costs.
+    """
+    third = count // 3
+    x, y, z = _dimensions(third)
+    batch = ShapeBatch()
+    build, _ = _timed(lambda: (batch.add_circles(x), batch.add_rectangles(x, y), batch.add_triangles(x, y, z)))
+    per_build = build / len(batch) * 1e9
+    print(f"shape batch: {len(batch):,} shapes in the batch, {object_count:,} in the object list")
+    print(f"  ShapeBatch build:         {per_build:>10.1f} ns/shape (areas + perimeters included)")
+
+    k = object_count // 3
+    objects = ([Circle(r) for r in x[:k]] + [Rectangle(w, h) for w, h in zip(x[:k], y[:k])]
+               + [Triangle(a, b, c) for a, b, c in zip(x[:k], y[:k], z[:k])])
+    for name, on_list, on_batch in (
+        ("total_area", lambda: total_area(objects), lambda: total_area(batch)),
+        ("largest_shape", lambda: largest_shape(objects), lambda: largest_shape(batch)),
+        ("shapes_larger_than", lambda: shapes_larger_than(threshold, objects),
+         lambda: shapes_larger_than(threshold, batch)),
+    ):
+        list_elapsed, _ = _timed(on_list)
+        batch_elapsed, _ = _timed(on_batch)
+        per_list = list_elapsed / len(objects) * 1e9
+        per_query = batch_elapsed / len(batch) * 1e9
+        saved = per_list - per_query
+        # how many queries it takes before building the batch has paid for itself
+        break_even = f"{per_build / saved:,.1f} queries" if saved > 0 else "never"
+        print(f"  {name + ':':<20} list {per_list:>6.1f} ns/shape   batch build + query {per_build + per_query:>7.1f} "
+              f"(query {per_query:.4f})   x{per_list / (per_build + per_query):.2f}   break-even {break_even}")
+
+
+_evaluations = [0]
+
+
+class _CountingCircle(Circle):
+    """Memoized, as shipped: counts real area computations."""
+    __slots__ = ()
+
+    def _compute_area(self) -> float:
+        _evaluations[0] += 1
+        return super()._compute_area()
+
+
+class _RecomputingCircle(_CountingCircle):
+    """The old behaviour: every area() call recomputes."""
+    __slots__ = ()
+
+    def area(self) -> float:
+        return self._compute_area()
+
+
+def bench_sort(count: int = 500_000) -> None:
+    """sorted(shapes) through __lt__: area evaluations and time, recomputing vs memoized area()."""
+    x, _, _ = _dimensions(count)
+    print(f"sort: {count:,} circles")
+    for label, kind in (("recompute every call", _RecomputingCircle), ("memoized", _CountingCircle)):
+        shapes = [kind(r) for r in x]
+        _evaluations[0] = 0
+        elapsed, _ = _timed(lambda: sorted(shapes))
+        print(f"  {label + ':':<25} {_evaluations[0]:>12,} area evaluations   {elapsed:.2f}s")
+
+
+def _scattered_shapes(count: int, side: float, seed: int = 2) -> list:
+    """count small positioned shapes spread uniformly over a side x side square."""
+    rng = random.Random(seed)
+    shapes = []
+    for i in range(count):
+        x, y = rng.uniform(0, side), rng.uniform(0, side)
+        kind = i % 3
+        if kind == 0:
+            shapes.append(Circle(rng.uniform(0.2, 1.5), x, y))
+        elif kind == 1:
+            shapes.append(Rectangle(rng.uniform(0.2, 2), rng.uniform(0.2, 2), x, y))
+        else:
+            a = rng.uniform(0.5, 2)
+            shapes.append(Triangle(a, a + 0.3, a + 0.4, x, y))
+    return shapes
+
+
+def bench_spatial_grid(count: int = 1_000_000, queries: int = 5_000, side: float = 2_000.0) -> None:
+    """SpatialGrid bulk load plus point and 10x10 range query throughput, against a full scan."""
+    shapes = _scattered_shapes(count, side)
+    print(f"spatial grid: {count:,} shapes over {side:,.0f} x {side:,.0f}")
+    load, grid = _timed(lambda: SpatialGrid.bulk_load(shapes))
+    print(f"  bulk_load:                {load:>10.2f} s   cell size {grid.cell_size():.2f}")
+
+    rng = random.Random(9)
+    points = [(rng.uniform(0, side), rng.uniform(0, side)) for _ in range(queries)]
+    elapsed, found = _timed(lambda: [grid.query_point(x, y) for x, y in points])
+    print(f"  query_point:              {queries / elapsed:>10,.0f} queries/s   "
+          f"{sum(map(len, found)) / queries:.2f} hits/query")
+
+    ranges = [(x, y, x + 10, y + 10) for x, y in points]
+    elapsed, found = _timed(lambda: [grid.query_range(*r) for r in ranges])
+    print(f"  query_range (10 x 10):    {queries / elapsed:>10,.0f} queries/s   "
+          f"{sum(map(len, found)) / queries:.1f} hits/query")
+
+    x, y = points[0]
+    elapsed, _ = _timed(lambda: [s for s in shapes if s.contains_point(x, y)])
+    print(f"  full scan, one point:     {1 / elapsed:>10,.2f} queries/s")
+
+
+def bench_area_index(count: int = 1_000_000, queries: int = 200, updates: int = 10_000) -> None:
+    """Many thresholds against one shape set: list scans vs AreaIndex, plus top_k and insert/remove."""
+    shapes = _scattered_shapes(count, 1_000.0)
+    build, index = _timed(lambda: AreaIndex(shapes))
+    print(f"area index: {count:,} shapes, built in {build:.2f} s")
+
+    rng = random.Random(5)
+    areas = sorted(s.area() for s in shapes)
+    # thresholds around the top percentile - the "which shapes are unusually big" queries
+    thresholds = [areas[int(count * rng.uniform(0.98, 0.999))] for _ in range(queries)]
+    scan, _ = _timed(lambda: [shapes_larger_than(t, shapes) for t in thresholds])
+    indexed, _ = _timed(lambda: [shapes_larger_than(t, index) for t in thresholds])
+    print(f"  shapes_larger_than:       list {scan / queries * 1e3:>8.2f} ms   index {indexed / queries * 1e3:>8.3f} ms"
+          f"   x{scan / indexed:,.0f}")
+
+    scan, _ = _timed(lambda: sorted(shapes, key=lambda s: s.area(), reverse=True)[:10])
+    indexed, _ = _timed(lambda: [index.top_k(10) for _ in range(queries)])
+    print(f"  top 10:                   sort {scan * 1e3:>8.2f} ms   index {indexed / queries * 1e6:>8.2f} us")
+
+    extra = _scattered_shapes(updates, 1_000.0, seed=6)
+    elapsed, _ = _timed(lambda: [index.insert(s) for s in extra])
+    print(f"  insert:                   {updates / elapsed:>12,.0f} shapes/s")
+    elapsed, _ = _timed(lambda: [index.remove(s) for s in extra])
+    print(f"  remove:                   {updates / elapsed:>12,.0f} shapes/s")
+
+
+def _peak_traced(fn) -> tuple[int, object]:
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, result
+
+
+def bench_streaming(count: int = 1_000_000) -> None:
+    """Parse + validate + summarize a shape file: NDJSON vs binary rows, and peak memory vs a list."""
+    shapes = _scattered_shapes(count, 1_000.0)
+    print(f"streaming: {count:,} shapes")
+    with tempfile.TemporaryDirectory() as tmp:
+        text_path = os.path.join(tmp, "shapes.ndjson")
+        binary_path = os.path.join(tmp, "shapes.bin")
+        written, _ = _timed(lambda: write_shapes_ndjson(text_path, shapes))
+        print(f"  write NDJSON:             {count / written:>12,.0f} shapes/s   "
+              f"{os.path.getsize(text_path) / count:.0f} B/shape")
+        written, _ = _timed(lambda: write_shapes_binary(binary_path, shapes))
+        print(f"  write binary:             {count / written:>12,.0f} shapes/s   "
+              f"{os.path.getsize(binary_path) / count:.0f} B/shape")
+        del shapes
+
+        for label, read, path in (("NDJSON", read_shapes_ndjson, text_path), ("binary", read_shapes_binary, binary_path)):
+            elapsed, summary = _timed(lambda: summarize_shapes(read(path)))
+            print(f"  read + summarize {label + ':':<9} {count / elapsed:>12,.0f} shapes/s   "
+                  f"total area {summary.total_area:,.0f}")
+
+        streamed, _ = _peak_traced(lambda: summarize_shapes(read_shapes_binary(binary_path)))
+
+        def from_list() -> tuple:
+            loaded = list(read_shapes_binary(binary_path))
+            return total_area(loaded), largest_shape(loaded)
+
+        listed, _ = _peak_traced(from_list)
+        print(f"  peak traced memory:       streamed {streamed / 1024:,.0f} KiB   list {listed / 2**20:,.0f} MiB")
+
+
+def _write_big_shape_file(path: str, count: int, block: int = 1_000_000) -> None:
+    """A binary shape file of count rows, written as one random block of rows repeated."""
+    block = min(block, count)
+    with tempfile.TemporaryDirectory() as tmp:
+        sample = os.path.join(tmp, "block.bin")
+        write_shapes_binary(sample, _scattered_shapes(block, 1_000.0))
+        with open(sample, "rb") as f:
+            rows = f.read()[SHAPES_HEADER.size:]
+    with open(path, "wb") as f:
+        f.write(SHAPES_HEADER.pack(SHAPES_MAGIC, count))
+        for _ in range(count // block):
+            f.write(rows)
+        f.write(rows[:(count % block) * SHAPE_ROW.size])
+
+
+def bench_parallel_scaling(count: int = 50_000_000, max_workers: int = 0) -> None:
+    """parallel_summarize over a binary shape file with 1..N worker processes (N = cpu count by default)."""
+    max_workers = max_workers or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "shapes.bin")
+        _write_big_shape_file(path, count)
+        print(f"parallel scaling: {count:,} shapes ({os.path.getsize(path) / 2**30:.1f} GiB), {os.cpu_count()} CPUs")
+
+        serial, expected = _timed(lambda: parallel_summarize(path, workers=0, shards=1))
+        print(f"  in-process, one shard:    {serial:>8.2f} s   {count / serial:>12,.0f} shapes/s")
+        workers = 1
+        while workers <= max_workers:
+            elapsed, summary = _timed(lambda: parallel_summarize(path, workers=workers))
+            assert summary.count == expected.count and summary.largest.area() == expected.largest.area()
+            drift = abs(summary.total_area - expected.total_area) / expected.total_area
+            print(f"  {workers:>3} worker(s):             {elapsed:>8.2f} s   {count / elapsed:>12,.0f} shapes/s"
+                  f"   x{serial / elapsed:.2f}   rel. diff {drift:.1e}")
+            workers *= 2
+
+
+def _loop_shoelace(points: list[tuple[float, float]]) -> tuple[float, float]:
+    """Area and perimeter with a plain per-vertex Python loop, for comparison."""
+    area = perimeter = 0.0
+    x0, y0 = points[-1]
+    for x1, y1 in points:
+        area += x0 * y1 - x1 * y0
+        perimeter += hypot(x1 - x0, y1 - y0)
+        x0, y0 = x1, y1
+    return abs(area) * 0.5, perimeter
+
+
+def bench_polygons(vertices: int = 1_000, polygons: int = 2_000, children: int = 10_000) -> None:
+    """Polygon area/perimeter over vertex columns vs a per-vertex loop; CompositeShape add/remove vs recompute."""
+    rng = random.Random(4)
+    shapes = []
+    for _ in range(polygons):
+        radii = [rng.uniform(5, 10) for _ in range(vertices)]
+        shapes.append([(r * cos(2 * pi * i / vertices), r * sin(2 * pi * i / vertices)) for i, r in enumerate(radii)])
+    print(f"polygons: {polygons:,} star-shaped polygons of {vertices:,} vertices")
+    loop, _ = _timed(lambda: [_loop_shoelace(points) for points in shapes])
+    built, objects = _timed(lambda: [Polygon(points) for points in shapes])
+    columns, _ = _timed(lambda: [(p.area(), p.perimeter()) for p in objects])
+    print(f"  per-vertex loop:          {loop / polygons * 1e6:>10.1f} us/polygon")
+    print(f"  Polygon columns:          {columns / polygons * 1e6:>10.1f} us/polygon   x{loop / columns:.2f}"
+          f"   (construction {built / polygons * 1e6:.1f} us)")
+    as_tuples, _ = _peak_traced(lambda: [[(x + 0.0, y + 0.0) for x, y in points] for points in shapes])
+    as_columns, _ = _peak_traced(lambda: [Polygon(points) for points in shapes])
+    print(f"  memory per vertex:        tuples {as_tuples / (polygons * vertices):>6.1f} B"
+          f"   columns {as_columns / (polygons * vertices):>6.1f} B")
+
+    parts = _scattered_shapes(children, 100.0)
+    group = CompositeShape(parts)
+    extra = _scattered_shapes(1_000, 100.0, seed=3)
+    incremental, _ = _timed(lambda: [(group.add(s), group.area(), group.remove(s), group.area()) for s in extra])
+    recompute, _ = _timed(lambda: [fsum(s.area() for s in group.shapes()) for _ in range(2 * len(extra))])
+    print(f"composite of {children:,} shapes, add/remove + area():")
+    print(f"  incremental:              {incremental / (2 * len(extra)) * 1e6:>10.2f} us/update")
+    print(f"  recompute the sum:        {recompute / (2 * len(extra)) * 1e6:>10.2f} us/update"
+          f"   x{recompute / incremental:,.0f}")
+
+
+if __name__ == "__main__":
+    bench_shape_batch()
+    bench_sort()
+    bench_spatial_grid()
+    bench_area_index()
+    bench_streaming()
+    bench_polygons()
+    bench_parallel_scaling()
@@ -0,0 +1,86 @@
+"""
+Benchmarks for ex5_notification_system.py
+=========================================
+
+Plain wall-clock benchmarks, no third-party harness needed.
+
+Usage:
+    Run all benchmarks:    python benchmarks/bench_ex5_notification_system.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from ex5_notification_system import AsyncNotificationChannel, NotificationChannel, NotificationService
+
+
+class _BlockingChannel(NotificationChannel):
+    """A channel that waits on the network the blocking way, like an SMTP client."""
+
+    def __init__(self, name: str, latency: float) -> None:
+        self.__name = name
+        self.__latency = latency
+
+    def send(self, recipient: str, message: str) -> bool:
+        time.sleep(self.__latency)
+        return True
+
+    def channel_type(self) -> str:
+        return self.__name
+
+
+class _AsyncChannel(AsyncNotificationChannel):
+    """The same latency behind a coroutine."""
+
+    def __init__(self, name: str, latency: float) -> None:
+        self.__name = name
+        self.__latency = latency
+
+    async def send_async(self, recipient: str, message: str) -> bool:
+        await asyncio.sleep(self.__latency)
+        return True
+
+    def channel_type(self) -> str:
+        return self.__name
+
+
+def _timed(fn) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+async def _awaited(service: NotificationService, rounds: int, **kwargs) -> tuple[float, dict[str, str]]:
+    """Seconds per notify_async call as the caller sees it, inside one event loop."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        statuses = await service.notify_async("user", "hi", **kwargs)
+    return (time.perf_counter() - start) / rounds, statuses
+
+
+def bench_fan_out(channels: int = 8, slow_latency: float = 1.0, latency: float = 0.1, rounds: int = 3) -> None:
+    """notify vs notify_async with one slow channel (SMTP-like) and channels - 1 fast ones."""
+    print(f"fan-out: {channels} channels, one at {slow_latency:.1f}s, the rest at {latency:.1f}s, {rounds} rounds")
+    for label, kind in (("blocking channels", _BlockingChannel), ("async channels", _AsyncChannel)):
+        service = NotificationService([kind("smtp", slow_latency)] + [kind(f"ch{i}", latency) for i in range(channels - 1)])
+        sequential, _ = _timed(lambda: [service.notify("user", "hi") for _ in range(rounds)])
+        sequential /= rounds
+        concurrent, _ = asyncio.run(_awaited(service, rounds))
+        print(f"  {label}:")
+        print(f"    notify:                 {sequential:>8.3f} s/call")
+        print(f"    notify_async:           {concurrent:>8.3f} s/call   x{sequential / concurrent:.1f}")
+
+        # a timed-out blocking send keeps its worker thread until it finishes, and asyncio.run waits
+        # for those threads on exit - hence the separate "with asyncio.run" figure
+        limit = latency * 2
+        whole, (bounded, statuses) = _timed(lambda: asyncio.run(_awaited(service, rounds, timeouts={"smtp": limit})))
+        print(f"    smtp timeout {limit:.1f}s:       {bounded:>8.3f} s/call   smtp {statuses['smtp']}   "
+              f"with asyncio.run {whole / rounds:.3f} s/call")
+
+
+if __name__ == "__main__":
+    bench_fan_out()
@@ -1,38 +1,439 @@
-class BankAccount:
-    def __init__(self) -> None:
-        self.__balance = 0
+import os
+import struct
+import threading
+from array import array
+from contextlib import contextmanager, nullcontext
+from math import isfinite
+from typing import ContextManager, Iterator, Optional, Sequence
+
+
+# shared no-op guard for the unlocked single-threaded mode, built once instead of per call
+_NO_LOCK = nullcontext()
+
+
+@contextmanager
+def _acquire_in_order(locks: list[threading.Lock]) -> Iterator[None]:
+    for lock in locks:
+        lock.acquire()
+    try:
+        yield
+    finally:
+        for lock in reversed(locks):
+            lock.release()
+
+
+class AccountJournal:
+    # append-only write-ahead log, one fixed-size record per event:
+    # op (1 byte) | source row (8) | target row (8) | amount (8)
+    RECORD = struct.Struct('<BQQd')
+    OPEN, DEPOSIT, WITHDRAW, TRANSFER = range(4)
     
-    def deposit(self, amount: float) -> None:
+    def __init__(self, path: str, group_size: int = 1024, sync: bool = True) -> None:
+        if not isinstance(group_size, int):
+            raise TypeError("group_size must be an integer")
+        if group_size <= 0:
+            raise ValueError("group_size must be positive")
+        
+        self.__file = open(path, 'ab')
+        self.__group_size = group_size
+        self.__sync = sync
+        self.__lock = threading.Lock()
+        # group commit: records are staged here and hit the disk (and fsync) once per batch
+        self.__pending = bytearray()
+        self.__pending_count = 0
+    
+    def append(self, op: int, source: int, target: int, amount: float) -> None:
+        with self.__lock:
+            self.__pending += self.RECORD.pack(op, source, target, amount)
+            self.__pending_count += 1
+            if self.__pending_count >= self.__group_size:
+                self.__commit()
+    
+    def flush(self) -> int:
+        # makes every appended event durable, returns the journal size in bytes
+        with self.__lock:
+            self.__commit()
+            # seek instead of tell: recover() may have truncated the file under this append handle
+            return self.__file.seek(0, os.SEEK_END)
+    
+    def close(self) -> None:
+        self.flush()
+        self.__file.close()
+    
+    def __commit(self) -> None:
+        if self.__pending:
+            self.__file.write(self.__pending)
+            self.__pending.clear()
+            self.__pending_count = 0
+        self.__file.flush()
+        if self.__sync:
+            os.fsync(self.__file.fileno())
+
+
+class AccountLedger:
+    # snapshot header: magic | journal offset the snapshot covers | number of rows | column typecode
+    SNAPSHOT_HEADER = struct.Struct('<8sQQc')
+    SNAPSHOT_MAGIC = b'LEDGSNAP'
+    
+    def __init__(
+        self,
+        lock_stripes: int = 0,
+        journal: Optional[AccountJournal] = None,
+        fixed_point: bool = False,
+        ) -> None:
+        if not isinstance(lock_stripes, int):
+            raise TypeError("lock_stripes must be an integer")
+        if lock_stripes < 0:
+            raise ValueError("lock_stripes cannot be negative")
+        
+        # every balance lives in one contiguous column, an account is just a row index into it.
+        # fixed-point mode keeps exact integer cents ('q'), the default keeps float amounts ('d')
+        self.__fixed_point = fixed_point
+        self.__balances = array('q' if fixed_point else 'd')
+        
+        # lock striping: row i is guarded by stripe i % lock_stripes.
+        # 0 stripes = single-threaded mode, no locking at all
+        self.__stripes = [threading.Lock() for _ in range(lock_stripes)]
+        
+        # events are journaled while the stripe is still held, so events touching the same
+        # row are logged in exactly the order they were applied
+        self.__journal = journal
+    
+    def __locked(self, *indices: int) -> ContextManager:
+        if not self.__stripes:
+            return _NO_LOCK
+        n = len(self.__stripes)
+        # global lock-ordering rule: stripes are always taken in ascending stripe number,
+        # so transfer(a, b) and transfer(b, a) can never wait on each other in a cycle
+        return _acquire_in_order([self.__stripes[i] for i in sorted({index % n for index in indices})])
+    
+    def __locked_all(self) -> ContextManager:
+        return self.__locked(*range(len(self.__stripes)))
+    
+    # largest fixed-point amount in cents: past 2**53 a float cannot hold every whole cent, and the
+    # 'q' column (about 9.2e18) is not far beyond
+    MAX_CENTS = 2 ** 53
+    
+    def __to_units(self, amount: float) -> float:
+        # storage units of the balance column: the amount itself, or whole cents in fixed-point mode
+        if not self.__fixed_point:
+            return amount
+        if not isfinite(amount):
+            raise ValueError("Amount must be a finite number")
+        scaled = amount * 100
+        if abs(scaled) > self.MAX_CENTS:
+            raise ValueError("Amount is too large for a fixed-point ledger")
+        cents = round(scaled)
+        # amount * 100 carries the float error of both the amount and the product, and that grows
+        # with the amount - a fixed tolerance would reject valid cents on large balances
+        if abs(scaled - cents) > max(1e-6, abs(scaled) * 1e-12):
+            raise ValueError("Amount has more precision than one cent")
+        return cents
+    
+    def __from_units(self, units: float) -> float:
+        return units / 100 if self.__fixed_point else units
+    
+    def open_account(self) -> 'BankAccount':
+        return self.account(self.open_accounts(1).start)
+    
+    def open_accounts(self, count: int) -> range:
+        if not isinstance(count, int):
+            raise TypeError("count must be an integer")
+        if count < 0:
+            raise ValueError("count cannot be negative")
+        
+        with self.__locked_all():
+            start = len(self.__balances)
+            # zero filled block in a single allocation instead of one append per account
+            self.__balances.frombytes(bytes(self.__balances.itemsize * count))
+            if self.__journal is not None:
+                self.__journal.append(AccountJournal.OPEN, count, 0, 0.0)
+        return range(start, start + count)
+    
+    def account(self, index: int) -> 'BankAccount':
+        if not isinstance(index, int):
+            raise TypeError("index must be an integer")
+        if not (0 <= index < len(self.__balances)):
+            raise IndexError(f"No account at index {index}")
+        return BankAccount._from_ledger(self, index)
+    
+    def deposit(self, index: int, amount: float) -> None:
         if amount <= 0:
             raise ValueError("Negative deposit is not allowed")
         
-        self.__balance += amount
-        
-    def withdraw(self, amount: float) -> None:
+        if self.__fixed_point:
+            amount = self.__to_units(amount)
+        with self.__locked(index):
+            self.__balances[index] += amount
+            if self.__journal is not None:
+                self.__journal.append(AccountJournal.DEPOSIT, index, index, amount)
+    
+    def withdraw(self, index: int, amount: float) -> None:
         if amount <= 0:
             raise ValueError("Negative amount cannot be withdrawn")
         
-        if amount > self.__balance:
-            raise ValueError("You do not have enough balance to withdraw")
+        if self.__fixed_point:
+            amount = self.__to_units(amount)
+        # check-then-act must happen under the row's stripe or two threads can overdraw
+        with self.__locked(index):
+            if amount > self.__balances[index]:
+                raise ValueError("You do not have enough balance to withdraw")
+            
+            self.__balances[index] -= amount
+            if self.__journal is not None:
+                self.__journal.append(AccountJournal.WITHDRAW, index, index, amount)
+    
+    def transfer(self, source: int, target: int, amount: float) -> None:
+        if amount <= 0:
+            raise ValueError("Negative amount cannot be transferred")
+        
+        if self.__fixed_point:
+            amount = self.__to_units(amount)
+        with self.__locked(source, target):
+            if amount > self.__balances[source]:
+                raise ValueError("You do not have enough balance to transfer")
+            
+            self.__balances[source] -= amount
+            self.__balances[target] += amount
+            if self.__journal is not None:
+                self.__journal.append(AccountJournal.TRANSFER, source, target, amount)
+    
+    def get_balance(self, index: int) -> float:
+        return self.__from_units(self.__balances[index])
+    
+    def transfer_many(
+        self,
+        sources: Sequence[int],
+        targets: Sequence[int],
+        amounts: Sequence[float],
+        ) -> dict[int, str]:
+        # all-or-nothing settlement: returns {row: reason} for every rejected row.
+        # An empty dict means every transfer in the batch was applied.
+        if not (len(sources) == len(targets) == len(amounts)):
+            raise ValueError("sources, targets and amounts must have the same length")
+        
+        with self.__locked_all():
+            return self.__transfer_many(sources, targets, amounts)
+    
+    def __transfer_many(
+        self,
+        sources: Sequence[int],
+        targets: Sequence[int],
+        amounts: Sequence[float],
+        ) -> dict[int, str]:
+        balances = self.__balances
+        size = len(balances)
+        rejections: dict[int, str] = {}
+        outgoing: dict[int, float] = {}
+        
+        # pass 1 - validate rows and total up what each source account sends. Anything pass 2
+        # could trip over (a float index, a NaN amount) has to be rejected here
+        for row, (src, dst, amount) in enumerate(zip(sources, targets, amounts)):
+            if not (isinstance(src, int) and isinstance(dst, int)):
+                rejections[row] = "Account index must be an integer"
+            elif not (0 <= src < size and 0 <= dst < size):
+                rejections[row] = "Unknown account"
+            elif not isinstance(amount, (int, float)):
+                rejections[row] = "Amount must be a number"
+            elif not isfinite(amount):
+                rejections[row] = "Amount must be a finite number"
+            elif amount <= 0:
+                rejections[row] = "Negative amount cannot be transferred"
+            else:
+                try:
+                    outgoing[src] = outgoing.get(src, 0) + self.__to_units(amount)
+                except ValueError as e:
+                    rejections[row] = str(e)
+        
+        # funds check against opening balances, so the result does not depend on row order
+        overdrawn = {src for src, total in outgoing.items() if total > balances[src]}
+        if overdrawn:
+            for row, src in enumerate(sources):
+                if src in overdrawn and row not in rejections:
+                    rejections[row] = "You do not have enough balance to transfer"
+        
+        if rejections:
+            return rejections
+        
+        # pass 2 - nothing can fail from here on
+        journal = self.__journal
+        for src, dst, amount in zip(sources, targets, amounts):
+            amount = self.__to_units(amount)
+            balances[src] -= amount
+            balances[dst] += amount
+            if journal is not None:
+                journal.append(AccountJournal.TRANSFER, src, dst, amount)
+        return rejections
+    
+    def total_balance(self) -> float:
+        # whole-book aggregation - a single C level pass over the column
+        return self.__from_units(sum(self.__balances))
+    
+    def snapshot(self, path: str) -> None:
+        # compact point-in-time image: raw balance column + how much of the journal it covers.
+        # Without a journal that offset is unknown, and recovering with offset 0 would replay the
+        # whole log on top of balances that already include it
+        if self.__journal is None:
+            raise ValueError("Cannot snapshot a ledger without a journal")
+        
+        with self.__locked_all():
+            offset = self.__journal.flush()
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(self.SNAPSHOT_HEADER.pack(
+                    self.SNAPSHOT_MAGIC, offset, len(self.__balances), self.__balances.typecode.encode()
+                    ))
+                self.__balances.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+            # atomic swap - a crash mid-write leaves the previous snapshot intact
+            os.replace(tmp_path, path)
+    
+    @classmethod
+    def recover(
+        cls,
+        journal_path: str,
+        snapshot_path: Optional[str] = None,
+        lock_stripes: int = 0,
+        journal: Optional[AccountJournal] = None,
+        fixed_point: bool = False,
+        ) -> 'AccountLedger':
+        # latest snapshot + replay of the journal tail written after it
+        ledger = cls(lock_stripes=lock_stripes, fixed_point=fixed_point)
+        offset = 0
+        if snapshot_path is not None and os.path.exists(snapshot_path):
+            with open(snapshot_path, 'rb') as f:
+                magic, offset, rows, typecode = cls.SNAPSHOT_HEADER.unpack(f.read(cls.SNAPSHOT_HEADER.size))
+                if magic != cls.SNAPSHOT_MAGIC:
+                    raise ValueError(f"{snapshot_path} is not a ledger snapshot")
+                if typecode.decode() != ledger.__balances.typecode:
+                    raise ValueError(f"{snapshot_path} does not match fixed_point={fixed_point}")
+                ledger.__balances.fromfile(f, rows)
+        
+        if os.path.exists(journal_path):
+            end = ledger.__replay(journal_path, offset)
+            # cut off a torn tail record, or the next append would land after its stray bytes and
+            # every record from then on would be misaligned
+            if end < os.path.getsize(journal_path):
+                os.truncate(journal_path, end)
+        # attached only after replay, so replayed events are not journaled a second time
+        ledger.__journal = journal
+        return ledger
+    
+    def __replay(self, journal_path: str, offset: int) -> int:
+        # returns the journal offset right after the last whole record
+        record = AccountJournal.RECORD
+        balances = self.__balances
+        # the journal stores storage units, whole cents come back from the log as floats
+        units = int if self.__fixed_point else float
+        with open(journal_path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        # a torn record at the tail (crash mid-append) was never committed - drop it
+        data = memoryview(data)[:len(data) - len(data) % record.size]
+        for op, source, target, amount in record.iter_unpack(data):
+            amount = units(amount)
+            # events were validated when first applied, replay only re-applies them
+            if op == AccountJournal.TRANSFER:
+                balances[source] -= amount
+                balances[target] += amount
+            elif op == AccountJournal.DEPOSIT:
+                balances[source] += amount
+            elif op == AccountJournal.WITHDRAW:
+                balances[source] -= amount
+            elif op == AccountJournal.OPEN:
+                balances.frombytes(bytes(balances.itemsize * source))
+            else:
+                raise ValueError(f"Unknown journal op {op} in {journal_path}")
+        return offset + len(data)
+    
+    def __len__(self) -> int:
+        return len(self.__balances)
+
+
+class BankAccount:
+    # a thin handle: which ledger, which row. No per-account balance object.
+    __slots__ = ("__ledger", "__index")
+    
+    # standalone accounts all live in one shared default ledger, so each costs a handle plus one
+    # 8 byte row. Rows of collected standalone accounts are zeroed and handed out again
+    __standalone = AccountLedger()
+    __standalone_lock = threading.Lock()
+    __free_rows: list[int] = []
+    
+    def __init__(self) -> None:
+        ledger = BankAccount.__standalone
+        try:
+            index = BankAccount.__free_rows.pop() # list.pop is atomic, no lock needed
+        except IndexError:
+            with BankAccount.__standalone_lock:
+                index = ledger.open_accounts(1).start
+        self.__ledger = ledger
+        self.__index = index
+    
+    def __del__(self) -> None:
+        # ledger handles share their row with other handles; only a standalone account owns its row
+        ledger = getattr(self, "_BankAccount__ledger", None)
+        if ledger is None or ledger is not BankAccount.__standalone:
+            return
+        balance = ledger.get_balance(self.__index)
+        if balance:
+            ledger.withdraw(self.__index, balance)
+        BankAccount.__free_rows.append(self.__index)
+    
+    def __reduce__(self) -> tuple:
+        # copy, deepcopy and pickle all go through here. A copy of a standalone account must open its
+        # own row - sharing one would let the copy's __del__ empty and recycle the original's row
+        if self.__ledger is BankAccount.__standalone:
+            return BankAccount._standalone_with, (self.get_balance(),)
+        return BankAccount._from_ledger, (self.__ledger, self.__index)
+    
+    @classmethod
+    def _standalone_with(cls, balance: float) -> 'BankAccount':
+        account = cls()
+        if balance:
+            account.deposit(balance)
+        return account
+    
+    @classmethod
+    def _from_ledger(cls, ledger: AccountLedger, index: int) -> 'BankAccount':
+        account = cls.__new__(cls)
+        account.__ledger = ledger
+        account.__index = index
+        return account
+    
+    def deposit(self, amount: float) -> None:
+        self.__ledger.deposit(self.__index, amount)
         
-        self.__balance -= amount
+    def withdraw(self, amount: float) -> None:
+        self.__ledger.withdraw(self.__index, amount)
         
     def get_balance(self) -> float:
-        return self.__balance
+        return self.__ledger.get_balance(self.__index)
     
     def transfer(self, amount: float, other: 'BankAccount') -> None:
         if not isinstance(other, BankAccount):
             raise TypeError
+        if other.__ledger is self.__ledger:
+            # same ledger - one atomic step under both rows' stripes
+            self.__ledger.transfer(self.__index, other.__index, amount)
+            return
+        # two ledgers can disagree on what is a valid amount (float vs fixed-point), so put the money
+        # back if the target refuses it
         self.withdraw(amount)
-        other.deposit(amount)
+        try:
+            other.deposit(amount)
+        except Exception:
+            self.deposit(amount)
+            raise
     
     def __str__(self) -> str:
-        return f"Account[balance=${self.__balance:.2f}]"
+        return f"Account[balance=${self.get_balance():.2f}]"
     
     def __eq__(self, other: 'BankAccount') -> bool:
         if not isinstance(other, BankAccount):
             return NotImplemented
-        return self.__balance == other.get_balance()
+        return self.get_balance() == other.get_balance()
     
 if __name__ == "__main__":
     acc1 = BankAccount()
@@ -48,6 +449,11 @@ if __name__ == "__main__":
     print(acc1)
     print(acc2)
     
+    ledger = AccountLedger()
+    ledger.open_accounts(1_000)
+    ledger.account(7).deposit(250)
+    print(ledger.total_balance())
+    
     # Notes:
     # 1. Do not have print statements in class methods! A method that moves money shouldn't also be deciding how to communicate that to the user. In real systems these would be log statements at most, and the UI layer handles user-facing messages.
     # 2. How to decide when to use ValueError & NotImplementedError? 
@@ -1,9 +1,43 @@
+import csv
+import gc
+import math
+import mmap
+import re
+import struct
+import threading
+from array import array
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from heapq import merge, nlargest
+from itertools import accumulate, islice
+from typing import BinaryIO, Iterable, Iterator, Optional, Union
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    # a cold start creates hundreds of thousands of books and lists at once; the cyclic collector
+    # rescanning all of them every 700 allocations is a third of the load time
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
 class Book:
+    # fixed layout, no per-instance __dict__ - matters at millions of books
+    __slots__ = ("title", "author", "isbn", "_is_checked_out", "_library")
+    
     def __init__(self, title: str, author: str, isbn: str) -> None:
         self.title = title
         self.author = author
         self.isbn = isbn
         self._is_checked_out = False
+        # the library holding this book, told about availability changes. A plain reference, so the
+        # usual one-library book costs no container; only a book held by several libraries gets a tuple
+        self._library: Union['Library', tuple['Library', ...], None] = None
     
     def is_available(self) -> bool:
         return not self._is_checked_out
@@ -12,30 +46,439 @@ class Book:
         if not self.is_available():
             raise RuntimeError("Book is already checked out.")
         self._is_checked_out = True
+        self._notify_libraries()
     
     def return_book(self) -> None:
         if self.is_available():
             raise RuntimeError("Book is marked as available.")
         self._is_checked_out = False
+        self._notify_libraries()
+    
+    def _notify_libraries(self) -> None:
+        holder = self._library
+        if holder is None:
+            return
+        if type(holder) is tuple:
+            for library in holder:
+                library._on_availability_change(self)
+        else:
+            holder._on_availability_change(self)
     
     def __repr__(self) -> str:
         return f"Book('{self.title}', '{self.author}', checked_out={self._is_checked_out})"
     
-class Library:
+class InvertedIndex:
+    # BM25 tuning constants, the usual defaults
+    K1 = 1.2
+    B = 0.75
+    _TOKEN = re.compile(r"\w+")
+    
     def __init__(self) -> None:
+        # term : ascending doc ids, and the term frequency at the same position - compact C arrays
+        self.__postings: dict[str, array] = {}
+        self.__frequencies: dict[str, array] = {}
+        self.__doc_lengths = array('I')
+        self.__total_length = 0
+    
+    @classmethod
+    def tokenize(cls, text: str) -> list[str]:
+        return cls._TOKEN.findall(text.casefold())
+    
+    def add(self, doc_id: int, text: str) -> None:
+        # doc ids are handed out in order, so every posting list stays sorted by plain appends
+        if doc_id != len(self.__doc_lengths):
+            raise ValueError(f"Expected doc id {len(self.__doc_lengths)}, got {doc_id}")
+        
+        tokens = self.tokenize(text)
+        counts: dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        
+        for term, count in counts.items():
+            if term not in self.__postings:
+                self.__postings[term] = array('I')
+                self.__frequencies[term] = array('H')
+            self.__postings[term].append(doc_id)
+            self.__frequencies[term].append(min(count, 0xFFFF))
+        
+        self.__doc_lengths.append(len(tokens))
+        self.__total_length += len(tokens)
+    
+    def search(self, query: str, mode: str = "and", limit: Optional[int] = 10) -> list[tuple[int, float]]:
+        # returns (doc id, BM25 score) pairs, best first
+        if mode not in ("and", "or"):
+            raise ValueError("mode must be 'and' or 'or'")
+        
+        query_terms = list(dict.fromkeys(self.tokenize(query)))
+        terms = [t for t in query_terms if t in self.__postings]
+        if not terms:
+            return []
+        
+        scores: dict[int, float] = {}
+        if mode == "and":
+            # a term nobody uses means no document can contain every term
+            if len(terms) != len(query_terms):
+                return []
+            scores = dict.fromkeys(self.__intersect(terms), 0.0)
+            for term in terms:
+                self.__score_term(term, scores, restrict=True)
+        else:
+            for term in terms:
+                self.__score_term(term, scores, restrict=False)
+        
+        # ties broken by doc id so equal scores come back in insertion order
+        if limit is None:
+            return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+    
+    def __intersect(self, terms: list[str]) -> list[int]:
+        # drive from the shortest list. The others are probed with a bisect starting at the last hit,
+        # which skips whole runs of non-matching ids instead of stepping through them
+        lists = sorted((self.__postings[t] for t in terms), key=len)
+        result = []
+        cursors = [0] * len(lists)
+        for doc_id in lists[0]:
+            for i in range(1, len(lists)):
+                postings = lists[i]
+                cursors[i] = bisect_left(postings, doc_id, cursors[i])
+                if cursors[i] == len(postings):
+                    return result
+                if postings[cursors[i]] != doc_id:
+                    break
+            else:
+                result.append(doc_id)
+        return result
+    
+    def __score_term(self, term: str, scores: dict[int, float], restrict: bool) -> None:
+        postings = self.__postings[term]
+        frequencies = self.__frequencies[term]
+        doc_count = len(self.__doc_lengths)
+        avg_length = self.__total_length / doc_count
+        idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+        k1, b = self.K1, self.B
+        lengths = self.__doc_lengths
+        
+        if restrict:
+            # AND mode - only the intersected docs, located in the posting list by bisect
+            for doc_id in scores:
+                tf = frequencies[bisect_left(postings, doc_id)]
+                scores[doc_id] += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths[doc_id] / avg_length))
+        else:
+            for doc_id, tf in zip(postings, frequencies):
+                score = idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths[doc_id] / avg_length))
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+    
+    def __len__(self) -> int:
+        return len(self.__doc_lengths)
+    
+    # serialized form: docs | total length | terms | postings, then doc lengths 'I', cumulative term
+    # byte ends 'Q', cumulative posting counts 'Q', every posting list 'I', every frequency list 'H',
+    # and the utf-8 terms back to back
+    STATE = struct.Struct('<QQQQ')
+    
+    def write(self, f: BinaryIO) -> None:
+        terms = list(self.__postings)
+        encoded = [term.encode('utf-8') for term in terms]
+        ends = array('Q', accumulate(map(len, encoded)))
+        sizes = array('Q', accumulate(len(self.__postings[term]) for term in terms))
+        f.write(self.STATE.pack(len(self.__doc_lengths), self.__total_length, len(terms), sizes[-1] if terms else 0))
+        self.__doc_lengths.tofile(f)
+        ends.tofile(f)
+        sizes.tofile(f)
+        for term in terms:
+            self.__postings[term].tofile(f)
+        for term in terms:
+            self.__frequencies[term].tofile(f)
+        f.write(b''.join(encoded))
+    
+    @classmethod
+    def read(cls, buffer: memoryview) -> 'InvertedIndex':
+        # rebuilds the index from what write() produced - array copies, no tokenizing
+        docs, total_length, term_count, posting_count = cls.STATE.unpack_from(buffer)
+        index = cls()
+        columns = []
+        position = cls.STATE.size
+        for typecode, length in (('I', docs), ('Q', term_count), ('Q', term_count), ('I', posting_count), ('H', posting_count)):
+            column = array(typecode)
+            column.frombytes(buffer[position:position + column.itemsize * length])
+            columns.append(column)
+            position += column.itemsize * length
+        index.__doc_lengths, ends, sizes, postings, frequencies = columns
+        index.__total_length = total_length
+        
+        blob = buffer[position:]
+        term_start = posting_start = 0
+        for term_end, posting_end in zip(ends, sizes):
+            term = str(blob[term_start:term_end], 'utf-8')
+            index.__postings[term] = postings[posting_start:posting_end]
+            index.__frequencies[term] = frequencies[posting_start:posting_end]
+            term_start, posting_start = term_end, posting_end
+        return index
+
+
+class CatalogSnapshot:
+    # binary catalog, read through mmap:
+    #   header  | magic, book count, byte offset of the offsets table
+    #   blob    | utf-8 title, author, isbn of every book, back to back
+    #   offsets | 3 * count + 1 uint64 field boundaries into the blob
+    #   flags   | one checked-out byte per book
+    #   indexes | optional, written by Library.save_snapshot: title order 'I', then the full-text index
+    HEADER = struct.Struct('<8sQQQ')
+    MAGIC = b'LIBSNAP2'
+    
+    def __init__(self, path: str) -> None:
+        # opening is O(1) - nothing is decoded until a book is asked for
+        with open(path, 'rb') as f:
+            self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, table, indexes = self.HEADER.unpack_from(self.__mmap)
+        if magic != self.MAGIC:
+            self.__mmap.close()
+            raise ValueError(f"{path} is not a catalog snapshot")
+        
+        self.__count = count
+        self.__table = table
+        self.__indexes = indexes
+        view = memoryview(self.__mmap)
+        flags = table + 8 * (3 * count + 1)
+        self.__offsets = view[table:flags].cast('Q')
+        self.__flags = view[flags:flags + count]
+        self.__books: dict[int, Book] = {} # materialized on first access, same object afterwards
+    
+    @classmethod
+    def write(
+        cls,
+        path: str,
+        books: Iterable[Book],
+        title_order: Optional[array] = None,
+        text_index: Optional[InvertedIndex] = None,
+        ) -> int:
+        # title_order and text_index are persisted together or not at all
+        offsets = array('Q', [0])
+        flags = bytearray()
+        with open(path, 'wb') as f:
+            f.write(bytes(cls.HEADER.size))
+            position = 0
+            for book in books:
+                for field in (book.title, book.author, book.isbn):
+                    data = field.encode('utf-8')
+                    f.write(data)
+                    position += len(data)
+                    offsets.append(position)
+                flags.append(book._is_checked_out)
+            
+            # pad so the offsets table is 8-byte aligned
+            table = cls.HEADER.size + position
+            f.write(bytes(-table % 8))
+            table += -table % 8
+            offsets.tofile(f)
+            f.write(flags)
+            indexes = 0
+            if title_order is not None and text_index is not None:
+                indexes = f.tell()
+                title_order.tofile(f)
+                text_index.write(f)
+            f.seek(0)
+            f.write(cls.HEADER.pack(cls.MAGIC, len(flags), table, indexes))
+        return len(flags)
+    
+    def __getitem__(self, index: int) -> Book:
+        if not (0 <= index < self.__count):
+            raise IndexError(f"No book at index {index}")
+        
+        book = self.__books.get(index)
+        if book is None:
+            base = self.HEADER.size
+            start = 3 * index
+            title, author, isbn = (
+                str(self.__mmap[base + self.__offsets[i]:base + self.__offsets[i + 1]], 'utf-8')
+                for i in range(start, start + 3)
+                )
+            book = Book(title, author, isbn)
+            book._is_checked_out = bool(self.__flags[index])
+            self.__books[index] = book
+        return book
+    
+    def __iter__(self) -> Iterator[Book]:
+        for i in range(self.__count):
+            yield self[i]
+    
+    def _columns(self) -> tuple[list[str], bytes]:
+        # every field decoded in one pass (title, author, isbn of each book, back to back) and the
+        # checked-out flags - for Library.from_snapshot, which never goes through Book objects here
+        blob = self.__mmap[self.HEADER.size:self.__table]
+        bounds = self.__offsets.tolist()
+        spans = map(slice, bounds, islice(bounds, 1, None))
+        text = blob.decode('utf-8')
+        if len(text) == len(blob):
+            # pure ascii - byte offsets are character offsets, slice the decoded text directly
+            fields = list(map(text.__getitem__, spans))
+        else:
+            fields = [str(blob[span], 'utf-8') for span in spans]
+        return fields, bytes(self.__flags)
+    
+    def _indexes(self) -> Optional[tuple[array, InvertedIndex]]:
+        # the title order and full-text index persisted by Library.save_snapshot, if any
+        if not self.__indexes:
+            return None
+        title_order = array('I')
+        end = self.__indexes + title_order.itemsize * self.__count
+        title_order.frombytes(self.__mmap[self.__indexes:end])
+        with memoryview(self.__mmap) as view:
+            return title_order, InvertedIndex.read(view[end:])
+    
+    def __len__(self) -> int:
+        return self.__count
+    
+    def close(self) -> None:
+        self.__offsets.release()
+        self.__flags.release()
+        self.__mmap.close()
+    
+    def __enter__(self) -> 'CatalogSnapshot':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class Library:
+    # recent additions are kept unsorted until there are this many of them, then merged in one sort
+    _TITLE_MERGE_THRESHOLD = 1024
+    
+    def __init__(self, lock_stripes: int = 64) -> None:
+        if not isinstance(lock_stripes, int):
+            raise TypeError("lock_stripes must be an integer")
+        if lock_stripes <= 0:
+            raise ValueError("lock_stripes must be positive")
+        
         self.__db = {} # author name : List[Book]
+        self.__authors = {} # author name : the one shared str object for that name
         self.__all_books = [] # list of all books - flattened duplicate of all books to avoid copying
+        self.__isbn_index = {} # isbn : first copy added with that isbn
+        self.__extra_copies = {} # isbn : [further copies] - only for isbns held more than once
+        self.__titles = [] # sorted (casefolded title, position in __all_books) - bisect prefix index
+        self.__unsorted_titles = [] # (casefolded title, position) added since the last merge
+        self.__available = {} # Book : None - insertion ordered set of books not checked out
+        self.__text_index = InvertedIndex() # full-text over title + author, doc id = position in __all_books
+        
+        # checkout path for concurrent callers: an ISBN is guarded by stripe hash(isbn) % lock_stripes
+        self.__stripes = [threading.Lock() for _ in range(lock_stripes)]
+        self.__holders = {} # isbn : patron currently holding the book
+        self.__reservations = {} # isbn : deque of (patron, Future) waiting, first come first served
          
     def add_book(self, book: Book) -> None:
         
         if not isinstance(book, Book):
             raise TypeError("book parameter is not of Book type")
         
+        self.__index_book(book)
+        self.__sync_text_index()
+    
+    def bulk_load(self, records: Iterable[Union[Book, tuple[str, str, str]]]) -> int:
+        # streams Books or (title, author, isbn) rows straight into the indexes - no intermediate list.
+        # The full-text index is the expensive one, it catches up on the first search instead.
+        # Returns how many books were loaded
+        count = 0
+        for record in records:
+            self.__index_book(record if isinstance(record, Book) else Book(*record))
+            count += 1
+        return count
+    
+    def bulk_load_csv(self, path: str, has_header: bool = False) -> int:
+        # title,author,isbn rows, read one line at a time. Blank lines are skipped, any other row
+        # without exactly 3 fields raises ValueError naming its line (books before it stay loaded)
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = csv.reader(f)
+            if has_header:
+                next(rows, None)
+            return self.bulk_load(self.__checked_rows(rows, path))
+    
+    @staticmethod
+    def __checked_rows(rows: Iterator[list[str]], path: str) -> Iterator[list[str]]:
+        # rows is a csv.reader - its line_num is the physical line the current row ended on
+        for row in rows:
+            if not row:
+                continue
+            if len(row) != 3:
+                raise ValueError(f"{path} line {rows.line_num}: expected title,author,isbn, got {len(row)} fields")
+            yield row
+    
+    def __sync_text_index(self) -> None:
+        # index every book added since the text index last caught up, doc id = position
+        for position in range(len(self.__text_index), len(self.__all_books)):
+            book = self.__all_books[position]
+            self.__text_index.add(position, f"{book.title} {book.author}")
+    
+    def save_snapshot(self, path: str) -> None:
+        # the indexes go in too, so from_snapshot can skip tokenizing and sorting every title
+        self.__sync_text_index()
+        self.__merge_titles()
+        title_order = array('I', [position for _, position in self.__titles])
+        CatalogSnapshot.write(path, self.__all_books, title_order, self.__text_index)
+    
+    @classmethod
+    def from_snapshot(cls, path: str, lock_stripes: int = 64) -> 'Library':
+        # cold start from save_snapshot output: books are built straight from the decoded columns and
+        # the persisted indexes are loaded as is. A snapshot without indexes has its titles sorted here
+        # and its full-text index built on the first search, like bulk_load
+        library = cls(lock_stripes)
+        with CatalogSnapshot(path) as snapshot:
+            fields, flags = snapshot._columns()
+            indexes = snapshot._indexes()
+        titles = fields[0::3]
+        
+        authors = library.__authors
+        db = library.__db
+        isbn_index = library.__isbn_index
+        extra_copies = library.__extra_copies
+        available = library.__available
+        all_books = library.__all_books
+        with _gc_paused():
+            for title, author, isbn, checked_out in zip(titles, fields[1::3], fields[2::3], flags):
+                author = authors.setdefault(author, author)
+                book = Book(title, author, isbn)
+                book._library = library
+                db.setdefault(author, []).append(book)
+                if isbn_index.setdefault(isbn, book) is not book:
+                    extra_copies.setdefault(isbn, []).append(book)
+                if checked_out:
+                    book._is_checked_out = True
+                else:
+                    available[book] = None
+                all_books.append(book)
+            
+            folded = [title.casefold() for title in titles]
+            if indexes is None:
+                library.__titles = sorted(zip(folded, range(len(folded))))
+            else:
+                title_order, library.__text_index = indexes
+                library.__titles = list(zip(map(folded.__getitem__, title_order), title_order))
+        return library
+    
+    def __index_book(self, book: Book) -> None:
+        
         # addition - O(1)
         
+        # intern the author name so every book by the same author shares one string
+        book.author = self.__authors.setdefault(book.author, book.author)
         self.__db.setdefault(book.author, []).append(book)
         
+        # a library can hold several copies of one isbn; the first stays in the flat index so the
+        # common single-copy case costs no list per book
+        first = self.__isbn_index.setdefault(book.isbn, book)
+        if first is not book:
+            self.__extra_copies.setdefault(book.isbn, []).append(book)
+        self.__unsorted_titles.append((book.title.casefold(), len(self.__all_books)))
+        
         self.__all_books.append(book)
+        
+        holder = book._library
+        if holder is None:
+            book._library = self
+        else:
+            book._library = (*holder, self) if type(holder) is tuple else (holder, self)
+        if book.is_available():
+            self.__available[book] = None
     
     def find_by_author(self, author: str) -> list[Book]:
         
@@ -47,9 +490,131 @@ class Library:
             return []
         return list(self.__db[author])
     
+    def find_by_isbn(self, isbn: str) -> Optional[Book]:
+        
+        if not isinstance(isbn, str):
+            raise TypeError("ISBN must be a string!")
+        
+        # search by isbn - O(1), the first copy added
+        return self.__isbn_index.get(isbn)
+    
+    def find_copies_by_isbn(self, isbn: str) -> list[Book]:
+        
+        if not isinstance(isbn, str):
+            raise TypeError("ISBN must be a string!")
+        
+        # every copy with this isbn, in the order they were added
+        first = self.__isbn_index.get(isbn)
+        if first is None:
+            return []
+        return [first, *self.__extra_copies.get(isbn, ())]
+    
+    def find_by_title_prefix(self, prefix: str, limit: Optional[int] = None) -> list[Book]:
+        
+        if not isinstance(prefix, str):
+            raise TypeError("Title prefix must be a string!")
+        
+        if limit is not None and limit <= 0:
+            return []
+        
+        if len(self.__unsorted_titles) > self._TITLE_MERGE_THRESHOLD:
+            self.__merge_titles()
+        
+        # sorted part - O(log n) bisect to the first match, then walk while the prefix still matches
+        key = prefix.casefold()
+        titles = self.__titles
+        found = []
+        i = bisect_left(titles, (key,))
+        while i < len(titles) and titles[i][0].startswith(key):
+            if limit is not None and len(found) >= limit:
+                break
+            found.append(titles[i])
+            i += 1
+        
+        # unsorted tail - at most _TITLE_MERGE_THRESHOLD entries
+        recent = sorted(t for t in self.__unsorted_titles if t[0].startswith(key))
+        
+        return [self.__all_books[position] for _, position in islice(merge(found, recent), limit)]
+    
+    def __merge_titles(self) -> None:
+        # timsort sees the already sorted index as one run - O(n + k log k)
+        self.__titles.extend(self.__unsorted_titles)
+        self.__titles.sort()
+        self.__unsorted_titles.clear()
+    
+    def search(self, query: str, mode: str = "and", limit: Optional[int] = 10) -> list[Book]:
+        
+        if not isinstance(query, str):
+            raise TypeError("Query must be a string!")
+        
+        # keyword search over title and author, ranked by BM25
+        self.__sync_text_index()
+        return [self.__all_books[doc_id] for doc_id, _ in self.__text_index.search(query, mode=mode, limit=limit)]
+    
+    def request_book(self, isbn: str, patron: str) -> Future:
+        # the Future resolves to the Book once `patron` holds it - immediately if it is on the shelf,
+        # otherwise when it is returned and every earlier reservation has been served. No polling.
+        book = self.__book_for(isbn)
+        future: Future = Future()
+        with self.__stripes[hash(isbn) % len(self.__stripes)]:
+            if book.is_available() and not self.__reservations.get(isbn):
+                book.check_out()
+                self.__holders[isbn] = patron
+                future.set_running_or_notify_cancel()
+            else:
+                self.__reservations.setdefault(isbn, deque()).append((patron, future))
+                return future
+        future.set_result(book)
+        return future
+    
+    def return_by_isbn(self, isbn: str) -> Optional[str]:
+        # hands the book straight to the next patron in the queue and returns who that is,
+        # or puts it back on the shelf and returns None
+        book = self.__book_for(isbn)
+        with self.__stripes[hash(isbn) % len(self.__stripes)]:
+            if book.is_available():
+                raise RuntimeError("Book is marked as available.")
+            
+            queue = self.__reservations.get(isbn)
+            while queue:
+                patron, future = queue.popleft()
+                # a patron who cancelled their reservation is skipped
+                if future.set_running_or_notify_cancel():
+                    self.__holders[isbn] = patron
+                    break
+            else:
+                self.__holders.pop(isbn, None)
+                book.return_book()
+                return None
+        # resolved outside the lock, so callbacks are free to call back into the library
+        future.set_result(book)
+        return patron
+    
+    def holder_of(self, isbn: str) -> Optional[str]:
+        return self.__holders.get(isbn)
+    
+    def __book_for(self, isbn: str) -> Book:
+        # the reservation queue serves the first copy of an isbn; other copies are lent with
+        # Book.check_out / return_book directly
+        book = self.find_by_isbn(isbn)
+        if book is None:
+            raise ValueError(f"No book with ISBN {isbn}")
+        return book
+    
     def get_available_books(self) -> list[Book]:
-        # return only those books which are not checked out? - O(n)
-        return list(filter(lambda book: book.is_available(), self.__all_books))
+        # available set is kept up to date by the books themselves - O(k) in available books
+        return list(self.__available)
+    
+    def iter_available_books(self) -> Iterator[Book]:
+        # lazy, no copy. Checking a book out or in while iterating raises RuntimeError
+        return iter(self.__available)
+    
+    def _on_availability_change(self, book: Book) -> None:
+        # called by Book.check_out / Book.return_book - O(1)
+        if book.is_available():
+            self.__available[book] = None
+        else:
+            self.__available.pop(book, None)
     
     def __len__(self) -> int:
         return len(self.__all_books)
@@ -1,6 +1,39 @@
+import gc
+import math
 from abc import ABC, abstractmethod
+from array import array
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice, repeat
+from operator import itemgetter
+from typing import Iterable, Iterator, Optional, TextIO, Union
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    # bulk loads allocate millions of acyclic objects; letting the cyclic collector rescan the
+    # growing young generation every 700 allocations costs more than building them
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def _payslip_line(name: str, role: str, monthly_pay: float) -> str:
+    return f"{name.capitalize()}'s payslip: {role} | Monthly Pay: ${monthly_pay:.2f}"
 
 class Employee(ABC):
+    # monthly pay is memoized per employee; every state-changing method calls _invalidate_pay.
+    # The switch and the [hits, misses] counters are shared by the whole hierarchy - counters live
+    # in a list because rebinding a class attribute on every read would reset the type's method cache
+    pay_cache_enabled = True
+    _pay_cache_counts = [0, 0]
+    
+    # no per-instance __dict__ anywhere in the hierarchy; subclasses declare their own slots
+    __slots__ = ("name", "employee_id", "_base_salary", "_cached_pay")
+    
     def __init__(self, name: str, employee_id: str) -> None:
         
         if not isinstance(name, str):
@@ -12,6 +45,7 @@ class Employee(ABC):
         self.employee_id = employee_id
         
         self._base_salary: float = 0
+        self._cached_pay: Optional[float] = None
     
     @abstractmethod
     def calculate_monthly_pay(self) -> float:
@@ -23,14 +57,77 @@ class Employee(ABC):
     def get_role(self) -> str:
         pass
     
+    def monthly_pay(self) -> float:
+        # cached calculate_monthly_pay()
+        if not Employee.pay_cache_enabled:
+            return self.calculate_monthly_pay()
+        pay = self._cached_pay
+        if pay is None:
+            Employee._pay_cache_counts[1] += 1
+            pay = self._cached_pay = self.calculate_monthly_pay()
+        else:
+            Employee._pay_cache_counts[0] += 1
+        return pay
+    
+    def _invalidate_pay(self) -> None:
+        self._cached_pay = None
+    
+    @staticmethod
+    def pay_cache_stats() -> dict[str, int]:
+        hits, misses = Employee._pay_cache_counts
+        return {"hits": hits, "misses": misses}
+    
+    @staticmethod
+    def reset_pay_cache_stats() -> None:
+        Employee._pay_cache_counts[:] = [0, 0]
+    
     def generate_payslip(self) -> str:
-        return f"{self.name.capitalize()}'s payslip: {self.get_role()} | Monthly Pay: ${self.calculate_monthly_pay():.2f}"
+        return self._format_payslip(self.monthly_pay())
+    
+    def _format_payslip(self, monthly_pay: float) -> str:
+        return _payslip_line(self.name, self.get_role(), monthly_pay)
+    
+    # bulk loading: from_records validates every column in a single pass, then builds instances
+    # through cls.__new__ with plain attribute stores instead of running __init__ once per row
+    
+    @classmethod
+    def _checked_records(cls, records: Iterable[tuple], width: int) -> list[tuple]:
+        # materialises the (name, employee_id, ...) rows and checks the two shared columns
+        rows = records if isinstance(records, list) else list(records)
+        if any(map(width.__ne__, map(len, rows))):
+            raise ValueError(f"{cls.__name__} records must have exactly {width} fields")
+        cls._check_types(rows, 0, str, 'Name must be string')
+        cls._check_types(rows, 1, str, 'Employee ID must be string')
+        return rows
+    
+    @staticmethod
+    def _check_types(rows: list[tuple], field: int, kinds: Union[type, tuple[type, ...]], message: str) -> None:
+        # one pass down a single column without transposing the rows
+        if not all(map(isinstance, map(itemgetter(field), rows), repeat(kinds))):
+            # only a failing column pays for locating the bad record
+            row = next(i for i, record in enumerate(rows) if not isinstance(record[field], kinds))
+            raise TypeError(f"{message} (record {row})")
+    
+    @staticmethod
+    def _check_lower_bound(rows: list[tuple], field: int, bound: float, message: str, inclusive: bool = False) -> None:
+        # every value in the column must be > bound, or >= bound when inclusive
+        if not rows:
+            return
+        low = min(map(itemgetter(field), rows))
+        if low < bound or (low == bound and not inclusive):
+            row = next(i for i, record in enumerate(rows) if record[field] == low)
+            raise ValueError(f"{message} (record {row})")
     
     
 class FullTimeEmployee(Employee):
+    __slots__ = ("__role",)
+    
     def __init__(self, name: str, employee_id: str, base_salary: float) -> None:
         super().__init__(name=name, employee_id=employee_id)
-        
+        self.set_base_salary(base_salary)
+        self.__role = "Full-Time Employee"
+    
+    def set_base_salary(self, base_salary: float) -> None:
         if not isinstance(base_salary, (float, int)):
             raise TypeError("Base Salary has to be a number")
         
@@ -38,7 +135,29 @@ class FullTimeEmployee(Employee):
             raise ValueError("Base Salary must be positive")
         
         self._base_salary = float(base_salary)
-        self.__role = "Full-Time Employee"
+        self._invalidate_pay()
+    
+    @classmethod
+    def from_records(cls, records: Iterable[tuple[str, str, float]]) -> list['FullTimeEmployee']:
+        # (name, employee_id, base_salary) rows
+        rows = cls._checked_records(records, 3)
+        cls._check_types(rows, 2, (float, int), "Base Salary has to be a number")
+        cls._check_lower_bound(rows, 2, 0, "Base Salary must be positive")
+        
+        employees = []
+        append = employees.append
+        new = cls.__new__
+        role = "Full-Time Employee"
+        with _gc_paused():
+            for name, employee_id, salary in rows:
+                e = new(cls)
+                e.name = name
+                e.employee_id = employee_id
+                e._base_salary = float(salary)
+                e._cached_pay = None
+                e.__role = role
+                append(e)
+        return employees
     
     def calculate_monthly_pay(self) -> float:
         return self._base_salary / 12
@@ -47,6 +166,8 @@ class FullTimeEmployee(Employee):
         return self.__role
 
 class ContractEmployee(Employee):
+    __slots__ = ("__hourly_rate", "__hours_worked_this_month", "__role")
+    
     def __init__(
         self, name: str, 
         employee_id: str, 
@@ -54,12 +175,18 @@ class ContractEmployee(Employee):
         hours_worked_this_month: int
         ) -> None:
         super().__init__(name=name, employee_id=employee_id)
-        
+        self.set_hourly_rate(hourly_rate)
+        self.set_hours_worked(hours_worked_this_month)
+        self.__role = "Contractor"
+    
+    def set_hourly_rate(self, hourly_rate: float) -> None:
         if not isinstance(hourly_rate, (float, int)):
             raise TypeError("Hourly rate must be a number")
         
         self.__hourly_rate = float(hourly_rate)
-        
+        self._invalidate_pay()
+    
+    def set_hours_worked(self, hours_worked_this_month: int) -> None:
         if not isinstance(hours_worked_this_month, int):
             raise TypeError("hours_worked_this_month must be a integer")
         
@@ -67,7 +194,32 @@ class ContractEmployee(Employee):
             raise ValueError("hours_worked_this_month must be zero or positive number")
 
         self.__hours_worked_this_month = hours_worked_this_month
-        self.__role = "Contractor"
+        self._invalidate_pay()
+    
+    @classmethod
+    def from_records(cls, records: Iterable[tuple[str, str, float, int]]) -> list['ContractEmployee']:
+        # (name, employee_id, hourly_rate, hours_worked_this_month) rows
+        rows = cls._checked_records(records, 4)
+        cls._check_types(rows, 2, (float, int), "Hourly rate must be a number")
+        cls._check_types(rows, 3, int, "hours_worked_this_month must be a integer")
+        cls._check_lower_bound(rows, 3, 0, "hours_worked_this_month must be zero or positive number", inclusive=True)
+        
+        employees = []
+        append = employees.append
+        new = cls.__new__
+        role = "Contractor"
+        with _gc_paused():
+            for name, employee_id, rate, worked in rows:
+                e = new(cls)
+                e.name = name
+                e.employee_id = employee_id
+                e._base_salary = 0
+                e._cached_pay = None
+                e.__hourly_rate = float(rate)
+                e.__hours_worked_this_month = worked
+                e.__role = role
+                append(e)
+        return employees
     
     def calculate_monthly_pay(self) -> float:
         return self.__hourly_rate * self.__hours_worked_this_month
@@ -75,7 +227,139 @@ class ContractEmployee(Employee):
     def get_role(self) -> str:
         return self.__role
         
+class SalesLedger:
+    # sale totals per pay period. A period is a dense month index: consecutive months are consecutive
+    # integers, 0-based for a single payroll or SalesLedger.period(year, month) for calendar months.
+    # YYYYMM keys such as 202610 are not periods - 202612 and 202701 would be 89 periods apart.
+    # Totals are stored densely from the first period seen, so memory follows the span of periods in
+    # use, not their size; that span is capped at MAX_SPAN
+    __slots__ = ("__totals", "__prefix", "__valid", "__base")
+    MAX_SPAN = 1200 # periods between the earliest and latest sale, 100 years of months
+    
+    def __init__(self) -> None:
+        self.__totals = array('d') # period - __base : total sales in that period
+        self.__prefix = array('d', [0.0]) # prefix[i] = sum of totals[:i]
+        self.__valid = 0 # prefix sums are up to date for every i <= __valid
+        self.__base = 0 # period of totals[0], set by the first sale
+    
+    @staticmethod
+    def period(year: int, month: int) -> int:
+        # dense month index of a calendar month, month 1-12 - period(2026, 12) + 1 == period(2027, 1)
+        if not (isinstance(year, int) and isinstance(month, int)):
+            raise TypeError("year and month must be integers")
+        if year < 0 or not (1 <= month <= 12):
+            raise ValueError("year must be >= 0 and month between 1 and 12")
+        return year * 12 + month - 1
+    
+    def add(self, period: int, amount: float) -> None:
+        self.__validate_sale(period, amount)
+        self.__record(period, float(amount))
+    
+    def add_many(self, sales: Iterable[tuple[int, float]]) -> int:
+        # bulk ingestion straight from an iterator of (period, amount) rows, returns how many were added.
+        # prefix sums are only rebuilt on the next query, once for the whole batch
+        count = 0
+        for period, amount in sales:
+            self.__validate_sale(period, amount)
+            self.__record(period, float(amount))
+            count += 1
+        return count
+    
+    def total(self, period: int) -> float:
+        # O(1)
+        if not isinstance(period, int):
+            raise TypeError("period must be an integer")
+        index = period - self.__base
+        if not (0 <= index < len(self.__totals)):
+            return 0.0
+        return self.__totals[index]
+    
+    def total_between(self, first: int, last: int) -> float:
+        # sales in periods first..last inclusive - O(1) once the prefix sums are current
+        if not (isinstance(first, int) and isinstance(last, int)):
+            raise TypeError("periods must be integers")
+        if not (0 <= first <= last):
+            raise ValueError("periods must satisfy 0 <= first <= last")
+        
+        if self.__valid < len(self.__totals):
+            self.__refresh()
+        # clamp to the stored span; the prefix sums are flat outside it
+        base = self.__base
+        last = min(last + 1 - base, len(self.__totals))
+        first = first - base if first > base else 0
+        if first >= last:
+            return 0.0
+        return self.__prefix[last] - self.__prefix[first]
+    
+    def periods(self) -> int:
+        # number of periods stored, from the earliest sale to the latest
+        return len(self.__totals)
+    
+    def __record(self, period: int, amount: float) -> None:
+        totals = self.__totals
+        index = period - self.__base
+        if 0 <= index < len(totals):
+            # the common case, a period inside the stored span
+            totals[index] += amount
+            if index < self.__valid:
+                self.__valid = index
+            return
+        self.__grow_to(period)
+        index = period - self.__base
+        totals[index] += amount
+        # a sale in an old period invalidates every prefix sum after it
+        self.__valid = min(self.__valid, index)
+    
+    def __grow_to(self, period: int) -> None:
+        # widens the stored span so it covers period
+        totals = self.__totals
+        if not totals:
+            self.__base = period
+        low, high = min(period, self.__base), max(period, self.__base + len(totals) - 1)
+        if high - low >= self.MAX_SPAN:
+            raise ValueError(f"sales may span at most {self.MAX_SPAN} periods, period {period} "
+                             f"would stretch them from {low} to {high}")
+        
+        if period < self.__base:
+            # an earlier period than any so far - shift the totals up and rebuild every prefix sum
+            totals[:0] = array('d', bytes(8 * (self.__base - period)))
+            self.__base = period
+            self.__valid = 0
+        index = period - self.__base
+        if index >= len(totals):
+            totals.frombytes(bytes(8 * (index + 1 - len(totals))))
+    
+    def __refresh(self) -> None:
+        # recompute only the stale tail of the prefix sums
+        totals, prefix = self.__totals, self.__prefix
+        del prefix[self.__valid + 1:]
+        running = prefix[-1]
+        for index in range(self.__valid, len(totals)):
+            running += totals[index]
+            prefix.append(running)
+        self.__valid = len(totals)
+    
+    @staticmethod
+    def __validate_sale(period: int, amount: float) -> None:
+        if not isinstance(period, int):
+            raise TypeError("period must be an integer")
+        
+        if period < 0:
+            raise ValueError("period cannot be negative")
+        
+        if not isinstance(amount, (float, int)):
+            raise TypeError("Amount must be a number")
+        
+        if amount <= 0:
+            raise ValueError("Amount should be positive")
+
+
+# read-only stand-in for a ledger with no sales, see CommissionEmployee.__own_sales
+_NO_SALES = SalesLedger()
+
 class CommissionEmployee(Employee):
+    __slots__ = ("__role", "__base_monthly_salary", "__commission_rate", "__sales", "__current_period")
+    
     def __init__(
         self, 
         name: str, 
@@ -93,25 +377,87 @@ class CommissionEmployee(Employee):
             raise ValueError("base monthly salary must be positive")
         
         self.__base_monthly_salary = float(base_monthly_salary)
+        self.set_commission_rate(commission_rate)
+        self.__sales = _NO_SALES
+        self.__current_period = 0
+    
+    @classmethod
+    def from_records(cls, records: Iterable[tuple[str, str, float, float]]) -> list['CommissionEmployee']:
+        # (name, employee_id, base_monthly_salary, commission_rate) rows, every employee starts
+        # in period 0 with no sales
+        rows = cls._checked_records(records, 4)
+        cls._check_types(rows, 2, (float, int), "base monthly salary must be a number")
+        cls._check_lower_bound(rows, 2, 0, "base monthly salary must be positive")
+        cls._check_types(rows, 3, float, "commission_rate rate must be a float")
         
+        employees = []
+        append = employees.append
+        new = cls.__new__
+        role = "Commission-Based Employee"
+        with _gc_paused():
+            for name, employee_id, salary, rate in rows:
+                e = new(cls)
+                e.name = name
+                e.employee_id = employee_id
+                e._base_salary = 0
+                e._cached_pay = None
+                e.__role = role
+                e.__base_monthly_salary = float(salary)
+                e.__commission_rate = rate
+                e.__sales = _NO_SALES
+                e.__current_period = 0
+                append(e)
+        return employees
+    
+    def set_commission_rate(self, commission_rate: float) -> None:
         if not isinstance(commission_rate, float):
             raise TypeError("commission_rate rate must be a float")
         
         self.__commission_rate = commission_rate
-        self.__total_sale = 0
+        self._invalidate_pay()
     
-    def add_sale(self, amount: float) -> None:
-        
-        if not isinstance(amount, (float, int)):
-            raise TypeError("Amount must be a number")
-        
-        if amount <= 0:
-            raise ValueError("Amount should be positive")
-        
-        self.__total_sale += float(amount)
+    def add_sale(self, amount: float, period: Optional[int] = None) -> None:
+        # without a period the sale counts towards the current pay period. Periods are dense month
+        # indices (see SalesLedger.period); one employee's sales may span SalesLedger.MAX_SPAN
+        # periods at most, a sale outside that raises ValueError
+        self.__own_sales().add(self.__current_period if period is None else period, amount)
+        self._invalidate_pay()
+    
+    def add_sales(self, sales: Iterable[tuple[int, float]]) -> int:
+        try:
+            return self.__own_sales().add_many(sales)
+        finally:
+            # a bad row part-way through still leaves the earlier rows recorded
+            self._invalidate_pay()
+    
+    def __own_sales(self) -> SalesLedger:
+        # employees share the empty _NO_SALES ledger until their first sale
+        if self.__sales is _NO_SALES:
+            self.__sales = SalesLedger()
+        return self.__sales
+    
+    def set_current_period(self, period: int) -> None:
+        if not isinstance(period, int):
+            raise TypeError("period must be an integer")
+        if period < 0:
+            raise ValueError("period cannot be negative")
+        self.__current_period = period
+        self._invalidate_pay()
+    
+    def current_period(self) -> int:
+        return self.__current_period
     
     def calculate_monthly_pay(self) -> float:
-        return self.__base_monthly_salary + (self.__total_sale * self.__commission_rate)
+        return self.pay_for_period(self.__current_period)
+    
+    def pay_for_period(self, period: int) -> float:
+        return self.__base_monthly_salary + (self.__sales.total(period) * self.__commission_rate)
+    
+    def pay_for_periods(self, first: int, last: int) -> float:
+        # total pay over periods first..last inclusive - O(1), no replay of individual sales.
+        # Base salary is paid once per period in the range, which is why periods must be dense
+        sales = self.__sales.total_between(first, last)
+        return self.__base_monthly_salary * (last - first + 1) + (sales * self.__commission_rate)
     
     def get_role(self) -> str:
         return self.__role
@@ -119,6 +465,258 @@ class CommissionEmployee(Employee):
 def run_payroll(employees: list[Employee]) -> None:
     for e in employees:
         print(e.generate_payslip())
+
+
+class QuantileSketch:
+    # DDSketch-style quantile sketch: a value x > 0 lands in bucket ceil(log_gamma(x)) with
+    # gamma = (1 + a) / (1 - a), so every quantile comes back within relative error a of the
+    # true value. Memory is bounded by max_buckets; past that the lowest buckets are collapsed,
+    # which only costs accuracy at the very bottom of the distribution
+    __slots__ = ("__gamma", "__log_gamma", "__max_buckets", "__buckets", "__zeros", "__count", "__min", "__max")
+    
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048) -> None:
+        if not isinstance(relative_accuracy, float):
+            raise TypeError("relative_accuracy must be a float")
+        if not (0 < relative_accuracy < 1):
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        if not isinstance(max_buckets, int):
+            raise TypeError("max_buckets must be an integer")
+        if max_buckets < 1:
+            raise ValueError("max_buckets must be positive")
+        
+        self.__gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.__log_gamma = math.log(self.__gamma)
+        self.__max_buckets = max_buckets
+        self.__buckets: dict[int, int] = {} # bucket index : count
+        self.__zeros = 0 # zero pay (e.g. a contractor with no hours) has no logarithm
+        self.__count = 0
+        self.__min = math.inf
+        self.__max = -math.inf
+    
+    def add(self, value: float) -> None:
+        # every check comes before the first state change, so a rejected value leaves no trace
+        if not math.isfinite(value):
+            raise ValueError("QuantileSketch only accepts finite values")
+        if value < 0:
+            raise ValueError("QuantileSketch only accepts values >= 0")
+        self.__count += 1
+        if value < self.__min:
+            self.__min = value
+        if value > self.__max:
+            self.__max = value
+        if value == 0:
+            self.__zeros += 1
+            return
+        
+        key = math.ceil(math.log(value) / self.__log_gamma)
+        buckets = self.__buckets
+        if key in buckets:
+            buckets[key] += 1
+        else:
+            buckets[key] = 1
+            if len(buckets) > self.__max_buckets:
+                self.__collapse()
+    
+    def merge(self, other: 'QuantileSketch') -> None:
+        # combine sketches built on separate streams; both must use the same accuracy
+        if not isinstance(other, QuantileSketch):
+            raise TypeError("can only merge another QuantileSketch")
+        if other.__gamma != self.__gamma:
+            raise ValueError("sketches must share the same relative accuracy")
+        for key, count in other.__buckets.items():
+            self.__buckets[key] = self.__buckets.get(key, 0) + count
+        self.__zeros += other.__zeros
+        self.__count += other.__count
+        self.__min = min(self.__min, other.__min)
+        self.__max = max(self.__max, other.__max)
+        while len(self.__buckets) > self.__max_buckets:
+            self.__collapse()
+    
+    def quantile(self, q: float) -> float:
+        if not (0 <= q <= 1):
+            raise ValueError("q must be between 0 and 1")
+        if self.__count == 0:
+            raise ValueError("quantile of an empty sketch")
+        
+        if q == 0:
+            return self.__min # the extremes are tracked exactly
+        if q == 1:
+            return self.__max
+        
+        rank = q * (self.__count - 1)
+        seen = self.__zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.__buckets):
+            seen += self.__buckets[key]
+            if seen > rank:
+                # midpoint of the bucket in relative terms, clamped to what was actually seen
+                estimate = 2 * self.__gamma ** key / (self.__gamma + 1)
+                return min(max(estimate, self.__min), self.__max)
+        return self.__max
+    
+    def __collapse(self) -> None:
+        # fold the lowest bucket into the next one up
+        buckets = self.__buckets
+        lowest = min(buckets)
+        count = buckets.pop(lowest)
+        following = min(buckets)
+        buckets[following] += count
+    
+    def __len__(self) -> int:
+        return self.__count
+
+
+class RoleStats:
+    # running statistics for one role, see payroll_stats
+    __slots__ = ("role", "count", "total", "sketch")
+    
+    def __init__(self, role: str, relative_accuracy: float = 0.01) -> None:
+        self.role = role
+        self.count = 0
+        self.total = 0.0
+        self.sketch = QuantileSketch(relative_accuracy)
+    
+    def add(self, pay: float) -> None:
+        self.sketch.add(pay) # validates first
+        self.count += 1
+        self.total += pay
+    
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+    
+    def percentile(self, p: float) -> float:
+        return self.sketch.quantile(p / 100)
+    
+    @property
+    def p50(self) -> float:
+        return self.percentile(50)
+    
+    @property
+    def p95(self) -> float:
+        return self.percentile(95)
+    
+    @property
+    def p99(self) -> float:
+        return self.percentile(99)
+    
+    def __repr__(self) -> str:
+        return (f"RoleStats(role={self.role!r}, count={self.count}, total={self.total:.2f}, "
+                f"mean={self.mean:.2f}, p50={self.p50:.2f}, p95={self.p95:.2f}, p99={self.p99:.2f})")
+
+
+def payroll_stats(employees: Iterable[Employee], relative_accuracy: float = 0.01) -> dict[str, RoleStats]:
+    # role : count / total / mean / percentiles of monthly pay, in a single pass over any iterable.
+    # Memory depends on the number of roles and sketch buckets, never on the number of employees
+    stats: dict[str, RoleStats] = {}
+    for e in employees:
+        role = e.get_role()
+        group = stats.get(role)
+        if group is None:
+            group = stats[role] = RoleStats(role, relative_accuracy)
+        group.add(e.monthly_pay())
+    return stats
+
+
+class PayrollResult:
+    def __init__(self, pay: array, totals: dict[str, float], payslips: Optional[list[str]]) -> None:
+        self.pay = pay # monthly pay, same order as the employees passed in
+        self.totals = totals # role : total monthly pay
+        self.total = sum(pay)
+        self.payslips = payslips # only built when asked for
+    
+    def __repr__(self) -> str:
+        return f"PayrollResult(employees={len(self.pay)}, total={self.total:.2f})"
+
+
+def run_payroll_batch(employees: list[Employee], payslips: bool = False) -> PayrollResult:
+    # one pass: pay per employee in input order, totals per role, payslips from the same values
+    pay = array('d', [e.calculate_monthly_pay() for e in employees])
+    totals: dict[str, float] = {}
+    for e, value in zip(employees, pay):
+        role = e.get_role()
+        totals[role] = totals.get(role, 0.0) + value
+    
+    slips = [e._format_payslip(value) for e, value in zip(employees, pay)] if payslips else None
+    return PayrollResult(pay, totals, slips)
+
+
+def _format_chunk(rows: list[tuple[str, str, float]]) -> str:
+    # runs in the worker processes on (name, role, monthly pay) rows - pickling those is far cheaper
+    # than pickling the employees. One string per chunk keeps the writes large
+    return "".join([_payslip_line(name, role, pay) + "\n" for name, role, pay in rows])
+
+
+class PayslipWriter:
+    def __init__(
+        self,
+        sink: Union[str, TextIO],
+        chunk_size: int = 10_000,
+        workers: int = 0,
+        buffer_size: int = 1 << 20,
+        ) -> None:
+        if not isinstance(chunk_size, int):
+            raise TypeError("chunk_size must be an integer")
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        
+        if not isinstance(workers, int):
+            raise TypeError("workers must be an integer")
+        if workers < 0:
+            raise ValueError("workers cannot be negative")
+        
+        # a path is opened (and later closed) by the writer, anything with .write() is used as is
+        self.__owns_sink = isinstance(sink, str)
+        self.__sink: TextIO = open(sink, 'w', buffering=buffer_size, encoding='utf-8') if self.__owns_sink else sink
+        self.__chunk_size = chunk_size
+        # 0 workers formats in this process. With workers the parent still computes every pay and
+        # pickles a (name, role, pay) row, about half the cost of formatting the payslip itself, so a
+        # pool can at best double throughput and only with that many idle cores. Workers use the
+        # standard payslip layout; a subclass overriding generate_payslip needs workers=0
+        self.__workers = workers
+        self.__pool: Optional[ProcessPoolExecutor] = ProcessPoolExecutor(workers) if workers else None
+    
+    def write(self, employees: Iterable[Employee]) -> int:
+        # streams payslips in input order, returns how many were written
+        employees = iter(employees)
+        written = 0
+        # bounded window of chunks in flight, so memory does not grow with the payroll size
+        in_flight: deque[tuple[int, Future]] = deque()
+        while True:
+            chunk = list(islice(employees, self.__chunk_size))
+            if chunk:
+                if self.__pool is None:
+                    self.__sink.write("".join([e.generate_payslip() + "\n" for e in chunk]))
+                    written += len(chunk)
+                    continue
+                rows = [(e.name, e.get_role(), e.monthly_pay()) for e in chunk]
+                in_flight.append((len(chunk), self.__pool.submit(_format_chunk, rows)))
+            
+            # oldest chunk first - this is what keeps the output in order
+            while in_flight and (not chunk or len(in_flight) >= 2 * self.__workers):
+                count, future = in_flight.popleft()
+                self.__sink.write(future.result())
+                written += count
+            
+            if not chunk:
+                return written
+    
+    def close(self) -> None:
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+        if self.__owns_sink:
+            self.__sink.close()
+        else:
+            self.__sink.flush()
+    
+    def __enter__(self) -> 'PayslipWriter':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
         
 if __name__ == "__main__":
     employees = [
@@ -1,22 +1,83 @@
+import gc
+import json
+import mmap
+import os
+import struct
 from abc import ABC, abstractmethod
-from math import sqrt, pi
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from heapq import merge
+from itertools import islice, repeat
+from math import floor, fsum, hypot, inf, sqrt, pi
+from operator import add, mul, sub
+from typing import Iterable, Iterator, Optional, TextIO, Union
+
+BoundingBox = tuple[float, float, float, float] # (min_x, min_y, max_x, max_y)
 
 class Shape(ABC):
-    def __init__(self):
-        pass
+    # shapes are immutable, so area and perimeter are computed on first use and kept.
+    # Subclasses implement _compute_area / _compute_perimeter and call super().__init__() to get that
+    # caching; overriding area() / perimeter() directly, as the original contract did, still works.
+    # (x, y) is the shape's anchor - what it means is up to each subclass
+    __slots__ = ("_area", "_perimeter", "_x", "_y")
+    
+    # records (NDJSON objects / binary rows): concrete shapes name their record type and the
+    # constructor arguments that make up a record. Subclasses register themselves by setting
+    # record_type; ones with a different layout override to_record / _from_record
+    record_type: Optional[str] = None
+    _record_fields: tuple[str, ...] = ()
+    _record_types: dict[str, type['Shape']] = {} # record_type : class
+    
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if "record_type" in cls.__dict__:
+            Shape._record_types[cls.record_type] = cls
+    
+    def __init__(self, x: float = 0.0, y: float = 0.0) -> None:
+        self._validate_number(number=x, min_val=-inf, max_value=inf)
+        self._validate_number(number=y, min_val=-inf, max_value=inf)
+        self._x = float(x)
+        self._y = float(y)
+        self._area: Optional[float] = None
+        self._perimeter: Optional[float] = None
+    
+    def position(self) -> tuple[float, float]:
+        return self._x, self._y
     
-    @abstractmethod
     def area(self) -> float:
-        pass
+        area = self._area
+        if area is None:
+            area = self._area = self._compute_area()
+        return area
     
-    @abstractmethod
     def perimeter(self) -> float:
-        pass
+        perimeter = self._perimeter
+        if perimeter is None:
+            perimeter = self._perimeter = self._compute_perimeter()
+        return perimeter
+    
+    def _compute_area(self) -> float:
+        # not abstract: a subclass that overrides area() itself never gets here
+        raise NotImplementedError(f"{type(self).__name__} must implement area() or _compute_area()")
+    
+    def _compute_perimeter(self) -> float:
+        raise NotImplementedError(f"{type(self).__name__} must implement perimeter() or _compute_perimeter()")
     
     @abstractmethod
     def describe(self) -> str:
         pass
     
+    # spatial queries (SpatialGrid); like _append_to, only shapes that support them override these
+    
+    def bounding_box(self) -> BoundingBox:
+        raise TypeError(f"{type(self).__name__} has no bounding box")
+    
+    def contains_point(self, x: float, y: float) -> bool:
+        # boundary points count as inside
+        raise TypeError(f"{type(self).__name__} does not support point queries")
+    
     def is_larger_than(self, other: 'Shape') -> bool:
         if not isinstance(other, Shape):
             raise TypeError(f"{other} is not a shape")
@@ -46,45 +107,123 @@ class Shape(ABC):
     
     def __repr__(self) -> str:
         return self.describe()
+    
+    def _append_to(self, batch: 'ShapeBatch') -> None:
+        # each concrete shape knows which ShapeBatch columns it belongs in
+        raise TypeError(f"{type(self).__name__} cannot be stored in a ShapeBatch")
+    
+    def _dimensions(self) -> tuple[float, ...]:
+        # values for _record_fields, in the same order
+        raise TypeError(f"{type(self).__name__} has no record format")
+    
+    def to_record(self) -> dict:
+        record = {"type": self.record_type}
+        record.update(zip(self._record_fields, self._dimensions()))
+        record["x"] = self._x
+        record["y"] = self._y
+        return record
+    
+    @staticmethod
+    def from_record(record: dict) -> 'Shape':
+        # builds the shape named by record["type"] through its normal, validating constructor
+        if not isinstance(record, dict):
+            raise TypeError(f"{record} is not a shape record")
+        kind = Shape._record_types.get(record.get("type"))
+        if kind is None:
+            raise ValueError(f"unknown shape type {record.get('type')!r}")
+        return kind._from_record(record)
+    
+    @classmethod
+    def _from_record(cls, record: dict) -> 'Shape':
+        try:
+            dimensions = [record[field] for field in cls._record_fields]
+        except KeyError as missing:
+            raise ValueError(f"{cls.record_type} record is missing {missing}") from None
+        return cls(*dimensions, x=record.get("x", 0.0), y=record.get("y", 0.0))
         
     
 class Circle(Shape):
-    def __init__(self, radius: float) -> None:
+    # anchored at its center
+    __slots__ = ("__radius",)
+    record_type = "circle"
+    _record_fields = ("radius",)
+    
+    def __init__(self, radius: float, x: float = 0.0, y: float = 0.0) -> None:
+        super().__init__(x, y)
         self._validate_number(number=radius, min_val=0, max_value=float('inf'))
         self.__radius = float(radius)
     
-    def area(self) -> float:
+    def _compute_area(self) -> float:
         return pi * (self.__radius**2)
     
-    def perimeter(self) -> float:
+    def _compute_perimeter(self) -> float:
         return 2 * pi * self.__radius
     
     def radius(self) -> float:
         return self.__radius
     
+    def bounding_box(self) -> BoundingBox:
+        r = self.__radius
+        return self._x - r, self._y - r, self._x + r, self._y + r
+    
+    def contains_point(self, x: float, y: float) -> bool:
+        dx, dy = x - self._x, y - self._y
+        return dx * dx + dy * dy <= self.__radius * self.__radius
+    
+    def _append_to(self, batch: 'ShapeBatch') -> None:
+        batch._add_circle(self.__radius, self)
+    
+    def _dimensions(self) -> tuple[float, ...]:
+        return (self.__radius,)
+    
     def describe(self) -> str:
         return f'Circle with radius: {self.__radius}, area: {self.area()}, perimeter: {self.perimeter()}'
 
 
 class Rectangle(Shape):
-    def __init__(self, width: float, height: float) -> None:
+    # axis-aligned, anchored at its lower-left corner
+    __slots__ = ("__width", "__height")
+    record_type = "rectangle"
+    _record_fields = ("width", "height")
+    
+    def __init__(self, width: float, height: float, x: float = 0.0, y: float = 0.0) -> None:
+        super().__init__(x, y)
         self._validate_number(number=width, min_val=0, max_value=float('inf'))
         self._validate_number(number=height, min_val=0, max_value=float('inf'))
         self.__width = float(width)
         self.__height = float(height)
         
-    def area(self) -> float:
+    def _compute_area(self) -> float:
         return self.__width * self.__height
     
-    def perimeter(self) -> float:
+    def _compute_perimeter(self) -> float:
         return 2 * (self.__width + self.__height)
     
+    def bounding_box(self) -> BoundingBox:
+        return self._x, self._y, self._x + self.__width, self._y + self.__height
+    
+    def contains_point(self, x: float, y: float) -> bool:
+        return self._x <= x <= self._x + self.__width and self._y <= y <= self._y + self.__height
+    
+    def _append_to(self, batch: 'ShapeBatch') -> None:
+        batch._add_rectangle(self.__width, self.__height, self)
+    
+    def _dimensions(self) -> tuple[float, ...]:
+        return self.__width, self.__height
+    
     def describe(self) -> str:
         return f"Rectangle with width: {self.__width}, height: {self.__height}, area: {self.area()}, perimeter: {self.perimeter()}"
         
 
 class Triangle(Shape):
-    def __init__(self, a: float, b: float, c: float) -> None:
+    # anchored at vertex P0. Side a runs along the x axis from P0 to P1 = (x + a, y), and P2 sits
+    # above it, b away from P0 and c away from P1
+    __slots__ = ("__a", "__b", "__c")
+    record_type = "triangle"
+    _record_fields = ("a", "b", "c")
+    
+    def __init__(self, a: float, b: float, c: float, x: float = 0.0, y: float = 0.0) -> None:
+        super().__init__(x, y)
         self._validate_number(number=a, min_val=0, max_value=float('inf'))
         self._validate_number(number=b, min_val=0, max_value=float('inf'))
         self._validate_number(number=c, min_val=0, max_value=float('inf'))
@@ -93,46 +232,892 @@ class Triangle(Shape):
         self.__b = float(b)
         self.__c = float(c)
         
-        self.__s = (self.__a + self.__b + self.__c) * 0.5
-        self.__s_a = self.__s - self.__a
-        self.__s_b = self.__s - self.__b
-        self.__s_c = self.__s - self.__c
-        
-        self.__area = sqrt(self.__s * self.__s_a * self.__s_b * self.__s_c)
+        # the area is no longer computed here, so check the sides explicitly; degenerate is allowed
+        longest = max(self.__a, self.__b, self.__c)
+        if longest > (self.__a + self.__b + self.__c) - longest:
+            raise ValueError(f"sides ({a}, {b}, {c}) do not form a triangle")
         
-    def area(self) -> float:
-        return self.__area
+    def _compute_area(self) -> float:
+        # Heron's formula
+        s = (self.__a + self.__b + self.__c) * 0.5
+        return sqrt(s * (s - self.__a) * (s - self.__b) * (s - self.__c))
     
-    def perimeter(self) -> float:
+    def _compute_perimeter(self) -> float:
         return self.__a + self.__b + self.__c
     
+    def vertices(self) -> tuple[tuple[float, float], tuple[float, float], tuple[float, float]]:
+        a, b, c = self.__a, self.__b, self.__c
+        offset = (a * a + b * b - c * c) / (2 * a)
+        rise = sqrt(max(b * b - offset * offset, 0.0)) # rounding can push a degenerate one below 0
+        return (self._x, self._y), (self._x + a, self._y), (self._x + offset, self._y + rise)
+    
+    def bounding_box(self) -> BoundingBox:
+        (x0, y0), (x1, _), (x2, y2) = self.vertices()
+        return min(x0, x2), y0, max(x1, x2), y2
+    
+    def contains_point(self, x: float, y: float) -> bool:
+        # same-side test against all three edges
+        (x0, y0), (x1, y1), (x2, y2) = self.vertices()
+        d0 = (x1 - x0) * (y - y0) - (y1 - y0) * (x - x0)
+        d1 = (x2 - x1) * (y - y1) - (y2 - y1) * (x - x1)
+        d2 = (x0 - x2) * (y - y2) - (y0 - y2) * (x - x2)
+        return (d0 >= 0 and d1 >= 0 and d2 >= 0) or (d0 <= 0 and d1 <= 0 and d2 <= 0)
+    
+    def _append_to(self, batch: 'ShapeBatch') -> None:
+        batch._add_triangle(self.__a, self.__b, self.__c, self)
+    
+    def _dimensions(self) -> tuple[float, ...]:
+        return self.__a, self.__b, self.__c
+    
     def describe(self) -> str:
         return f"Triangle with sides ({self.__a}, {self.__b}, {self.__c})"
 
 class RightTriangle(Triangle):
-    def __init__(self, base: float, height: float) -> None:
-        super().__init__(a = base, b = height, c = sqrt((base ** 2) + (height ** 2)))
+    __slots__ = ("__base", "__height")
+    record_type = "right_triangle"
+    _record_fields = ("base", "height")
+    
+    def __init__(self, base: float, height: float, x: float = 0.0, y: float = 0.0) -> None:
+        # the right angle sits at the anchor
+        super().__init__(a = base, b = height, c = sqrt((base ** 2) + (height ** 2)), x = x, y = y)
         self.__base = base
         self.__height = height
     
+    def _dimensions(self) -> tuple[float, ...]:
+        return float(self.__base), float(self.__height)
+    
     def describe(self) -> str:
         return f"Right Triangle with sides ({self.__base}, {self.__height})"
     
+
+
+class Polygon(Shape):
+    # simple polygon given by its vertices, in order, as offsets from the anchor. The vertices are
+    # kept as two coordinate columns so area and perimeter are a few map() passes over whole arrays
+    # (shoelace formula / edge lengths) instead of a Python loop per vertex.
+    # Self-intersecting vertex lists are not rejected; their shoelace area is not meaningful
+    __slots__ = ("__xs", "__ys")
+    record_type = "polygon"
+    _record_fields = ("vertices",)
+    
+    def __init__(self, vertices: Iterable[tuple[float, float]], x: float = 0.0, y: float = 0.0) -> None:
+        super().__init__(x, y)
+        try:
+            pairs = [(vx, vy) for vx, vy in vertices]
+        except (TypeError, ValueError):
+            raise TypeError(f"{vertices} is not a sequence of (x, y) pairs") from None
+        if len(pairs) < 3:
+            raise ValueError(f"a polygon needs at least 3 vertices, got {len(pairs)}")
+        for vx, vy in pairs:
+            self._validate_number(number=vx, min_val=-inf, max_value=inf)
+            self._validate_number(number=vy, min_val=-inf, max_value=inf)
+        self.__xs = array('d', [vx for vx, _ in pairs])
+        self.__ys = array('d', [vy for _, vy in pairs])
+    
+    def __next_columns(self) -> tuple[array, array]:
+        # the columns rotated by one, so vertex i lines up with vertex i + 1 (wrapping around)
+        xs, ys = self.__xs, self.__ys
+        return xs[1:] + xs[:1], ys[1:] + ys[:1]
+    
+    def _compute_area(self) -> float:
+        # shoelace: half the absolute sum of x_i * y_i+1 - x_i+1 * y_i
+        xs, ys = self.__xs, self.__ys
+        next_xs, next_ys = self.__next_columns()
+        return abs(sum(map(sub, map(mul, xs, next_ys), map(mul, next_xs, ys)))) * 0.5
+    
+    def _compute_perimeter(self) -> float:
+        xs, ys = self.__xs, self.__ys
+        next_xs, next_ys = self.__next_columns()
+        return sum(map(hypot, map(sub, next_xs, xs), map(sub, next_ys, ys)))
+    
+    def vertices(self) -> list[tuple[float, float]]:
+        return [(self._x + vx, self._y + vy) for vx, vy in zip(self.__xs, self.__ys)]
+    
+    def bounding_box(self) -> BoundingBox:
+        return (self._x + min(self.__xs), self._y + min(self.__ys),
+                self._x + max(self.__xs), self._y + max(self.__ys))
+    
+    def contains_point(self, x: float, y: float) -> bool:
+        # even-odd ray casting towards +x; points on an edge are caught before the crossing count
+        min_x, min_y, max_x, max_y = self.bounding_box()
+        if not (min_x <= x <= max_x and min_y <= y <= max_y):
+            return False
+        px, py = x - self._x, y - self._y
+        next_xs, next_ys = self.__next_columns()
+        inside = False
+        for x0, y0, x1, y1 in zip(self.__xs, self.__ys, next_xs, next_ys):
+            if ((x1 - x0) * (py - y0) == (y1 - y0) * (px - x0)
+                    and min(x0, x1) <= px <= max(x0, x1) and min(y0, y1) <= py <= max(y0, y1)):
+                return True
+            if (y0 > py) != (y1 > py) and px < x0 + (py - y0) * (x1 - x0) / (y1 - y0):
+                inside = not inside
+        return inside
+    
+    def _append_to(self, batch: 'ShapeBatch') -> None:
+        batch._add_shape(self)
+    
+    def _dimensions(self) -> tuple[list[list[float]]]:
+        return ([[vx, vy] for vx, vy in zip(self.__xs, self.__ys)],)
+    
+    def describe(self) -> str:
+        return f"Polygon with {len(self.__xs)} vertices, area: {self.area()}, perimeter: {self.perimeter()}"
+
+
+class CompositeShape(Shape):
+    # a group of shapes placed relative to the composite's anchor. Its area and perimeter are the
+    # sums over its children (overlaps are not subtracted), kept up to date by add / remove instead of
+    # being recomputed: each change applies the child's delta here and in every composite this one is
+    # nested in. Unlike the other shapes a composite is mutable, so it is not stored in a ShapeBatch,
+    # and one held in an AreaIndex must be removed before it changes and re-inserted after
+    __slots__ = ("__children", "__tokens", "__next_token", "__parents")
+    record_type = "composite"
+    
+    def __init__(self, shapes: Iterable[Shape] = (), x: float = 0.0, y: float = 0.0) -> None:
+        super().__init__(x, y)
+        # children in insertion order under a token each; __tokens finds a child's tokens from its id(),
+        # so remove() does not scan the children (they are compared with is - == compares areas)
+        self.__children: dict[int, Shape] = {} # token : shape
+        self.__tokens: dict[int, list[int]] = {} # id(shape) : its tokens, oldest first
+        self.__next_token = 0
+        self.__parents: list['CompositeShape'] = [] # one entry per place this composite is nested in
+        self._area = 0.0
+        self._perimeter = 0.0
+        for shape in shapes:
+            self.add(shape)
+    
+    def add(self, shape: Shape) -> None:
+        if not isinstance(shape, Shape):
+            raise TypeError(f"{shape} is not a shape")
+        if isinstance(shape, CompositeShape) and shape.__encloses(self):
+            raise ValueError("a composite shape cannot contain itself")
+        token = self.__next_token
+        self.__next_token += 1
+        self.__children[token] = shape
+        self.__tokens.setdefault(id(shape), []).append(token)
+        if isinstance(shape, CompositeShape):
+            shape.__parents.append(self)
+        self.__adjust(shape.area(), shape.perimeter())
+    
+    def remove(self, shape: Shape) -> None:
+        # removes the most recently added occurrence of this very shape
+        tokens = self.__tokens.get(id(shape))
+        if tokens is None:
+            raise ValueError(f"{shape!r} is not part of this composite")
+        del self.__children[tokens.pop()]
+        if not tokens:
+            del self.__tokens[id(shape)]
+        if isinstance(shape, CompositeShape):
+            parents = shape.__parents
+            del parents[next(i for i, parent in enumerate(parents) if parent is self)]
+        if not self.__children:
+            # start over from an exact 0.0 rather than carry the rounding left by the subtractions
+            self.__adjust(-self._area, -self._perimeter)
+        else:
+            self.__adjust(-shape.area(), -shape.perimeter())
+    
+    def __reduce__(self) -> tuple:
+        # rebuild through __init__: the id() keys in __tokens mean nothing in another process or copy
+        return type(self), (self.shapes(), self._x, self._y)
+    
+    def __adjust(self, area: float, perimeter: float) -> None:
+        self._area += area
+        self._perimeter += perimeter
+        for parent in self.__parents:
+            parent.__adjust(area, perimeter)
+    
+    def __encloses(self, shape: 'CompositeShape') -> bool:
+        # True when shape is this composite or nested anywhere inside it
+        return shape is self or any(parent is self or self.__encloses(parent) for parent in shape.__parents)
+    
+    def shapes(self) -> list[Shape]:
+        return list(self.__children.values())
+    
+    def _compute_area(self) -> float:
+        # only reached if the running total was cleared; add / remove keep _area set
+        return fsum(shape.area() for shape in self.__children.values())
+    
+    def _compute_perimeter(self) -> float:
+        return fsum(shape.perimeter() for shape in self.__children.values())
+    
+    def bounding_box(self) -> BoundingBox:
+        # an empty composite is a point at its anchor
+        if not self.__children:
+            return self._x, self._y, self._x, self._y
+        boxes = [shape.bounding_box() for shape in self.__children.values()]
+        return (self._x + min(box[0] for box in boxes), self._y + min(box[1] for box in boxes),
+                self._x + max(box[2] for box in boxes), self._y + max(box[3] for box in boxes))
+    
+    def contains_point(self, x: float, y: float) -> bool:
+        x, y = x - self._x, y - self._y
+        return any(shape.contains_point(x, y) for shape in self.__children.values())
+    
+    def to_record(self) -> dict:
+        # children nest as their own records
+        return {"type": self.record_type, "shapes": [shape.to_record() for shape in self.__children.values()],
+                "x": self._x, "y": self._y}
+    
+    @classmethod
+    def _from_record(cls, record: dict) -> 'Shape':
+        shapes = record.get("shapes")
+        if not isinstance(shapes, list):
+            raise ValueError(f"{cls.record_type} record needs a list of shapes")
+        return cls([Shape.from_record(shape) for shape in shapes], x=record.get("x", 0.0), y=record.get("y", 0.0))
+    
+    def describe(self) -> str:
+        return f"Composite of {len(self.__children)} shapes, area: {self.area()}, perimeter: {self.perimeter()}"
+    
+
+
+def _validated_column(values: Iterable[float]) -> array:
+    # same rule as Shape._validate_number (0 < x < inf) for a whole column; NaN fails it too
+    column = array('d', values)
+    if not (all(map((0.0).__lt__, column)) and all(map(inf.__gt__, column))):
+        raise ValueError("every dimension must be a positive, finite number")
+    return column
+
+
+class ShapeBatch:
+    # shapes stored column-wise: radii for circles, width / height for rectangles and the three
+    # sides for triangles. Areas and perimeters are computed once per append by a few map() passes
+    # over the new rows and kept in insertion order, together with the running total and the
+    # position of the largest area, so the batch helpers never call a method per shape.
+    # __kinds / __rows remember where each shape lives: shape i is row __rows[i] of group __kinds[i].
+    # Shapes without columns of their own (polygons) are OTHER and only kept as objects
+    CIRCLE, RECTANGLE, TRIANGLE, OTHER = range(4)
+    
+    def __init__(self, shapes: Iterable[Shape] = ()) -> None:
+        self.__radii = array('d')
+        self.__widths = array('d')
+        self.__heights = array('d')
+        self.__sides = (array('d'), array('d'), array('d'))
+        self.__kinds = array('B')
+        self.__rows = array('Q')
+        self.__objects: dict[int, Shape] = {} # position : shape, for shapes added as objects
+        self.__areas = array('d')
+        self.__perimeters = array('d')
+        self.__total_area = 0.0
+        self.__largest = -1 # position of the first largest area
+        self.extend(shapes)
+    
+    def add(self, shape: Shape) -> None:
+        if not isinstance(shape, Shape):
+            raise TypeError(f"{shape} is not a shape")
+        shape._append_to(self)
     
-def largest_shape(shapes: list[Shape]) -> Shape:
+    def extend(self, shapes: Iterable[Shape]) -> None:
+        for shape in shapes:
+            self.add(shape)
+    
+    # column-only bulk adds: no Shape objects are created, they are built on demand when returned
+    
+    def add_circles(self, radii: Iterable[float]) -> None:
+        radii = _validated_column(radii)
+        self.__append_rows(
+            self.CIRCLE, len(self.__radii),
+            array('d', map(mul, repeat(pi), map(mul, radii, radii))),
+            array('d', map(mul, repeat(2 * pi), radii)),
+        )
+        self.__radii.extend(radii)
+    
+    def add_rectangles(self, widths: Iterable[float], heights: Iterable[float]) -> None:
+        widths, heights = _validated_column(widths), _validated_column(heights)
+        if len(widths) != len(heights):
+            raise ValueError("widths and heights must have the same length")
+        self.__append_rows(
+            self.RECTANGLE, len(self.__widths),
+            array('d', map(mul, widths, heights)),
+            array('d', map(mul, repeat(2.0), map(add, widths, heights))),
+        )
+        self.__widths.extend(widths)
+        self.__heights.extend(heights)
+    
+    def add_triangles(self, a: Iterable[float], b: Iterable[float], c: Iterable[float]) -> None:
+        a, b, c = map(_validated_column, (a, b, c))
+        if not (len(a) == len(b) == len(c)):
+            raise ValueError("a, b and c must have the same length")
+        perimeters = array('d', map(add, map(add, a, b), c))
+        # Heron's formula; an impossible triangle raises ValueError from sqrt before anything is stored
+        s = array('d', map(mul, perimeters, repeat(0.5)))
+        areas = array('d', map(sqrt, map(mul, map(mul, map(mul, s, map(sub, s, a)), map(sub, s, b)), map(sub, s, c))))
+        self.__append_rows(self.TRIANGLE, len(self.__sides[0]), areas, perimeters)
+        for side, values in zip(self.__sides, (a, b, c)):
+            side.extend(values)
+    
+    # called from Shape._append_to; the shape's own area() / perimeter() fill the columns
+    
+    def _add_circle(self, radius: float, shape: Shape) -> None:
+        self.__add_object(self.CIRCLE, len(self.__radii), shape)
+        self.__radii.append(radius)
+    
+    def _add_rectangle(self, width: float, height: float, shape: Shape) -> None:
+        self.__add_object(self.RECTANGLE, len(self.__widths), shape)
+        self.__widths.append(width)
+        self.__heights.append(height)
+    
+    def _add_triangle(self, a: float, b: float, c: float, shape: Shape) -> None:
+        self.__add_object(self.TRIANGLE, len(self.__sides[0]), shape)
+        for side, value in zip(self.__sides, (a, b, c)):
+            side.append(value)
+    
+    def _add_shape(self, shape: Shape) -> None:
+        self.__add_object(self.OTHER, 0, shape)
+    
+    def __add_object(self, kind: int, row: int, shape: Shape) -> None:
+        self.__objects[len(self.__kinds)] = shape
+        self.__append_rows(kind, row, array('d', [shape.area()]), array('d', [shape.perimeter()]))
+    
+    def __append_rows(self, kind: int, first_row: int, areas: array, perimeters: array) -> None:
+        # the kernels' operand order matches the scalar area() / perimeter() methods, so a shape's
+        # area is bit-for-bit the same whether it came in as an object or as a column
+        first = len(self.__kinds)
+        self.__kinds.extend(repeat(kind, len(areas)))
+        self.__rows.extend(range(first_row, first_row + len(areas)))
+        self.__areas.extend(areas)
+        self.__perimeters.extend(perimeters)
+        self.__total_area = sum(areas, self.__total_area)
+        
+        if areas:
+            biggest = max(areas)
+            if self.__largest < 0 or biggest > self.__areas[self.__largest]:
+                self.__largest = first + areas.index(biggest)
+    
+    def areas(self) -> array:
+        # insertion order; treat as read-only
+        return self.__areas
+    
+    def perimeters(self) -> array:
+        return self.__perimeters
+    
+    def total_area(self) -> float:
+        return self.__total_area
+    
+    def total_perimeter(self) -> float:
+        return sum(self.__perimeters)
+    
+    def largest_shape(self) -> Shape:
+        if self.__largest < 0:
+            raise ValueError("largest_shape() of an empty ShapeBatch")
+        return self[self.__largest]
+    
+    def shapes_larger_than(self, threshold: float) -> list[Shape]:
+        positions = [i for i, area in enumerate(self.__areas) if area > threshold]
+        return [self[i] for i in positions]
+    
+    def __getitem__(self, position: int) -> Shape:
+        size = len(self.__kinds)
+        if position < 0:
+            position += size
+        # checked after the adjustment - a still negative position would otherwise index from the end
+        if not (0 <= position < size):
+            raise IndexError("ShapeBatch index out of range")
+        shape = self.__objects.get(position)
+        if shape is not None:
+            return shape
+        kind, row = self.__kinds[position], self.__rows[position]
+        if kind == self.CIRCLE:
+            return Circle(self.__radii[row])
+        if kind == self.RECTANGLE:
+            return Rectangle(self.__widths[row], self.__heights[row])
+        return Triangle(*(side[row] for side in self.__sides))
+    
+    def __len__(self) -> int:
+        return len(self.__kinds)
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    # a bulk load creates millions of cell lists; the cyclic collector rescanning every shape
+    # already indexed each time it runs roughly doubles the build time
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class SpatialGrid:
+    # uniform-grid index over shape bounding boxes. A shape is listed in every cell its box touches,
+    # so a point query reads a single cell and a range query only the cells the range covers.
+    # Works best with cell_size a small multiple of the typical shape extent, which bulk_load picks from the data.
+    # A shape whose box would cover more than MAX_CELLS_PER_SHAPE cells is kept in a short side list
+    # that every query checks instead, so one huge shape cannot blow up the build
+    MAX_CELLS_PER_SHAPE = 64
+    
+    def __init__(self, cell_size: float) -> None:
+        if not isinstance(cell_size, (int, float)):
+            raise TypeError(f"{cell_size} is not a number")
+        if not (0 < cell_size < inf):
+            raise ValueError("cell_size must be a positive, finite number")
+        self.__cell_size = float(cell_size)
+        self.__inverse = 1.0 / self.__cell_size
+        self.__cells: dict[tuple[int, int], list[int]] = {} # (column, row) : shape ids
+        self.__shapes: list[Shape] = [] # shape id is the position here
+        self.__boxes: list[BoundingBox] = []
+        self.__oversized: list[int] = [] # ids of shapes not listed in any cell, ascending
+    
+    @classmethod
+    def bulk_load(cls, shapes: Iterable[Shape], cell_size: Optional[float] = None) -> 'SpatialGrid':
+        shapes = list(shapes)
+        for shape in shapes:
+            if not isinstance(shape, Shape):
+                raise TypeError(f"{shape} is not a shape")
+        boxes = [shape.bounding_box() for shape in shapes]
+        if cell_size is None:
+            # twice the median shape extent: a typical shape touches ~2.25 cells instead of ~4 at one
+            # extent, which roughly halves the build, while a cell still holds only a handful of shapes.
+            # The median, unlike the mean, is not dragged up by a few outsized shapes
+            extents = sorted(max(x1 - x0, y1 - y0) for x0, y0, x1, y1 in boxes)
+            cell_size = (2 * extents[len(extents) // 2] if extents else 0.0) or 1.0
+        grid = cls(cell_size)
+        grid.__add_many(shapes, boxes)
+        return grid
+    
+    def insert(self, shape: Shape) -> int:
+        if not isinstance(shape, Shape):
+            raise TypeError(f"{shape} is not a shape")
+        self.__add_many([shape], [shape.bounding_box()])
+        return len(self.__shapes) - 1
+    
+    def __add_many(self, shapes: list[Shape], boxes: list[BoundingBox]) -> None:
+        # the hot loop of bulk_load, so the cell span is worked out inline
+        first = len(self.__shapes)
+        self.__shapes.extend(shapes)
+        self.__boxes.extend(boxes)
+        cells = self.__cells
+        get = cells.get
+        inverse = self.__inverse
+        limit = self.MAX_CELLS_PER_SHAPE
+        with _gc_paused():
+            for shape_id, (x0, y0, x1, y1) in enumerate(boxes, first):
+                columns = range(floor(x0 * inverse), floor(x1 * inverse) + 1)
+                rows = range(floor(y0 * inverse), floor(y1 * inverse) + 1)
+                if len(columns) * len(rows) > limit:
+                    self.__oversized.append(shape_id)
+                    continue
+                for column in columns:
+                    for row in rows:
+                        ids = get((column, row))
+                        if ids is None:
+                            cells[(column, row)] = [shape_id]
+                        else:
+                            ids.append(shape_id)
+    
+    def __cell_span(self, box: BoundingBox) -> tuple[range, range]:
+        inverse = self.__inverse
+        return (range(floor(box[0] * inverse), floor(box[2] * inverse) + 1),
+                range(floor(box[1] * inverse), floor(box[3] * inverse) + 1))
+    
+    def query_point(self, x: float, y: float) -> list[Shape]:
+        # shapes containing (x, y), boundary included, in insertion order
+        inverse = self.__inverse
+        ids = self.__cells.get((floor(x * inverse), floor(y * inverse)))
+        if self.__oversized:
+            ids = merge(ids or (), self.__oversized) # both ascending, so insertion order holds
+        elif not ids:
+            return []
+        shapes, boxes = self.__shapes, self.__boxes
+        found = []
+        for i in ids:
+            x0, y0, x1, y1 = boxes[i]
+            if x0 <= x <= x1 and y0 <= y <= y1 and shapes[i].contains_point(x, y):
+                found.append(shapes[i])
+        return found
+    
+    def query_range(self, min_x: float, min_y: float, max_x: float, max_y: float) -> list[Shape]:
+        # shapes whose bounding box overlaps the range (edges touching count), in insertion order
+        if min_x > max_x or min_y > max_y:
+            raise ValueError("range must satisfy min_x <= max_x and min_y <= max_y")
+        columns, rows = self.__cell_span((min_x, min_y, max_x, max_y))
+        cells = self.__cells
+        candidates: set[int] = set()
+        if len(columns) * len(rows) <= len(cells):
+            for column in columns:
+                for row in rows:
+                    ids = cells.get((column, row))
+                    if ids:
+                        candidates.update(ids)
+        else:
+            # the range covers more cells than are occupied - walk the occupied ones instead
+            for (column, row), ids in cells.items():
+                if column in columns and row in rows:
+                    candidates.update(ids)
+        candidates.update(self.__oversized)
+        
+        boxes = self.__boxes
+        hits = [i for i in candidates
+                if boxes[i][0] <= max_x and min_x <= boxes[i][2] and boxes[i][1] <= max_y and min_y <= boxes[i][3]]
+        hits.sort()
+        return [self.__shapes[i] for i in hits]
+    
+    def cell_size(self) -> float:
+        return self.__cell_size
+    
+    def __len__(self) -> int:
+        return len(self.__shapes)
+
+
+class AreaIndex:
+    # shapes kept sorted by area for many queries against a mostly static set. The sorted run is cut
+    # into buckets of about _LOAD shapes with the largest area of each bucket in __maxes, so a
+    # threshold is two bisects, the k largest come off the last buckets, and insert / remove only
+    # shift one bucket instead of the whole run. Equal areas are kept newest-first, so the largest
+    # shape is the earliest one added, same as largest_shape() on a list
+    _LOAD = 1000
+    
+    def __init__(self, shapes: Iterable[Shape] = ()) -> None:
+        shapes = list(shapes)
+        for shape in shapes:
+            if not isinstance(shape, Shape):
+                raise TypeError(f"{shape} is not a shape")
+        areas = [shape.area() for shape in shapes]
+        # a stable descending sort, reversed: ascending by area, ties in reverse insertion order
+        order = sorted(range(len(shapes)), key=areas.__getitem__, reverse=True)
+        order.reverse()
+        load = self._LOAD
+        self.__areas = [array('d', [areas[i] for i in order[start:start + load]])
+                        for start in range(0, len(order), load)] # one sorted array per bucket
+        self.__shapes = [[shapes[i] for i in order[start:start + load]] for start in range(0, len(order), load)]
+        self.__maxes = [bucket[-1] for bucket in self.__areas]
+        self.__count = len(shapes)
+        # running total kept by insert / remove; summed in input order like total_area() on the list
+        self.__total = sum(areas, 0.0)
+    
+    def insert(self, shape: Shape) -> None:
+        if not isinstance(shape, Shape):
+            raise TypeError(f"{shape} is not a shape")
+        area = shape.area()
+        if not self.__maxes:
+            self.__areas.append(array('d', [area]))
+            self.__shapes.append([shape])
+            self.__maxes.append(area)
+            self.__count = 1
+            self.__total = area
+            return
+        
+        b = min(bisect_left(self.__maxes, area), len(self.__maxes) - 1)
+        areas, shapes = self.__areas[b], self.__shapes[b]
+        position = bisect_left(areas, area)
+        areas.insert(position, area)
+        shapes.insert(position, shape)
+        self.__maxes[b] = areas[-1]
+        self.__count += 1
+        self.__total += area
+        
+        if len(areas) > 2 * self._LOAD:
+            # split the bucket in half
+            half = len(areas) // 2
+            self.__areas[b + 1:b + 1] = [areas[half:]]
+            self.__shapes[b + 1:b + 1] = [shapes[half:]]
+            del areas[half:]
+            del shapes[half:]
+            self.__maxes[b:b + 1] = [areas[-1], self.__areas[b + 1][-1]]
+    
+    def remove(self, shape: Shape) -> None:
+        # by identity: equal-area shapes are different shapes
+        area = shape.area()
+        for b in range(bisect_left(self.__maxes, area), len(self.__maxes)):
+            areas, shapes = self.__areas[b], self.__shapes[b]
+            if areas[0] > area:
+                break
+            for position in range(bisect_left(areas, area), bisect_right(areas, area)):
+                if shapes[position] is shape:
+                    del areas[position]
+                    del shapes[position]
+                    self.__count -= 1
+                    # an emptied index starts from an exact zero again instead of the leftover rounding
+                    self.__total = self.__total - area if self.__count else 0.0
+                    if areas:
+                        self.__maxes[b] = areas[-1]
+                    else:
+                        del self.__areas[b]
+                        del self.__shapes[b]
+                        del self.__maxes[b]
+                    return
+        raise ValueError(f"{shape} is not in the index")
+    
+    def larger_than(self, threshold: float) -> list[Shape]:
+        # shapes with area > threshold, in ascending order of area
+        b = bisect_right(self.__maxes, threshold)
+        if b == len(self.__maxes):
+            return []
+        found = self.__shapes[b][bisect_right(self.__areas[b], threshold):]
+        for shapes in islice(self.__shapes, b + 1, None):
+            found.extend(shapes)
+        return found
+    
+    def top_k(self, k: int) -> list[Shape]:
+        # the k largest, largest first
+        if not isinstance(k, int):
+            raise TypeError("k must be an integer")
+        if k < 0:
+            raise ValueError("k cannot be negative")
+        found: list[Shape] = []
+        for shapes in reversed(self.__shapes):
+            if len(found) >= k:
+                break
+            found.extend(islice(reversed(shapes), k - len(found)))
+        return found
+    
+    def largest(self) -> Shape:
+        if not self.__count:
+            raise ValueError("largest() of an empty AreaIndex")
+        return self.__shapes[-1][-1]
+    
+    def total_area(self) -> float:
+        # O(1)
+        return self.__total
+    
+    def __len__(self) -> int:
+        return self.__count
+
+
+# the helpers take a plain list of shapes (one area() call per shape), a ShapeBatch or an AreaIndex
+
+def largest_shape(shapes: Union[list[Shape], ShapeBatch, AreaIndex]) -> Shape:
+    if isinstance(shapes, ShapeBatch):
+        return shapes.largest_shape()
+    if isinstance(shapes, AreaIndex):
+        return shapes.largest()
     return max(shapes, key=lambda x: x.area())
     
-def total_area(shapes: list[Shape]) -> float:
+def total_area(shapes: Union[list[Shape], ShapeBatch, AreaIndex]) -> float:
+    if isinstance(shapes, (ShapeBatch, AreaIndex)):
+        return shapes.total_area()
     curr_total: float = 0.0
     for shape in shapes:
         curr_total += shape.area()
     return curr_total
 
-def shapes_larger_than(threshold: float, shapes: list[Shape]) -> list[Shape]:
+def shapes_larger_than(threshold: float, shapes: Union[list[Shape], ShapeBatch, AreaIndex]) -> list[Shape]:
+    if isinstance(shapes, ShapeBatch):
+        return shapes.shapes_larger_than(threshold)
+    if isinstance(shapes, AreaIndex):
+        return shapes.larger_than(threshold) # ascending area rather than insertion order
     filtered_shapes = [i for i in shapes if i.area() > threshold]
     return filtered_shapes
+
+
+class ShapeSummary:
+    # running count / total area / largest shape, see summarize_shapes
+    __slots__ = ("count", "total_area", "largest")
+    
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_area = 0.0
+        self.largest: Optional[Shape] = None
+    
+    def add(self, shape: Shape) -> None:
+        area = shape.area()
+        self.count += 1
+        self.total_area += area
+        # strictly larger, so ties keep the first one seen, same as largest_shape()
+        if self.largest is None or area > self.largest.area():
+            self.largest = shape
+    
+    def __repr__(self) -> str:
+        return f"ShapeSummary(count={self.count}, total_area={self.total_area}, largest={self.largest!r})"
+
+
+def summarize_shapes(shapes: Iterable[Shape]) -> ShapeSummary:
+    # total_area and largest_shape in one pass over any iterable, holding one shape at a time -
+    # pair it with the streaming readers below for files that don't fit in memory
+    summary = ShapeSummary()
+    for shape in shapes:
+        summary.add(shape)
+    return summary
+
+
+# newline-delimited JSON: one Shape.to_record() object per line
+
+def iter_shapes_ndjson(lines: Iterable[str]) -> Iterator[Shape]:
+    # blank lines are skipped; a bad line raises ValueError naming its line number
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            shape = Shape.from_record(json.loads(line))
+        except (ValueError, TypeError) as error:
+            raise ValueError(f"line {number}: {error}") from error
+        yield shape
+
+def read_shapes_ndjson(path: Union[str, os.PathLike]) -> Iterator[Shape]:
+    with open(path, encoding="utf-8") as f:
+        yield from iter_shapes_ndjson(f)
+
+def write_shapes_ndjson(sink: Union[str, os.PathLike, TextIO], shapes: Iterable[Shape]) -> int:
+    # sink is a path or an open text stream; returns the number of shapes written
+    if not hasattr(sink, "write"):
+        with open(sink, "w", encoding="utf-8") as f:
+            return write_shapes_ndjson(f, shapes)
+    count = 0
+    dumps = json.dumps
+    for shape in shapes:
+        sink.write(dumps(shape.to_record()))
+        sink.write("\n")
+        count += 1
+    return count
+
+
+# binary shape file, fixed-size rows read with struct.iter_unpack straight off a memoryview:
+#   header | magic, row count
+#   rows   | type code, 7 pad bytes, up to 3 dimensions (unused ones 0.0), x, y as little-endian doubles
+SHAPES_HEADER = struct.Struct('<8sQ')
+SHAPES_MAGIC = b'SHAPES01'
+SHAPE_ROW = struct.Struct('<B7x5d')
+_BINARY_CODES = {"circle": 0, "rectangle": 1, "triangle": 2, "right_triangle": 3}
+_BINARY_TYPES = {code: record_type for record_type, code in _BINARY_CODES.items()}
+
+def write_shapes_binary(path: Union[str, os.PathLike], shapes: Iterable[Shape]) -> int:
+    count = 0
+    pack = SHAPE_ROW.pack
+    with open(path, 'wb') as f:
+        f.write(bytes(SHAPES_HEADER.size))
+        for shape in shapes:
+            code = _BINARY_CODES.get(shape.record_type)
+            if code is None:
+                raise TypeError(f"{type(shape).__name__} has no binary row format")
+            dimensions = shape._dimensions()
+            f.write(pack(code, *dimensions, *repeat(0.0, 3 - len(dimensions)), *shape.position()))
+            count += 1
+        f.seek(0)
+        f.write(SHAPES_HEADER.pack(SHAPES_MAGIC, count))
+    return count
+
+def iter_shapes_binary(buffer: Union[bytes, bytearray, memoryview, mmap.mmap]) -> Iterator[Shape]:
+    # rows are unpacked in place - no copy of the buffer is made; every shape still goes through
+    # its validating constructor, so a corrupt file fails loudly instead of yielding garbage
+    view = memoryview(buffer)
+    try:
+        yield from _binary_rows(view, 0, _binary_row_count(view))
+    finally:
+        view.release()
+
+def _binary_rows(view: memoryview, first: int, last: int) -> Iterator[Shape]:
+    # shapes from rows first..last-1 of a checked binary shape file
+    types, record_types = _BINARY_TYPES, Shape._record_types
+    start = SHAPES_HEADER.size + first * SHAPE_ROW.size
+    for code, d0, d1, d2, x, y in SHAPE_ROW.iter_unpack(view[start:start + (last - first) * SHAPE_ROW.size]):
+        kind = record_types[types[code]] if code in types else None
+        if kind is None:
+            raise ValueError(f"unknown shape type code {code}")
+        yield kind(*(d0, d1, d2)[:len(kind._record_fields)], x=x, y=y)
+
+def _binary_row_count(view: memoryview) -> int:
+    magic, count = SHAPES_HEADER.unpack_from(view)
+    if magic != SHAPES_MAGIC:
+        raise ValueError("not a binary shape file")
+    if len(view) < SHAPES_HEADER.size + count * SHAPE_ROW.size:
+        raise ValueError("binary shape file is truncated")
+    return count
+
+def read_shapes_binary(path: Union[str, os.PathLike]) -> Iterator[Shape]:
+    # mmap-backed, so memory use does not grow with the file
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from iter_shapes_binary(mapped)
     
 
+# sharded summaries over a process pool. Every shard reports (count, sum of areas, largest area,
+# index of its first largest shape); the parent merges the shards in order, so the result does not
+# depend on which worker finishes first, and ties go to the lowest index like largest_shape()
+
+_Partial = tuple[int, float, float, int]
+
+def _summarize_part(shapes: Iterable[Shape], offset: int) -> _Partial:
+    count, total, best, best_index = 0, 0.0, -inf, -1
+    for count, shape in enumerate(shapes, 1):
+        area = shape.area()
+        total += area
+        if area > best:
+            best, best_index = area, offset + count - 1
+    return count, total, best, best_index
+
+def _summarize_file_shard(path: str, first: int, last: int) -> _Partial:
+    # each worker maps the file itself, only the path and the row range cross the process boundary
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return _summarize_part(_binary_rows(view, first, last), first)
+            finally:
+                view.release()
+
+def parallel_summarize(
+    source: Union[list[Shape], str, os.PathLike],
+    workers: Optional[int] = None,
+    shards: Optional[int] = None,
+    ) -> ShapeSummary:
+    # summarize_shapes() over a list of shapes or a binary shape file, shard by shard. total_area is
+    # the fsum of the shard sums, so it can differ from the serial running sum in the last bits but
+    # is the same on every run with the same shard count. workers=0 runs the shards in this process.
+    # Only a file is spread over workers: pickling a Shape to a worker costs far more than its area()
+    # call, so a list is always summarized here - write it with write_shapes_binary to go parallel
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if not isinstance(workers, int):
+        raise TypeError("workers must be an integer")
+    if workers < 0:
+        raise ValueError("workers cannot be negative")
+    if shards is None:
+        shards = 4 * max(workers, 1) # a few shards per worker evens out slow ones
+    if not isinstance(shards, int):
+        raise TypeError("shards must be an integer")
+    if shards <= 0:
+        raise ValueError("shards must be positive")
+    
+    from_file = not isinstance(source, list)
+    if from_file:
+        path = os.fspath(source)
+        with open(path, 'rb') as f:
+            header = f.read(SHAPES_HEADER.size)
+            size = os.fstat(f.fileno()).st_size
+        magic, total_rows = SHAPES_HEADER.unpack(header) if len(header) == SHAPES_HEADER.size else (b'', 0)
+        if magic != SHAPES_MAGIC:
+            raise ValueError(f"{path} is not a binary shape file")
+        if size < SHAPES_HEADER.size + total_rows * SHAPE_ROW.size:
+            raise ValueError(f"{path} is truncated")
+    else:
+        total_rows = len(source)
+    
+    # contiguous row ranges; the first len % shards shards get one extra row
+    per_shard, extra = divmod(total_rows, shards)
+    bounds = [i * per_shard + min(i, extra) for i in range(shards + 1)]
+    ranges = [(first, last) for first, last in zip(bounds, bounds[1:]) if first < last]
+    if from_file:
+        jobs = [(_summarize_file_shard, (path, first, last)) for first, last in ranges]
+    else:
+        jobs = [(_summarize_part, (source[first:last], first)) for first, last in ranges]
+    
+    if workers == 0 or len(jobs) <= 1 or not from_file:
+        partials = [fn(*args) for fn, args in jobs]
+    else:
+        with ProcessPoolExecutor(min(workers, len(jobs))) as pool:
+            futures = [pool.submit(fn, *args) for fn, args in jobs]
+            partials = [future.result() for future in futures]
+    
+    summary = ShapeSummary()
+    summary.count = sum(partial[0] for partial in partials)
+    summary.total_area = fsum(partial[1] for partial in partials)
+    best, best_index = -inf, -1
+    for _, _, area, index in partials: # shard order, so only a strictly larger area moves the winner
+        if area > best:
+            best, best_index = area, index
+    if best_index >= 0:
+        if from_file:
+            with open(path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    view = memoryview(mapped)
+                    try:
+                        [summary.largest] = _binary_rows(view, best_index, best_index + 1)
+                    finally:
+                        view.release()
+        else:
+            summary.largest = source[best_index]
+    return summary
+
+
 if __name__ == "__main__":
     shapes = [
         Circle(5),
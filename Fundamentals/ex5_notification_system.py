@@ -1,4 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import Optional
 
 class NotificationChannel(ABC):
     @abstractmethod
@@ -9,6 +11,17 @@ class NotificationChannel(ABC):
     def channel_type(self) -> str:
         pass
     
+class AsyncNotificationChannel(NotificationChannel):
+    # a channel whose delivery is a coroutine, so NotificationService.notify_async can wait on it
+    # without a thread. send() is still there for the synchronous API; it runs its own event loop,
+    # so it must not be called from code that is already running in one
+    @abstractmethod
+    async def send_async(self, recipient: str, message: str) -> bool:
+        pass
+    
+    def send(self, recipient: str, message: str) -> bool:
+        return asyncio.run(self.send_async(recipient=recipient, message=message))
+    
 class EmailChannel(NotificationChannel):
     def __init__(self, smtp_server: str, sender_address: str) -> None:
         self.__smtp_server = smtp_server
@@ -55,6 +68,51 @@ class NotificationService:
         for c in self.__channels.values():
             c.send(recipient=recipient, message=message)
     
+    async def notify_async(self, recipient: str, message: str, timeout: Optional[float] = None,
+                           timeouts: Optional[dict[str, float]] = None) -> dict[str, str]:
+        # sends on every channel at once and waits for all of them, so one slow channel no longer
+        # holds up the rest. Async channels are awaited directly, the others run send() in a worker
+        # thread. timeout (seconds) applies to every channel, timeouts overrides it per channel type.
+        # Returns channel type : status, in channel order, where status is one of
+        #   "sent"    - send returned True
+        #   "failed"  - send returned False
+        #   "timeout" - the channel did not answer in time. A thread cannot be stopped, so a sync
+        #               channel that times out may still finish sending in the background (and
+        #               asyncio.run() waits for that thread before it returns)
+        #   "error"   - send raised
+        timeouts = dict(timeouts or {})
+        for channel_type, limit in [(None, timeout), *timeouts.items()]:
+            if channel_type is not None and channel_type not in self.__channels:
+                raise ValueError(f"no {channel_type!r} channel to set a timeout for")
+            if limit is None:
+                continue
+            if not isinstance(limit, (int, float)):
+                raise TypeError(f"{limit} is not a number")
+            if not limit > 0:
+                raise ValueError(f"timeout must be positive, got {limit}")
+        
+        channels = list(self.__channels.items())
+        statuses = await asyncio.gather(*(
+            self.__deliver(channel, recipient, message, timeouts.get(channel_type, timeout))
+            for channel_type, channel in channels
+        ))
+        return {channel_type: status for (channel_type, _), status in zip(channels, statuses)}
+    
+    @staticmethod
+    async def __deliver(channel: NotificationChannel, recipient: str, message: str,
+                        timeout: Optional[float]) -> str:
+        if isinstance(channel, AsyncNotificationChannel):
+            sending = channel.send_async(recipient=recipient, message=message)
+        else:
+            sending = asyncio.to_thread(channel.send, recipient=recipient, message=message)
+        try:
+            sent = await asyncio.wait_for(sending, timeout)
+        except asyncio.TimeoutError:
+            return "timeout"
+        except Exception:
+            return "error"
+        return "sent" if sent else "failed"
+    
     def notify_via(self, channel_type: str, recipient: str, message: str) -> bool:
         if channel_type not in self.__channels:
             return False
@@ -177,6 +177,321 @@ class TestBankAccount:
         result = self.acc.__eq__("not_an_account")
         assert result is NotImplemented
 
+    # --- standalone storage ---
+
+    def test_standalone_accounts_stay_independent(self):
+        accounts = [BankAccount() for _ in range(50)]
+        for i, account in enumerate(accounts, 1):
+            account.deposit(i)
+        del accounts[::2]
+        fresh = [BankAccount() for _ in range(30)]
+        assert all(account.get_balance() == 0 for account in fresh)
+        assert [account.get_balance() for account in accounts] == list(range(2, 51, 2))
+        assert not hasattr(fresh[0], "__dict__")
+
+    def test_copied_standalone_account_is_independent(self):
+        import copy
+        import gc
+        import pickle
+        self.acc.deposit(150)
+        for duplicate in (copy.copy(self.acc), copy.deepcopy(self.acc), pickle.loads(pickle.dumps(self.acc))):
+            assert duplicate.get_balance() == 150
+            duplicate.deposit(1)
+            assert self.acc.get_balance() == 150
+        del duplicate
+        gc.collect()
+        BankAccount().deposit(7)
+        assert self.acc.get_balance() == 150
+
+
+AccountLedger = _try_import("ex1_bank_account", "AccountLedger")
+
+@pytest.mark.skipif(AccountLedger is None, reason="AccountLedger not defined in ex1_bank_account.py")
+class TestAccountLedger:
+    """Tests for Exercise 1: array-backed AccountLedger"""
+
+    def setup_method(self):
+        self.ledger = AccountLedger()
+        self.rows = self.ledger.open_accounts(3)
+
+    def test_open_accounts_start_at_zero_balance(self):
+        assert len(self.ledger) == 3
+        assert all(self.ledger.get_balance(i) == 0 for i in self.rows)
+
+    def test_handles_share_the_ledger_row(self):
+        a = self.ledger.account(1)
+        b = self.ledger.account(1)
+        a.deposit(100)
+        assert b.get_balance() == 100
+        assert self.ledger.get_balance(1) == 100
+
+    def test_handle_keeps_bank_account_semantics(self):
+        a = self.ledger.account(0)
+        a.deposit(500)
+        a.transfer(200, self.ledger.account(2))
+        assert a.get_balance() == 300
+        assert str(self.ledger.account(2)) == "Account[balance=$200.00]"
+        with pytest.raises(ValueError):
+            a.withdraw(1_000)
+
+    def test_total_balance(self):
+        self.ledger.deposit(0, 10)
+        self.ledger.deposit(2, 32.5)
+        assert self.ledger.total_balance() == pytest.approx(42.5)
+
+    def test_account_out_of_range_raises_index_error(self):
+        with pytest.raises(IndexError):
+            self.ledger.account(3)
+
+    def test_handles_have_no_instance_dict(self):
+        assert not hasattr(self.ledger.account(0), "__dict__")
+
+    # --- transfer_many ---
+
+    def test_transfer_many_applies_whole_batch(self):
+        self.ledger.deposit(0, 100)
+        self.ledger.deposit(1, 50)
+        rejections = self.ledger.transfer_many([0, 1, 0], [1, 2, 2], [30, 40, 20])
+        assert rejections == {}
+        assert self.ledger.get_balance(0) == 50
+        assert self.ledger.get_balance(1) == 40
+        assert self.ledger.get_balance(2) == 60
+
+    def test_transfer_many_reports_rows_and_applies_nothing(self):
+        self.ledger.deposit(0, 100)
+        rejections = self.ledger.transfer_many([0, 1, 0, 2], [1, 2, 9, 0], [40, 10, 5, -1])
+        assert set(rejections) == {1, 2, 3}
+        assert self.ledger.get_balance(0) == 100
+        assert self.ledger.get_balance(1) == 0
+
+    def test_transfer_many_checks_total_outgoing_per_source(self):
+        self.ledger.deposit(0, 100)
+        rejections = self.ledger.transfer_many([0, 0], [1, 2], [60, 60])
+        assert set(rejections) == {0, 1}
+        assert self.ledger.get_balance(0) == 100
+
+    def test_transfer_many_rejects_non_int_indices_and_non_finite_amounts(self):
+        self.ledger.deposit(0, 100)
+        rejections = self.ledger.transfer_many([0, 0.0, 0, 0, 1], [1, 2, 2.0, 1, 2], [10, 10, 10, float("nan"), 0])
+        assert set(rejections) == {1, 2, 3, 4}
+        rejections = self.ledger.transfer_many([0, 0], [1, 2], [10, float("inf")])
+        assert set(rejections) == {1}
+        assert [self.ledger.get_balance(i) for i in self.rows] == [100, 0, 0]
+
+    def test_transfer_many_length_mismatch_raises(self):
+        with pytest.raises(ValueError):
+            self.ledger.transfer_many([0], [1, 2], [10])
+
+    # --- lock striping ---
+
+    def test_concurrent_withdraws_never_overdraw(self):
+        import threading
+        ledger = AccountLedger(lock_stripes=4)
+        acc = ledger.open_account()
+        acc.deposit(1_000)
+        failures = []
+
+        def worker():
+            for _ in range(200):
+                try:
+                    acc.withdraw(1)
+                except ValueError:
+                    failures.append(1)
+
+        pool = [threading.Thread(target=worker) for _ in range(8)]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        assert acc.get_balance() == 0
+        assert len(failures) == 600
+
+    def test_opposite_transfers_do_not_deadlock(self):
+        import threading
+        ledger = AccountLedger(lock_stripes=2)
+        a, b = ledger.open_account(), ledger.open_account()
+        a.deposit(10_000)
+        b.deposit(10_000)
+
+        def worker(src, dst):
+            for _ in range(2_000):
+                src.transfer(1, dst)
+
+        pool = [threading.Thread(target=worker, args=(a, b)), threading.Thread(target=worker, args=(b, a))]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join(timeout=10)
+        assert not any(t.is_alive() for t in pool)
+        assert a.get_balance() + b.get_balance() == 20_000
+
+    def test_negative_lock_stripes_raises(self):
+        with pytest.raises(ValueError):
+            AccountLedger(lock_stripes=-1)
+
+    # --- fixed-point mode ---
+
+    def test_fixed_point_balances_are_exact(self):
+        ledger = AccountLedger(fixed_point=True)
+        a, b = ledger.open_account(), ledger.open_account()
+        for _ in range(10):
+            a.deposit(0.1)
+        b.deposit(1)
+        assert a.get_balance() == 1.0
+        assert a == b
+
+    def test_fixed_point_rejects_sub_cent_amounts(self):
+        ledger = AccountLedger(fixed_point=True)
+        acc = ledger.open_account()
+        with pytest.raises(ValueError):
+            acc.deposit(0.001)
+        acc.deposit(10)
+        assert ledger.transfer_many([0], [0], [0.125]) == {0: "Amount has more precision than one cent"}
+
+    def test_fixed_point_accepts_whole_cents_on_large_amounts(self):
+        import random
+        rng = random.Random(5)
+        ledger = AccountLedger(fixed_point=True)
+        acc = ledger.open_account()
+        expected = 0
+        for _ in range(5_000):
+            cents = rng.randrange(10_000_000_000, 100_000_000_000_000) # $100M to $1T
+            acc.deposit(cents / 100)
+            expected += cents
+        acc.deposit(305231995.22)
+        assert ledger.total_balance() == (expected + 30523199522) / 100
+        with pytest.raises(ValueError):
+            acc.deposit(100_000_000.005)
+
+    def test_fixed_point_rejects_non_finite_and_huge_amounts(self):
+        ledger = AccountLedger(fixed_point=True)
+        acc = ledger.open_account()
+        for amount in (float("inf"), float("nan"), 1e17):
+            with pytest.raises(ValueError):
+                acc.deposit(amount)
+        acc.deposit(10)
+        rejections = ledger.transfer_many([0, 0, 0], [0, 0, 0], [float("inf"), 1e17, 1])
+        assert set(rejections) == {0, 1} and acc.get_balance() == 10
+
+    def test_transfer_between_ledgers_rolls_back_on_refusal(self):
+        source = AccountLedger().open_account()
+        target = AccountLedger(fixed_point=True).open_account()
+        source.deposit(10)
+        with pytest.raises(ValueError):
+            source.transfer(0.001, target)
+        assert source.get_balance() == 10 and target.get_balance() == 0
+        source.transfer(2.5, target)
+        assert source.get_balance() == 7.5 and target.get_balance() == 2.5
+
+    def test_fixed_point_keeps_bank_account_semantics(self):
+        ledger = AccountLedger(fixed_point=True)
+        a, b = ledger.open_account(), ledger.open_account()
+        a.deposit(99.9)
+        a.transfer(0.9, b)
+        assert str(a) == "Account[balance=$99.00]"
+        assert ledger.total_balance() == pytest.approx(99.9)
+        with pytest.raises(ValueError):
+            b.withdraw(0.91)
+
+
+AccountJournal = _try_import("ex1_bank_account", "AccountJournal")
+
+@pytest.mark.skipif(AccountJournal is None, reason="AccountJournal not defined in ex1_bank_account.py")
+class TestAccountJournal:
+    """Tests for Exercise 1: write-ahead journal, snapshot and recovery"""
+
+    def _build(self, journal_path):
+        journal = AccountJournal(journal_path, group_size=4, sync=False)
+        ledger = AccountLedger(journal=journal)
+        a, b = ledger.open_account(), ledger.open_account()
+        a.deposit(500)
+        a.transfer(120, b)
+        b.withdraw(20)
+        return ledger, journal
+
+    def test_recover_from_journal_only(self, tmp_path):
+        journal_path = str(tmp_path / "ledger.wal")
+        ledger, journal = self._build(journal_path)
+        with pytest.raises(ValueError):
+            ledger.withdraw(0, 10_000)  # rejected operations are never journaled
+        journal.close()
+        recovered = AccountLedger.recover(journal_path)
+        assert len(recovered) == 2
+        assert recovered.get_balance(0) == 380
+        assert recovered.get_balance(1) == 100
+
+    def test_recover_from_snapshot_and_tail(self, tmp_path):
+        journal_path = str(tmp_path / "ledger.wal")
+        snapshot_path = str(tmp_path / "ledger.snap")
+        ledger, journal = self._build(journal_path)
+        ledger.snapshot(snapshot_path)
+        ledger.transfer_many([0], [1], [80])
+        journal.close()
+        recovered = AccountLedger.recover(journal_path, snapshot_path)
+        assert recovered.get_balance(0) == 300
+        assert recovered.get_balance(1) == 180
+
+    def test_torn_tail_record_is_ignored(self, tmp_path):
+        journal_path = str(tmp_path / "ledger.wal")
+        self._build(journal_path)[1].close()
+        with open(journal_path, "ab") as f:
+            f.write(b"\x01\x00\x00")
+        assert AccountLedger.recover(journal_path).get_balance(0) == 380
+
+    def test_torn_tail_is_cut_before_journaling_resumes(self, tmp_path):
+        journal_path = str(tmp_path / "ledger.wal")
+        self._build(journal_path)[1].close()
+        with open(journal_path, "ab") as f:
+            f.write(b"\x01\x00\x00")
+        journal = AccountJournal(journal_path, sync=False)
+        ledger = AccountLedger.recover(journal_path, journal=journal)
+        ledger.deposit(0, 5)
+        ledger.deposit(1, 7)
+        journal.close()
+        recovered = AccountLedger.recover(journal_path)
+        assert recovered.get_balance(0) == 385
+        assert recovered.get_balance(1) == 107
+
+    def test_snapshot_offset_after_truncated_tail(self, tmp_path):
+        journal_path = str(tmp_path / "ledger.wal")
+        snapshot_path = str(tmp_path / "ledger.snap")
+        self._build(journal_path)[1].close()
+        with open(journal_path, "ab") as f:
+            f.write(b"\x01\x00\x00")
+        journal = AccountJournal(journal_path, sync=False)
+        ledger = AccountLedger.recover(journal_path, journal=journal)
+        ledger.snapshot(snapshot_path)
+        ledger.deposit(0, 5)
+        journal.close()
+        assert AccountLedger.recover(journal_path, snapshot_path).get_balance(0) == 385
+
+    def test_snapshot_requires_a_journal(self, tmp_path):
+        journal_path = str(tmp_path / "ledger.wal")
+        self._build(journal_path)[1].close()
+        with pytest.raises(ValueError):
+            AccountLedger.recover(journal_path).snapshot(str(tmp_path / "ledger.snap"))
+
+    def test_recovered_ledger_keeps_journaling(self, tmp_path):
+        journal_path = str(tmp_path / "ledger.wal")
+        self._build(journal_path)[1].close()
+        journal = AccountJournal(journal_path, sync=False)
+        AccountLedger.recover(journal_path, journal=journal).deposit(1, 1)
+        journal.close()
+        assert AccountLedger.recover(journal_path).get_balance(1) == 101
+
+    def test_recover_fixed_point_ledger(self, tmp_path):
+        journal_path = str(tmp_path / "ledger.wal")
+        snapshot_path = str(tmp_path / "ledger.snap")
+        journal = AccountJournal(journal_path, sync=False)
+        ledger = AccountLedger(journal=journal, fixed_point=True)
+        ledger.open_account().deposit(10.25)
+        ledger.snapshot(snapshot_path)
+        ledger.withdraw(0, 0.05)
+        journal.close()
+        assert AccountLedger.recover(journal_path, snapshot_path, fixed_point=True).get_balance(0) == 10.2
+        with pytest.raises(ValueError):
+            AccountLedger.recover(journal_path, snapshot_path)
+
 
 # ===========================================================================
 # EXERCISE 2 — Library Book System
@@ -184,6 +499,7 @@ class TestBankAccount:
 
 Book = _try_import("ex2_library_system", "Book")
 Library = _try_import("ex2_library_system", "Library")
+CatalogSnapshot = _try_import("ex2_library_system", "CatalogSnapshot")
 
 @pytest.mark.skipif(Book is None or Library is None, reason="ex2_library_system.py not found or classes not defined")
 class TestBook:
@@ -227,6 +543,9 @@ class TestBook:
         assert not hasattr(self.book, "is_checked_out"), \
             "_is_checked_out should be protected (single underscore)"
 
+    def test_book_uses_slots(self):
+        assert not hasattr(self.book, "__dict__")
+
 
 @pytest.mark.skipif(Book is None or Library is None, reason="ex2_library_system.py not found or classes not defined")
 class TestLibrary:
@@ -291,6 +610,228 @@ class TestLibrary:
         with pytest.raises(TypeError):
             self.library.add_book("not a book")
 
+    def test_author_names_are_interned(self):
+        other = Book("The Caves of Steel", "".join(["Isaac ", "Asimov"]), "978-0553293401")
+        assert other.author is not self.b2.author
+        self.library.add_book(self.b2)
+        self.library.add_book(other)
+        assert other.author is self.b2.author
+
+    # --- secondary indexes ---
+
+    def test_find_by_isbn(self):
+        self.library.add_book(self.b1)
+        self.library.add_book(self.b2)
+        assert self.library.find_by_isbn("978-0553293357") is self.b2
+        assert self.library.find_by_isbn("000") is None
+
+    def test_copies_with_the_same_isbn_are_kept(self):
+        copy = Book("Dune", "Frank Herbert", "978-0441013593")
+        self.library.add_book(self.b1)
+        self.library.add_book(self.b2)
+        self.library.add_book(copy)
+        assert len(self.library) == 3
+        assert self.library.find_by_isbn("978-0441013593") is self.b1
+        assert self.library.find_copies_by_isbn("978-0441013593") == [self.b1, copy]
+        assert self.library.find_copies_by_isbn("978-0553293357") == [self.b2]
+        assert self.library.find_copies_by_isbn("000") == []
+        assert self.library.find_by_author("Frank Herbert") == [self.b1, copy]
+
+    def test_find_by_title_prefix_is_case_insensitive_and_ordered(self):
+        for book in (self.b1, self.b2, self.b3, Book("Foundation and Empire", "Isaac Asimov", "978-0553293371")):
+            self.library.add_book(book)
+        result = self.library.find_by_title_prefix("fOUN")
+        assert [b.title for b in result] == ["Foundation", "Foundation and Empire"]
+        assert self.library.find_by_title_prefix("Dune") == [self.b1]
+        assert self.library.find_by_title_prefix("Zzz") == []
+
+    def test_find_by_title_prefix_limit(self):
+        for book in (self.b1, self.b2, self.b3):
+            self.library.add_book(book)
+        assert len(self.library.find_by_title_prefix("", limit=2)) == 2
+
+    # --- incremental availability ---
+
+    def test_returned_book_is_available_again(self):
+        self.library.add_book(self.b1)
+        self.library.add_book(self.b2)
+        self.b1.check_out()
+        assert self.library.get_available_books() == [self.b2]
+        self.b1.return_book()
+        assert set(self.library.get_available_books()) == {self.b1, self.b2}
+
+    def test_book_checked_out_before_adding_is_not_available(self):
+        self.b1.check_out()
+        self.library.add_book(self.b1)
+        assert self.library.get_available_books() == []
+
+    def test_book_held_by_several_libraries_updates_each(self):
+        branches = [Library(), Library()]
+        for library in (self.library, *branches):
+            library.add_book(self.b1)
+        self.b1.check_out()
+        assert all(library.get_available_books() == [] for library in (self.library, *branches))
+        self.b1.return_book()
+        assert all(library.get_available_books() == [self.b1] for library in (self.library, *branches))
+
+    def test_iter_available_books_is_lazy(self):
+        self.library.add_book(self.b1)
+        self.library.add_book(self.b2)
+        it = self.library.iter_available_books()
+        assert not isinstance(it, list)
+        assert list(it) == [self.b1, self.b2]
+
+    # --- full-text search ---
+
+    def _add_all(self):
+        for book in (self.b1, self.b2, self.b3, Book("Foundation and Empire", "Isaac Asimov", "978-0553293371")):
+            self.library.add_book(book)
+
+    def test_search_and_matches_title_and_author(self):
+        self._add_all()
+        result = self.library.search("asimov foundation")
+        assert {b.title for b in result} == {"Foundation", "Foundation and Empire"}
+        assert self.library.search("asimov dune") == []
+
+    def test_search_or_ranks_best_match_first(self):
+        self._add_all()
+        result = self.library.search("robot herbert", mode="or")
+        assert set(result) == {self.b1, self.b3}
+        # shorter document with the rare term beats the longer one
+        assert self.library.search("foundation", mode="or")[0] is self.b2
+
+    def test_search_limit_and_unknown_terms(self):
+        self._add_all()
+        assert len(self.library.search("asimov", limit=2)) == 2
+        assert self.library.search("tolkien") == []
+        with pytest.raises(ValueError):
+            self.library.search("dune", mode="xor")
+
+    # --- bulk import / export ---
+
+    def test_bulk_load_accepts_books_and_rows(self):
+        rows = (r for r in [self.b1, ("Foundation", "Isaac Asimov", "978-0553293357")])
+        assert self.library.bulk_load(rows) == 2
+        assert len(self.library) == 2
+        assert self.library.find_by_isbn("978-0553293357").title == "Foundation"
+        assert len(self.library.find_by_author("Isaac Asimov")) == 1
+        self.library.add_book(self.b3)
+        assert [b.title for b in self.library.search("asimov", mode="or")] == ["Foundation", "I, Robot"]
+
+    def test_bulk_load_csv(self, tmp_path):
+        path = tmp_path / "catalog.csv"
+        path.write_text('title,author,isbn\n"I, Robot",Isaac Asimov,978-0553294385\nDune,Frank Herbert,978-0441013593\n')
+        assert self.library.bulk_load_csv(str(path), has_header=True) == 2
+        assert self.library.find_by_title_prefix("i, r")[0].author == "Isaac Asimov"
+
+    def test_bulk_load_csv_skips_blank_lines_and_names_bad_ones(self, tmp_path):
+        path = tmp_path / "catalog.csv"
+        path.write_text('Dune,Frank Herbert,978-0441013593\n\nFoundation,Isaac Asimov,978-0553293357\n\n')
+        assert self.library.bulk_load_csv(str(path)) == 2
+        path.write_text('Dune,Frank Herbert,978-0441013593\nFoundation,Isaac Asimov\n')
+        with pytest.raises(ValueError, match="line 2"):
+            Library().bulk_load_csv(str(path))
+
+    def test_snapshot_round_trip_is_lazy(self, tmp_path):
+        for book in (self.b1, self.b2, self.b3):
+            self.library.add_book(book)
+        self.b2.check_out()
+        path = str(tmp_path / "catalog.snap")
+        self.library.save_snapshot(path)
+
+        with CatalogSnapshot(path) as snapshot:
+            assert len(snapshot) == 3
+            assert snapshot[1] is snapshot[1]
+            assert (snapshot[1].title, snapshot[1].is_available()) == ("Foundation", False)
+            restored = Library()
+            restored.bulk_load(snapshot)
+        assert [b.isbn for b in restored.get_available_books()] == ["978-0441013593", "978-0553294385"]
+
+    def test_from_snapshot_restores_every_index(self, tmp_path):
+        self._add_all()
+        copy = Book("Dune", "Frank Herbert", "978-0441013593")
+        self.library.add_book(copy)
+        self.b3.check_out()
+        path = str(tmp_path / "catalog.snap")
+        self.library.save_snapshot(path)
+
+        restored = Library.from_snapshot(path)
+        assert len(restored) == 5
+        assert [b.isbn for b in restored.search("asimov foundation")] == [b.isbn for b in self.library.search("asimov foundation")]
+        assert [b.title for b in restored.find_by_title_prefix("foun")] == ["Foundation", "Foundation and Empire"]
+        assert len(restored.find_copies_by_isbn("978-0441013593")) == 2
+        assert [b.title for b in restored.get_available_books()] == ["Dune", "Foundation", "Foundation and Empire", "Dune"]
+        assert restored.find_by_author("Isaac Asimov")[0].author is restored.find_by_author("Isaac Asimov")[1].author
+        restored.find_by_isbn("978-0553294385").return_book()
+        assert len(restored.get_available_books()) == 5
+        restored.add_book(Book("Robots of Dawn", "Isaac Asimov", "978-0553299496"))
+        assert [b.title for b in restored.search("robots dawn")] == ["Robots of Dawn"]
+
+    def test_from_snapshot_without_indexes(self, tmp_path):
+        self._add_all()
+        path = str(tmp_path / "catalog.snap")
+        CatalogSnapshot.write(path, [self.b3, self.b1])
+        restored = Library.from_snapshot(path)
+        assert [b.title for b in restored.find_by_title_prefix("")] == ["Dune", "I, Robot"]
+        assert [b.title for b in restored.search("robot")] == ["I, Robot"]
+
+    # --- concurrent checkout with reservations ---
+
+    def test_request_available_book_resolves_immediately(self):
+        self.library.add_book(self.b1)
+        future = self.library.request_book("978-0441013593", "ann")
+        assert future.result(timeout=1) is self.b1
+        assert not self.b1.is_available()
+        assert self.library.holder_of("978-0441013593") == "ann"
+
+    def test_reservations_are_served_in_fifo_order(self):
+        self.library.add_book(self.b1)
+        isbn = "978-0441013593"
+        self.library.request_book(isbn, "ann")
+        bob = self.library.request_book(isbn, "bob")
+        cid = self.library.request_book(isbn, "cid")
+        assert not bob.done()
+        assert self.library.return_by_isbn(isbn) == "bob"
+        assert bob.result(timeout=1) is self.b1 and not cid.done()
+        assert self.library.get_available_books() == []
+        assert self.library.return_by_isbn(isbn) == "cid"
+        assert self.library.return_by_isbn(isbn) is None
+        assert self.b1.is_available()
+
+    def test_cancelled_reservation_is_skipped(self):
+        self.library.add_book(self.b1)
+        isbn = "978-0441013593"
+        self.library.request_book(isbn, "ann")
+        self.library.request_book(isbn, "bob").cancel()
+        assert self.library.return_by_isbn(isbn) is None
+
+    def test_concurrent_requests_hand_out_one_copy_at_a_time(self):
+        import threading
+        self.library.add_book(self.b1)
+        isbn = "978-0441013593"
+        holders, mismatches = [], []
+
+        def patron(name):
+            for _ in range(50):
+                self.library.request_book(isbn, name).result(timeout=10)
+                holders.append(name)
+                if self.library.holder_of(isbn) != name:
+                    mismatches.append(name)
+                self.library.return_by_isbn(isbn)
+
+        pool = [threading.Thread(target=patron, args=(f"p{i}",)) for i in range(8)]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join(timeout=30)
+        assert len(holders) == 400
+        assert mismatches == []
+        assert self.b1.is_available()
+
+    def test_request_unknown_isbn_raises_value_error(self):
+        with pytest.raises(ValueError):
+            self.library.request_book("000", "ann")
+
 
 # ===========================================================================
 # EXERCISE 3 — Employee Payroll System
@@ -344,6 +885,155 @@ class TestEmployeePayroll:
         emp = FullTimeEmployee("Alice", "E001", base_salary=120_000)
         assert "Alice" in emp.generate_payslip()
 
+    def test_add_sale_invalid_amount_raises(self):
+        emp = CommissionEmployee("Carol", "E003", base_monthly_salary=3000, commission_rate=0.08)
+        with pytest.raises(TypeError):
+            emp.add_sale("100")
+        with pytest.raises(ValueError):
+            emp.add_sale(-5)
+
+    # --- per-period sales ---
+
+    def test_sales_are_kept_per_period(self):
+        emp = CommissionEmployee("Carol", "E003", base_monthly_salary=3000, commission_rate=0.1)
+        emp.add_sale(1000, period=0)
+        emp.add_sale(2000, period=2)
+        emp.add_sale(500)  # current period, 0
+        assert emp.pay_for_period(0) == pytest.approx(3150.0)
+        assert emp.pay_for_period(1) == pytest.approx(3000.0)
+        assert emp.pay_for_period(7) == pytest.approx(3000.0)
+        emp.set_current_period(2)
+        assert emp.calculate_monthly_pay() == pytest.approx(3200.0)
+
+    def test_pay_for_period_range_after_backdated_sale(self):
+        emp = CommissionEmployee("Carol", "E003", base_monthly_salary=1000, commission_rate=0.1)
+        emp.add_sales(iter([(0, 100), (1, 200), (3, 400)]))
+        assert emp.pay_for_periods(0, 3) == pytest.approx(4000 + 70)
+        emp.add_sale(1000, period=1)  # invalidates the prefix sums from period 1 on
+        assert emp.pay_for_periods(1, 3) == pytest.approx(3000 + 160)
+        assert emp.pay_for_periods(2, 2) == pytest.approx(1000)
+
+    def test_calendar_periods_are_stored_by_span(self):
+        import tracemalloc
+        from ex3_employee_payroll import SalesLedger
+        period = SalesLedger.period
+        assert period(2027, 1) == period(2026, 12) + 1
+        emp = CommissionEmployee("Carol", "E003", base_monthly_salary=1000, commission_rate=0.1)
+        tracemalloc.start()
+        emp.add_sale(10, period=period(2026, 10))
+        used, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert used < 10_000
+        emp.add_sales([(period(2026, 12), 30), (period(2026, 1), 20)])  # earlier than any sale so far
+        assert emp.pay_for_period(period(2026, 10)) == pytest.approx(1001)
+        assert emp.pay_for_periods(period(2026, 1), period(2026, 11)) == pytest.approx(11 * 1000 + 3)
+        assert emp.pay_for_periods(period(2026, 12), period(2027, 1)) == pytest.approx(2 * 1000 + 3)
+        with pytest.raises(ValueError):
+            emp.add_sale(5, period=period(2026, 10) + SalesLedger.MAX_SPAN)
+        assert emp.pay_for_periods(0, 10**6) == pytest.approx((10**6 + 1) * 1000 + 6)
+        with pytest.raises(ValueError):
+            period(2026, 13)
+
+    def test_add_sales_validates_rows(self):
+        emp = CommissionEmployee("Carol", "E003", base_monthly_salary=1000, commission_rate=0.1)
+        with pytest.raises(ValueError):
+            emp.add_sales([(0, 100), (-1, 100)])
+        with pytest.raises(ValueError):
+            emp.pay_for_periods(3, 1)
+
+    # --- pay cache ---
+
+    def test_pay_cache_hits_until_state_changes(self):
+        from ex3_employee_payroll import Employee
+        emp = CommissionEmployee("Carol", "E003", base_monthly_salary=3000, commission_rate=0.1)
+        Employee.reset_pay_cache_stats()
+        emp.generate_payslip()
+        emp.generate_payslip()
+        assert Employee.pay_cache_stats() == {"hits": 1, "misses": 1}
+        emp.add_sale(1000)
+        assert emp.monthly_pay() == pytest.approx(3100.0)
+        emp.add_sales([(1, 500)])
+        emp.set_current_period(1)
+        assert emp.monthly_pay() == pytest.approx(3050.0)
+        emp.set_commission_rate(0.2)
+        assert emp.monthly_pay() == pytest.approx(3100.0)
+        assert Employee.pay_cache_stats()["misses"] == 4
+
+    def test_rate_setters_invalidate_and_validate(self):
+        ft = FullTimeEmployee("Alice", "E001", base_salary=120_000)
+        ct = ContractEmployee("Bob", "E002", hourly_rate=85.0, hours_worked_this_month=160)
+        assert ft.monthly_pay() == pytest.approx(10_000.0)
+        assert ct.monthly_pay() == pytest.approx(13_600.0)
+        ft.set_base_salary(60_000)
+        ct.set_hours_worked(10)
+        ct.set_hourly_rate(100)
+        assert ft.monthly_pay() == pytest.approx(5_000.0)
+        assert ct.monthly_pay() == pytest.approx(1_000.0)
+        with pytest.raises(ValueError):
+            ft.set_base_salary(0)
+        with pytest.raises(ValueError):
+            ct.set_hours_worked(-1)
+        assert ct.monthly_pay() == pytest.approx(1_000.0)
+
+    def test_pay_cache_can_be_disabled(self):
+        from ex3_employee_payroll import Employee
+        emp = FullTimeEmployee("Alice", "E001", base_salary=120_000)
+        Employee.pay_cache_enabled = False
+        try:
+            Employee.reset_pay_cache_stats()
+            emp.generate_payslip()
+            emp.generate_payslip()
+            assert Employee.pay_cache_stats() == {"hits": 0, "misses": 0}
+        finally:
+            Employee.pay_cache_enabled = True
+
+    # --- slots and bulk loading ---
+
+    def test_employees_have_no_instance_dict(self):
+        import pickle
+        employees = [
+            FullTimeEmployee("Alice", "E001", base_salary=120_000),
+            ContractEmployee("Bob", "E002", hourly_rate=85.0, hours_worked_this_month=160),
+            CommissionEmployee("Carol", "E003", base_monthly_salary=3000, commission_rate=0.08),
+        ]
+        employees[2].add_sale(5000)
+        for emp in employees:
+            assert not hasattr(emp, "__dict__")
+            clone = pickle.loads(pickle.dumps(emp))
+            assert clone.generate_payslip() == emp.generate_payslip()
+
+    def test_from_records_matches_constructor(self):
+        ft = FullTimeEmployee.from_records([("Alice", "E001", 120_000), ("Dan", "E004", 60_000.0)])
+        ct = ContractEmployee.from_records(iter([("Bob", "E002", 85, 160)]))
+        cm = CommissionEmployee.from_records([("Carol", "E003", 3000, 0.08)])
+        assert [type(e) for e in ft + ct + cm] == [FullTimeEmployee] * 2 + [ContractEmployee, CommissionEmployee]
+        assert ft[0].generate_payslip() == FullTimeEmployee("Alice", "E001", base_salary=120_000).generate_payslip()
+        assert ft[1].monthly_pay() == pytest.approx(5_000.0)
+        assert ct[0].monthly_pay() == pytest.approx(13_600.0)
+        cm[0].add_sale(5000)
+        cm[0].add_sale(12000)
+        assert cm[0].monthly_pay() == pytest.approx(4360.0)
+        others = CommissionEmployee.from_records([("Dan", "E004", 1000, 0.1), ("Eve", "E005", 1000, 0.1)])
+        others[0].add_sales([(0, 100), (2, 50)])
+        assert others[0].pay_for_periods(0, 2) == pytest.approx(3015.0)
+        assert others[1].pay_for_periods(0, 2) == pytest.approx(3000.0)
+        assert FullTimeEmployee.from_records([]) == []
+
+    def test_from_records_validates_columns(self):
+        with pytest.raises(TypeError, match="record 1"):
+            FullTimeEmployee.from_records([("Alice", "E001", 1), ("Dan", 4, 1)])
+        with pytest.raises(ValueError, match="record 2"):
+            FullTimeEmployee.from_records([("A", "E1", 1), ("B", "E2", 2), ("C", "E3", -1)])
+        with pytest.raises(ValueError):
+            FullTimeEmployee.from_records([("A", "E1")])
+        with pytest.raises(TypeError):
+            ContractEmployee.from_records([("Bob", "E002", 85, 1.5)])
+        with pytest.raises(ValueError):
+            ContractEmployee.from_records([("Bob", "E002", 85, -1)])
+        assert ContractEmployee.from_records([("Bob", "E002", 85, 0)])[0].monthly_pay() == 0
+        with pytest.raises(TypeError):
+            CommissionEmployee.from_records([("Carol", "E003", 3000, 1)])
+
     def test_run_payroll_works_without_isinstance(self):
         """run_payroll must handle all types polymorphically."""
         try:
@@ -369,6 +1059,154 @@ class TestEmployeePayroll:
             Employee("Test", "E000", 50_000)
 
 
+run_payroll_batch = _try_import("ex3_employee_payroll", "run_payroll_batch")
+
+@pytest.mark.skipif(run_payroll_batch is None, reason="run_payroll_batch not defined in ex3_employee_payroll.py")
+class TestPayrollBatch:
+    """Tests for Exercise 3: batch payroll"""
+
+    def setup_method(self):
+        carol = CommissionEmployee("Carol", "E003", base_monthly_salary=3000, commission_rate=0.08)
+        carol.add_sale(5000)
+        carol.add_sale(12000)
+        self.employees = [
+            FullTimeEmployee("Alice", "E001", base_salary=120_000),
+            ContractEmployee("Bob", "E002", hourly_rate=85.0, hours_worked_this_month=160),
+            carol,
+            FullTimeEmployee("Dan", "E004", base_salary=60_000),
+        ]
+
+    def test_pay_matches_per_employee_calculation_in_order(self):
+        result = run_payroll_batch(self.employees)
+        assert list(result.pay) == pytest.approx([e.calculate_monthly_pay() for e in self.employees])
+        assert result.payslips is None
+
+    def test_totals_by_role(self):
+        result = run_payroll_batch(self.employees)
+        assert result.totals[self.employees[0].get_role()] == pytest.approx(15_000.0)
+        assert result.totals[self.employees[1].get_role()] == pytest.approx(13_600.0)
+        assert result.total == pytest.approx(15_000.0 + 13_600.0 + 4_360.0)
+
+    def test_payslips_only_when_asked(self):
+        result = run_payroll_batch(self.employees, payslips=True)
+        assert result.payslips == [e.generate_payslip() for e in self.employees]
+
+    def test_subclass_overriding_pay_is_not_batched_with_parent_formula(self):
+        class Intern(FullTimeEmployee):
+            def calculate_monthly_pay(self):
+                return 500.0
+
+        result = run_payroll_batch([Intern("Eve", "E005", base_salary=12_000)])
+        assert list(result.pay) == [500.0]
+
+    def test_empty_payroll(self):
+        result = run_payroll_batch([])
+        assert len(result.pay) == 0 and result.totals == {} and result.total == 0
+
+
+payroll_stats = _try_import("ex3_employee_payroll", "payroll_stats")
+QuantileSketch = _try_import("ex3_employee_payroll", "QuantileSketch")
+
+@pytest.mark.skipif(payroll_stats is None, reason="payroll_stats not defined in ex3_employee_payroll.py")
+class TestPayrollStats:
+    """Tests for Exercise 3: grouped payroll statistics and the quantile sketch"""
+
+    def test_sketch_quantiles_within_relative_accuracy(self):
+        import random
+        rng = random.Random(5)
+        values = sorted(rng.lognormvariate(8, 1) for _ in range(20_000))
+        sketch = QuantileSketch(0.01)
+        for v in values:
+            sketch.add(v)
+        assert len(sketch) == len(values)
+        for q in (0.5, 0.95, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+        assert sketch.quantile(0) == values[0] and sketch.quantile(1) == values[-1]
+
+    def test_sketch_counts_zeros_and_rejects_negatives(self):
+        sketch = QuantileSketch()
+        for v in (0, 0, 0, 10.0):
+            sketch.add(v)
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.quantile(1) == pytest.approx(10.0)
+        with pytest.raises(ValueError):
+            sketch.add(-1)
+        with pytest.raises(ValueError):
+            QuantileSketch().quantile(0.5)
+
+    def test_rejected_values_leave_no_trace(self):
+        from ex3_employee_payroll import RoleStats
+        stats = RoleStats("Full-Time Employee")
+        stats.add(100.0)
+        for bad in (math.nan, math.inf, -math.inf, -1.0):
+            with pytest.raises(ValueError):
+                stats.add(bad)
+        assert (len(stats.sketch), stats.count, stats.total) == (1, 1, 100.0)
+        assert stats.p99 == pytest.approx(100.0)
+
+    def test_sketch_memory_is_bounded(self):
+        sketch = QuantileSketch(0.01, max_buckets=16)
+        for i in range(1, 10_000):
+            sketch.add(float(i))
+        other = QuantileSketch(0.01, max_buckets=16)
+        other.add(5.0)
+        sketch.merge(other)
+        assert len(sketch) == 10_000
+        # the top of the distribution keeps its accuracy
+        assert sketch.quantile(0.99) == pytest.approx(9_900, rel=0.02)
+
+    def test_stats_grouped_by_role(self):
+        employees = [
+            FullTimeEmployee("Alice", "E001", base_salary=120_000),
+            FullTimeEmployee("Dan", "E004", base_salary=60_000),
+            ContractEmployee("Bob", "E002", hourly_rate=85.0, hours_worked_this_month=0),
+        ]
+        stats = payroll_stats(iter(employees))
+        full_time = stats[employees[0].get_role()]
+        assert full_time.count == 2
+        assert full_time.total == pytest.approx(15_000.0)
+        assert full_time.mean == pytest.approx(7_500.0)
+        assert full_time.p50 == pytest.approx(5_000.0, rel=0.01)
+        contract = stats[employees[2].get_role()]
+        assert contract.count == 1 and contract.p50 == 0.0
+        assert payroll_stats([]) == {}
+
+
+PayslipWriter = _try_import("ex3_employee_payroll", "PayslipWriter")
+
+@pytest.mark.skipif(PayslipWriter is None, reason="PayslipWriter not defined in ex3_employee_payroll.py")
+class TestPayslipWriter:
+    """Tests for Exercise 3: chunked, ordered payslip writer"""
+
+    def setup_method(self):
+        self.employees = [
+            FullTimeEmployee(f"emp{i}", f"E{i}", base_salary=12_000 * (i + 1)) if i % 2
+            else ContractEmployee(f"emp{i}", f"E{i}", hourly_rate=10.0, hours_worked_this_month=i)
+            for i in range(25)
+        ]
+        self.expected = "".join(e.generate_payslip() + "\n" for e in self.employees)
+
+    def test_in_process_writer_keeps_order(self):
+        import io
+        sink = io.StringIO()
+        with PayslipWriter(sink, chunk_size=4) as writer:  # in-process by default
+            assert writer.write(iter(self.employees)) == 25
+        assert sink.getvalue() == self.expected
+
+    def test_process_pool_writer_keeps_order(self, tmp_path):
+        path = str(tmp_path / "payslips.txt")
+        with PayslipWriter(path, chunk_size=3, workers=2) as writer:
+            assert writer.write(self.employees) == 25
+        with open(path, encoding="utf-8") as f:
+            assert f.read() == self.expected
+
+    def test_invalid_chunk_size_raises(self):
+        import io
+        with pytest.raises(ValueError):
+            PayslipWriter(io.StringIO(), chunk_size=0, workers=0)
+
+
 # ===========================================================================
 # EXERCISE 4 — Shape Area Calculator
 # ===========================================================================
@@ -444,6 +1282,68 @@ class TestShapes:
         c = Circle(1)
         assert r.is_larger_than(c) is True
 
+    # --- lazy area / perimeter ---
+
+    def test_area_is_computed_once_on_first_use(self):
+        calls = []
+
+        class CountingCircle(Circle):
+            __slots__ = ()
+
+            def _compute_area(self):
+                calls.append(1)
+                return super()._compute_area()
+
+        shapes = [CountingCircle(r) for r in (3, 1, 2, 5, 4)]
+        assert calls == []
+        assert sorted(shapes)[0].radius() == 1
+        assert len(calls) == len(shapes)
+        assert shapes[0].area() == pytest.approx(math.pi * 9)
+        assert len(calls) == len(shapes)
+
+    def test_subclass_overriding_area_and_perimeter_still_works(self):
+        from ex4_shape_calculator import Shape, largest_shape, total_area
+
+        class Square(Shape):
+            # written to the original contract: area / perimeter / describe, no _compute_* hooks
+            def __init__(self, side):
+                self.side = side
+
+            def area(self):
+                return self.side ** 2
+
+            def perimeter(self):
+                return 4 * self.side
+
+            def describe(self):
+                return f"Square {self.side}"
+
+        square = Square(3)
+        assert square.area() == 9 and square.perimeter() == 12
+        assert square.is_larger_than(Circle(1)) and Circle(1) < square
+        assert largest_shape([Circle(1), square]) is square
+        assert total_area([square, Rectangle(1, 1)]) == 10
+
+        class Blob(Shape):
+            def describe(self):
+                return "blob"
+
+        with pytest.raises(NotImplementedError):
+            Blob().area()
+        # the spatial methods are optional too, only SpatialGrid needs them
+        with pytest.raises(TypeError):
+            SpatialGrid(1.0).insert(square)
+
+    def test_shapes_have_no_instance_dict(self):
+        for shape in (Circle(1), Rectangle(1, 2), Triangle(3, 4, 5), RightTriangle(3, 4)):
+            assert not hasattr(shape, "__dict__")
+            assert shape.perimeter() == shape.perimeter()
+
+    def test_impossible_triangle_rejected_at_construction(self):
+        with pytest.raises(ValueError):
+            Triangle(1, 1, 5)
+        assert Triangle(1, 2, 3).area() == 0
+
     # --- Standalone functions ---
 
     def test_largest_shape(self):
@@ -482,6 +1382,418 @@ class TestShapes:
             Shape()
 
 
+SpatialGrid = _try_import("ex4_shape_calculator", "SpatialGrid")
+
+@pytest.mark.skipif(SpatialGrid is None, reason="SpatialGrid not defined in ex4_shape_calculator.py")
+class TestSpatialGrid:
+    """Tests for Exercise 4: positioned shapes and the uniform-grid index"""
+
+    # --- positions ---
+
+    def test_bounding_boxes_follow_the_anchor(self):
+        assert Circle(2, x=1, y=1).bounding_box() == (-1, -1, 3, 3)
+        assert Rectangle(4, 2, x=1, y=-1).bounding_box() == (1, -1, 5, 1)
+        assert Triangle(3, 4, 5, x=1, y=1).bounding_box() == pytest.approx((1, 1, 4, 5))
+        assert Circle(1).position() == (0.0, 0.0)
+        with pytest.raises(ValueError):
+            Circle(1, x=float("nan"))
+
+    def test_triangle_vertices(self):
+        p0, p1, p2 = RightTriangle(3, 4, x=10, y=20).vertices()
+        assert p0 == (10, 20) and p1 == (13, 20)
+        assert p2 == pytest.approx((10, 24))
+        p0, p1, p2 = Triangle(2, 2, 2).vertices()
+        assert p2 == pytest.approx((1, math.sqrt(3)))
+
+    def test_contains_point(self):
+        assert Circle(1, x=5, y=5).contains_point(5.6, 5.6)
+        assert not Circle(1, x=5, y=5).contains_point(5.8, 5.8)
+        assert Rectangle(2, 1, x=1, y=1).contains_point(3, 2)  # corner counts
+        assert not Rectangle(2, 1, x=1, y=1).contains_point(3.01, 2)
+        t = RightTriangle(3, 4)
+        assert t.contains_point(1, 1) and t.contains_point(0, 0)
+        assert not t.contains_point(2.9, 3.9)
+
+    # --- index ---
+
+    def setup_method(self):
+        import random
+        rng = random.Random(3)
+        self.shapes = []
+        for i in range(600):
+            x, y = rng.uniform(0, 50), rng.uniform(0, 50)
+            kind = i % 3
+            if kind == 0:
+                self.shapes.append(Circle(rng.uniform(0.5, 3), x, y))
+            elif kind == 1:
+                self.shapes.append(Rectangle(rng.uniform(0.5, 4), rng.uniform(0.5, 4), x, y))
+            else:
+                self.shapes.append(Triangle(3, 4, 5, x, y))
+        self.grid = SpatialGrid.bulk_load(self.shapes)
+
+    def test_point_queries_match_a_full_scan(self):
+        import random
+        rng = random.Random(4)
+        assert len(self.grid) == 600
+        for _ in range(200):
+            x, y = rng.uniform(-5, 55), rng.uniform(-5, 55)
+            assert self.grid.query_point(x, y) == [s for s in self.shapes if s.contains_point(x, y)]
+
+    def test_range_queries_match_a_full_scan(self):
+        def overlaps(box, rng):
+            return box[0] <= rng[2] and rng[0] <= box[2] and box[1] <= rng[3] and rng[1] <= box[3]
+
+        for rng in [(10, 10, 12, 15), (-10, -10, 0, 0), (-100, -100, 100, 100), (25, 25, 25, 25)]:
+            expected = [s for s in self.shapes if overlaps(s.bounding_box(), rng)]
+            assert self.grid.query_range(*rng) == expected
+        with pytest.raises(ValueError):
+            self.grid.query_range(5, 5, 1, 1)
+
+    def test_insert_after_bulk_load(self):
+        grid = SpatialGrid(cell_size=2)
+        big = Rectangle(100, 100, x=-50, y=-50)
+        assert grid.insert(Circle(1, x=3, y=3)) == 0
+        assert grid.insert(big) == 1
+        assert grid.query_point(3, 3)[1] is big
+        assert grid.query_point(-40, 40) == [big]
+        assert grid.query_point(500, 500) == []
+        with pytest.raises(TypeError):
+            grid.insert((0, 0))
+
+    def test_one_huge_shape_does_not_skew_the_grid(self):
+        import random
+        rng = random.Random(6)
+        shapes = [Circle(0.5, x=rng.uniform(0, 5_000), y=rng.uniform(0, 5_000)) for _ in range(500)]
+        shapes.insert(250, Rectangle(5_000, 5_000))
+        grid = SpatialGrid.bulk_load(shapes)
+        assert grid.cell_size() == pytest.approx(2.0)  # twice the median extent, not the mean
+        for _ in range(50):
+            x, y = rng.uniform(0, 5_000), rng.uniform(0, 5_000)
+            expected = [id(s) for s in shapes if s.contains_point(x, y)]
+            assert [id(s) for s in grid.query_point(x, y)] == expected
+        x, y = shapes[0].position()
+        assert [id(s) for s in grid.query_point(x, y)] == [id(shapes[0]), id(shapes[250])]
+        assert [id(s) for s in grid.query_range(x, y, x, y)][-1] == id(shapes[250])
+
+
+AreaIndex = _try_import("ex4_shape_calculator", "AreaIndex")
+
+@pytest.mark.skipif(AreaIndex is None, reason="AreaIndex not defined in ex4_shape_calculator.py")
+class TestAreaIndex:
+    """Tests for Exercise 4: area-sorted shape index"""
+
+    def setup_method(self):
+        self.shapes = [Circle(1), Rectangle(2, 2), Rectangle(1, 4), Circle(3), Triangle(3, 4, 5)]
+        self.index = AreaIndex(self.shapes)
+
+    def test_threshold_queries_match_a_scan(self):
+        for threshold in (0, 3.5, 4, 5.9, 6, 100):
+            expected = sorted((s for s in self.shapes if s.area() > threshold), key=lambda s: s.area())
+            assert [s.area() for s in self.index.larger_than(threshold)] == [s.area() for s in expected]
+
+    def test_top_k_and_largest(self):
+        assert self.index.largest() is self.shapes[3]
+        top = self.index.top_k(3)
+        assert top[0] is self.shapes[3] and top[1].area() == 6
+        # equal areas: the shape added first ranks higher, as with largest_shape on a list
+        assert top[2] is self.shapes[1]
+        assert len(self.index.top_k(5)) == 5 and len(self.index.top_k(50)) == 5
+        assert self.index.top_k(0) == []
+        with pytest.raises(ValueError):
+            self.index.top_k(-1)
+
+    def test_insert_and_remove_by_identity(self):
+        twin = Rectangle(4, 1)
+        self.index.insert(twin)
+        assert len(self.index) == 6
+        # Shape.__eq__ compares areas, so membership is checked by identity
+        assert list(map(id, self.index.top_k(5)[2:])) == list(map(id, [self.shapes[1], self.shapes[2], twin]))
+        self.index.remove(self.shapes[2])
+        remaining = list(map(id, self.index.larger_than(3)))
+        assert id(self.shapes[2]) not in remaining and id(twin) in remaining
+        with pytest.raises(ValueError):
+            self.index.remove(Rectangle(2, 2))
+        self.index.remove(self.shapes[3])
+        assert self.index.largest().area() == 6
+
+    def test_helpers_accept_an_index(self):
+        from ex4_shape_calculator import largest_shape, shapes_larger_than
+        assert largest_shape(self.index) is largest_shape(self.shapes)
+        assert set(map(id, shapes_larger_than(5, self.index))) == set(map(id, shapes_larger_than(5, self.shapes)))
+        with pytest.raises(ValueError):
+            AreaIndex().largest()
+
+    def test_total_area_follows_insert_and_remove(self):
+        from ex4_shape_calculator import total_area
+        assert total_area(self.index) == total_area(self.shapes)
+        extra = Circle(2)
+        self.index.insert(extra)
+        assert total_area(self.index) == pytest.approx(total_area(self.shapes + [extra]))
+        for shape in self.shapes:
+            self.index.remove(shape)
+        assert total_area(self.index) == pytest.approx(extra.area())
+        self.index.remove(extra)
+        assert total_area(self.index) == 0.0
+        assert total_area(AreaIndex()) == 0.0
+
+
+summarize_shapes = _try_import("ex4_shape_calculator", "summarize_shapes")
+
+@pytest.mark.skipif(summarize_shapes is None, reason="shape streaming not defined in ex4_shape_calculator.py")
+class TestShapeStreaming:
+    """Tests for Exercise 4: NDJSON / binary shape files and one-pass aggregation"""
+
+    def setup_method(self):
+        self.shapes = [Circle(5, x=1, y=2), Rectangle(4, 6), Triangle(3, 4, 5, x=-1), RightTriangle(3, 4, y=7)]
+
+    @staticmethod
+    def _same(a, b):
+        return (type(a) is type(b) and a.area() == b.area() and a.position() == b.position()
+                and a.perimeter() == b.perimeter())
+
+    def test_ndjson_round_trip(self, tmp_path):
+        from ex4_shape_calculator import read_shapes_ndjson, write_shapes_ndjson
+        path = tmp_path / "shapes.ndjson"
+        assert write_shapes_ndjson(path, iter(self.shapes)) == 4
+        back = list(read_shapes_ndjson(path))
+        assert all(self._same(a, b) for a, b in zip(self.shapes, back)) and len(back) == 4
+
+    def test_ndjson_errors_name_the_line(self):
+        import io
+        from ex4_shape_calculator import iter_shapes_ndjson
+        lines = io.StringIO('{"type": "circle", "radius": 1}\n\n{"type": "circle", "radius": -1}\n')
+        reader = iter_shapes_ndjson(lines)
+        assert next(reader).radius() == 1
+        with pytest.raises(ValueError, match="line 3"):
+            next(reader)
+        for bad in ('{"type": "hexagon"}', '{"type": "rectangle", "width": 1}', "[1, 2]", "{oops"):
+            with pytest.raises(ValueError, match="line 1"):
+                list(iter_shapes_ndjson([bad]))
+
+    def test_binary_round_trip(self, tmp_path):
+        from ex4_shape_calculator import iter_shapes_binary, read_shapes_binary, write_shapes_binary
+        path = tmp_path / "shapes.bin"
+        assert write_shapes_binary(path, self.shapes) == 4
+        back = list(read_shapes_binary(path))
+        assert all(self._same(a, b) for a, b in zip(self.shapes, back)) and len(back) == 4
+        data = path.read_bytes()
+        assert len(list(iter_shapes_binary(data))) == 4
+        with pytest.raises(ValueError):
+            list(iter_shapes_binary(data[:-1]))
+        with pytest.raises(ValueError):
+            list(iter_shapes_binary(b"NOTSHAPE" + data[8:]))
+
+    def test_summary_matches_the_list_helpers(self, tmp_path):
+        from ex4_shape_calculator import largest_shape, read_shapes_binary, total_area, write_shapes_binary
+        summary = summarize_shapes(iter(self.shapes))
+        assert summary.count == 4
+        assert summary.total_area == total_area(self.shapes)
+        assert summary.largest is largest_shape(self.shapes)
+        path = tmp_path / "shapes.bin"
+        write_shapes_binary(path, self.shapes)
+        assert summarize_shapes(read_shapes_binary(path)).total_area == summary.total_area
+        assert summarize_shapes([]).largest is None
+
+
+parallel_summarize = _try_import("ex4_shape_calculator", "parallel_summarize")
+
+@pytest.mark.skipif(parallel_summarize is None, reason="parallel_summarize not defined in ex4_shape_calculator.py")
+class TestParallelSummarize:
+    """Tests for Exercise 4: sharded total area / largest shape"""
+
+    def setup_method(self):
+        import random
+        rng = random.Random(8)
+        self.shapes = [Circle(rng.uniform(0.1, 3)) if i % 2 else Rectangle(rng.uniform(0.1, 4), rng.uniform(0.1, 4))
+                       for i in range(1_000)]
+
+    def test_list_matches_serial(self):
+        from ex4_shape_calculator import largest_shape, total_area
+        for workers, shards in ((0, 1), (0, 7), (2, 5)):
+            summary = parallel_summarize(self.shapes, workers=workers, shards=shards)
+            assert summary.count == 1_000
+            assert summary.total_area == pytest.approx(total_area(self.shapes), rel=1e-12)
+            assert summary.largest is largest_shape(self.shapes)
+
+    def test_deterministic_and_ties_go_to_lowest_index(self):
+        shapes = [Rectangle(1, 1), Rectangle(2, 3), Rectangle(1, 1), Rectangle(3, 2), Rectangle(6, 1)]
+        for shards in (1, 2, 3, 5, 9):
+            assert parallel_summarize(shapes, workers=0, shards=shards).largest is shapes[1]
+        first = parallel_summarize(self.shapes, workers=2, shards=6).total_area
+        assert parallel_summarize(self.shapes, workers=0, shards=6).total_area == first
+
+    def test_binary_file_shards(self, tmp_path):
+        from ex4_shape_calculator import largest_shape, total_area, write_shapes_binary
+        path = tmp_path / "shapes.bin"
+        write_shapes_binary(path, self.shapes)
+        for workers in (0, 2):
+            summary = parallel_summarize(path, workers=workers, shards=4)
+            assert summary.count == 1_000
+            assert summary.total_area == pytest.approx(total_area(self.shapes), rel=1e-12)
+            assert summary.largest.area() == largest_shape(self.shapes).area()
+        (tmp_path / "bad.bin").write_bytes(b"nope")
+        with pytest.raises(ValueError):
+            parallel_summarize(tmp_path / "bad.bin", workers=0)
+
+    def test_empty_and_invalid_arguments(self):
+        summary = parallel_summarize([], workers=0)
+        assert summary.count == 0 and summary.total_area == 0 and summary.largest is None
+        with pytest.raises(ValueError):
+            parallel_summarize(self.shapes, workers=-1)
+        with pytest.raises(ValueError):
+            parallel_summarize(self.shapes, workers=0, shards=0)
+
+
+Polygon = _try_import("ex4_shape_calculator", "Polygon")
+CompositeShape = _try_import("ex4_shape_calculator", "CompositeShape")
+
+@pytest.mark.skipif(Polygon is None or CompositeShape is None,
+                    reason="Polygon / CompositeShape not defined in ex4_shape_calculator.py")
+class TestPolygonAndComposite:
+    """Tests for Exercise 4: polygons and composite shapes"""
+
+    # --- Polygon ---
+
+    def test_polygon_area_and_perimeter(self):
+        square = Polygon([(0, 0), (4, 0), (4, 3), (0, 3)])
+        assert square.area() == pytest.approx(12.0)
+        assert square.perimeter() == pytest.approx(14.0)
+        clockwise = Polygon([(0, 0), (0, 3), (4, 3), (4, 0)])
+        assert clockwise.area() == square.area()
+        assert Polygon([(0, 0), (3, 0), (0, 4)]).area() == pytest.approx(Triangle(3, 4, 5).area())
+
+    def test_polygon_contains_point(self):
+        ell = Polygon([(0, 0), (2, 0), (2, 1), (1, 1), (1, 2), (0, 2)], x=10, y=10)
+        assert ell.bounding_box() == (10, 10, 12, 12)
+        assert ell.contains_point(10.5, 11.5)
+        assert not ell.contains_point(11.5, 11.5) # the notch
+        assert ell.contains_point(11.5, 11) and ell.contains_point(10, 10) # edge and vertex
+        assert not ell.contains_point(0.5, 0.5)
+
+    def test_polygon_validation(self):
+        with pytest.raises(ValueError):
+            Polygon([(0, 0), (1, 1)])
+        with pytest.raises(ValueError):
+            Polygon([(0, 0), (1, 0), (float("inf"), 1)])
+        with pytest.raises(TypeError):
+            Polygon([(0, 0), (1, 0), (1,)])
+        with pytest.raises(TypeError):
+            Polygon([(0, 0), (1, 0), ("1", 1)])
+
+    # --- CompositeShape ---
+
+    def test_composite_area_follows_add_and_remove(self):
+        circle, rectangle = Circle(1), Rectangle(2, 3)
+        group = CompositeShape([circle, rectangle])
+        assert group.area() == pytest.approx(math.pi + 6)
+        assert group.perimeter() == pytest.approx(2 * math.pi + 10)
+        group.add(Rectangle(1, 1))
+        assert group.area() == pytest.approx(math.pi + 7)
+        group.remove(rectangle)
+        assert group.area() == pytest.approx(math.pi + 1) and len(group.shapes()) == 2
+        with pytest.raises(ValueError):
+            group.remove(Rectangle(2, 3)) # same area, different shape
+        for shape in group.shapes():
+            group.remove(shape)
+        assert group.area() == 0.0 and group.perimeter() == 0.0
+
+    def test_nested_composites_propagate_changes(self):
+        inner = CompositeShape([Rectangle(1, 1)])
+        outer = CompositeShape([inner, Rectangle(2, 2)], x=5)
+        inner.add(Rectangle(3, 3))
+        assert outer.area() == pytest.approx(14.0)
+        assert outer.contains_point(7.5, 2.5) and not outer.contains_point(2.5, 2.5)
+        assert outer.bounding_box() == (5, 0, 8, 3)
+        with pytest.raises(ValueError):
+            inner.add(outer)
+        with pytest.raises(ValueError):
+            outer.add(outer)
+        outer.remove(inner)
+        inner.add(Circle(1))
+        assert outer.area() == pytest.approx(4.0)
+
+    def test_ordering_helpers_and_records(self, tmp_path):
+        import json
+        from ex4_shape_calculator import iter_shapes_ndjson, largest_shape, total_area, write_shapes_binary
+        polygon = Polygon([(0, 0), (5, 0), (5, 5)], x=1)
+        group = CompositeShape([Circle(1), CompositeShape([polygon], y=2)])
+        shapes = [Rectangle(2, 2), polygon, group]
+        assert sorted(shapes)[-1] is group and polygon > shapes[0]
+        assert largest_shape(shapes) is group
+        assert total_area(shapes) == pytest.approx(4 + 12.5 + 12.5 + math.pi)
+        batch = ShapeBatch([polygon, Circle(1)])
+        assert batch[0] is polygon and batch.total_area() == pytest.approx(12.5 + math.pi)
+        with pytest.raises(TypeError):
+            batch.add(group)
+
+        text = "\n".join(json.dumps(s.to_record()) for s in shapes)
+        back = list(iter_shapes_ndjson(text.splitlines()))
+        assert [type(s) for s in back] == [Rectangle, Polygon, CompositeShape]
+        assert back[1].vertices() == polygon.vertices() and back[2].area() == group.area()
+        assert back[2].bounding_box() == group.bounding_box()
+        with pytest.raises(ValueError, match="line 1"):
+            list(iter_shapes_ndjson(['{"type": "composite"}']))
+        with pytest.raises(TypeError):
+            write_shapes_binary(tmp_path / "shapes.bin", [polygon])
+
+
+ShapeBatch = _try_import("ex4_shape_calculator", "ShapeBatch")
+
+@pytest.mark.skipif(ShapeBatch is None, reason="ShapeBatch not defined in ex4_shape_calculator.py")
+class TestShapeBatch:
+    """Tests for Exercise 4: column-wise ShapeBatch"""
+
+    def setup_method(self):
+        self.shapes = [Rectangle(2, 2), Circle(5), Triangle(3, 4, 5), RightTriangle(6, 8), Circle(1)]
+
+    def test_batch_matches_per_object_results(self):
+        batch = ShapeBatch(self.shapes)
+        assert len(batch) == 5
+        assert list(batch.areas()) == [s.area() for s in self.shapes]
+        assert list(batch.perimeters()) == [s.perimeter() for s in self.shapes]
+        assert batch[1] is self.shapes[1] and batch[-1] is self.shapes[-1]
+
+    def test_helpers_accept_a_batch(self):
+        from ex4_shape_calculator import largest_shape, shapes_larger_than, total_area
+        batch = ShapeBatch(self.shapes)
+        assert total_area(batch) == pytest.approx(total_area(self.shapes))
+        assert largest_shape(batch) is largest_shape(self.shapes)
+        assert shapes_larger_than(5, batch) == shapes_larger_than(5, self.shapes)
+
+    def test_column_adds_build_shapes_on_demand(self):
+        batch = ShapeBatch([Circle(1)])
+        batch.add_circles([5, 0.5])
+        batch.add_rectangles([2, 10], [3, 10])
+        batch.add_triangles([3], [4], [5])
+        assert len(batch) == 6
+        assert batch.areas()[1] == Circle(5).area()
+        assert batch.areas()[5] == Triangle(3, 4, 5).area()
+        assert isinstance(batch[4], Rectangle) and batch[4].area() == 100
+        assert batch.largest_shape().area() == 100
+        assert [s.area() for s in batch.shapes_larger_than(6)] == [Circle(5).area(), 100]
+        assert batch.total_perimeter() == pytest.approx(sum(batch[i].perimeter() for i in range(6)))
+        assert batch[-6].area() == Circle(1).area()
+        for position in (6, -7, -12):
+            with pytest.raises(IndexError):
+                batch[position]
+
+    def test_column_validation(self):
+        batch = ShapeBatch()
+        with pytest.raises(ValueError):
+            batch.add_circles([1, 0])
+        with pytest.raises(ValueError):
+            batch.add_rectangles([1, 2], [1])
+        with pytest.raises(ValueError):
+            batch.add_triangles([1], [1], [5])
+        with pytest.raises(TypeError):
+            batch.add_circles(["1"])
+        with pytest.raises(TypeError):
+            batch.add("circle")
+        assert len(batch) == 0
+        with pytest.raises(ValueError):
+            batch.largest_shape()
+
+
 # ===========================================================================
 # EXERCISE 5 — Notification System
 # ===========================================================================
@@ -550,6 +1862,93 @@ class TestNotificationSystem:
             pytest.skip("SlackChannel not implemented yet — bonus challenge")
 
 
+AsyncNotificationChannel = _try_import("ex5_notification_system", "AsyncNotificationChannel")
+
+if AsyncNotificationChannel is not None:
+    from ex5_notification_system import NotificationChannel
+
+    class _SlowChannel(NotificationChannel):
+        """Blocking stub: sleeps, then returns result (or raises it if it is an exception)."""
+
+        def __init__(self, name, delay, result=True):
+            self.name, self.delay, self.result = name, delay, result
+
+        def send(self, recipient, message):
+            time.sleep(self.delay)
+            if isinstance(self.result, Exception):
+                raise self.result
+            return self.result
+
+        def channel_type(self):
+            return self.name
+
+    class _AsyncSlowChannel(AsyncNotificationChannel):
+        """Coroutine stub with the same knobs as _SlowChannel."""
+
+        def __init__(self, name, delay, result=True):
+            self.name, self.delay, self.result = name, delay, result
+
+        async def send_async(self, recipient, message):
+            import asyncio
+            await asyncio.sleep(self.delay)
+            if isinstance(self.result, Exception):
+                raise self.result
+            return self.result
+
+        def channel_type(self):
+            return self.name
+
+@pytest.mark.skipif(AsyncNotificationChannel is None, reason="AsyncNotificationChannel not defined in ex5_notification_system.py")
+class TestAsyncNotifications:
+    """Tests for Exercise 5: concurrent notify_async"""
+
+    @staticmethod
+    def _notify(service, **kwargs):
+        import asyncio
+        start = time.perf_counter()
+        statuses = asyncio.run(service.notify_async("user@example.com", "Hello!", **kwargs))
+        return statuses, time.perf_counter() - start
+
+    def test_channels_are_sent_concurrently(self):
+        service = NotificationService([_AsyncSlowChannel("push", 0.2), _AsyncSlowChannel("slack", 0.2),
+                                       _SlowChannel("email", 0.2), _SlowChannel("sms", 0.2)])
+        statuses, elapsed = self._notify(service)
+        assert statuses == {"push": "sent", "slack": "sent", "email": "sent", "sms": "sent"}
+        assert elapsed < 0.5  # one after the other would take 0.8s
+
+    def test_per_channel_timeouts(self):
+        service = NotificationService([_SlowChannel("email", 0.5), _AsyncSlowChannel("push", 0.5),
+                                       _AsyncSlowChannel("sms", 0.05)])
+        statuses, elapsed = self._notify(service, timeout=0.2, timeouts={"push": 1.0})
+        assert statuses == {"email": "timeout", "push": "sent", "sms": "sent"}
+        statuses, _ = self._notify(service, timeouts={"sms": 0.01})
+        assert statuses["sms"] == "timeout" and statuses["email"] == "sent"
+
+    def test_failures_and_errors_do_not_stop_other_channels(self):
+        service = NotificationService([_SlowChannel("email", 0, result=False),
+                                       _SlowChannel("sms", 0, result=ConnectionError("down")),
+                                       _AsyncSlowChannel("push", 0, result=RuntimeError("bad token")),
+                                       _AsyncSlowChannel("slack", 0.01)])
+        statuses, _ = self._notify(service)
+        assert statuses == {"email": "failed", "sms": "error", "push": "error", "slack": "sent"}
+
+    def test_async_channel_keeps_the_sync_api(self):
+        push = _AsyncSlowChannel("push", 0)
+        service = NotificationService([push, EmailChannel("smtp.example.com", "alerts@example.com")])
+        assert push.send("user", "hi") is True
+        assert service.notify_via("push", "user", "hi") is True
+        assert self._notify(service)[0] == {"push": "sent", "email": "sent"}
+
+    def test_invalid_timeouts(self):
+        service = NotificationService([_AsyncSlowChannel("push", 0)])
+        with pytest.raises(ValueError):
+            self._notify(service, timeout=0)
+        with pytest.raises(ValueError):
+            self._notify(service, timeouts={"fax": 1.0})
+        with pytest.raises(TypeError):
+            self._notify(service, timeouts={"push": "1"})
+
+
 # ===========================================================================
 # EXERCISE 6 — Warehouse Inventory System
 # ===========================================================================